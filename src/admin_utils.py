@@ -0,0 +1,12 @@
+import itertools
+
+from django.contrib import admin
+from django.db import models
+from django.http import HttpRequest
+
+
+class BaseModelAdmin(admin.ModelAdmin):
+    def get_readonly_fields(self, request: HttpRequest, obj: models.Model | None = None) -> list[str] | tuple[str, ...]:
+        if obj:
+            return tuple(itertools.chain(self.readonly_fields, ("created", "modified")))
+        return self.readonly_fields
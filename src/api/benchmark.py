@@ -0,0 +1,121 @@
+import re
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.handlers.wsgi import WSGIHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from api.middleware import CustomSessionMiddleware
+
+_IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+_FIRST_REQUEST = """
+import time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from wsgiref.util import setup_testing_defaults
+application = get_wsgi_application()
+booted = time.perf_counter()
+path, _, query = %r.partition("?")
+environ = {"PATH_INFO": path, "QUERY_STRING": query}
+setup_testing_defaults(environ)
+b"".join(application(environ, lambda status, headers: None))
+print(booted - started, time.perf_counter() - started)
+"""
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_import_time(output: str) -> list[ImportTime]:
+    """Top level imports of ``python -X importtime`` output, slowest first."""
+    imports = []
+    for line in output.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match and len(match.group(3)) == 1:
+            imports.append(ImportTime(match.group(4), int(match.group(1)), int(match.group(2))))
+    return sorted(imports, key=lambda imported: -imported.cumulative_us)
+
+
+def import_time() -> list[ImportTime]:
+    """Import times of loading the WSGI application in a new interpreter."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "from django.core.wsgi import get_wsgi_application; get_wsgi_application()",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_import_time(result.stderr)
+
+
+def time_to_first_request(path: str) -> tuple[float, float]:
+    """Seconds a new interpreter takes to load the WSGI application and to respond to its first request of ``path``."""
+    result = subprocess.run([sys.executable, "-c", _FIRST_REQUEST % path], capture_output=True, text=True, check=True)
+    booted, responded = result.stdout.split()
+    return float(booted), float(responded)
+
+
+def request_time(handler: Callable, path: str, requests: int) -> float:
+    """Mean seconds ``handler`` takes to respond to a request of ``path``."""
+    path, _, query = path.partition("?")
+    environ: dict = {"PATH_INFO": path, "QUERY_STRING": query}
+    setup_testing_defaults(environ)
+    started = time.perf_counter()
+    for _ in range(requests):
+        b"".join(handler(dict(environ), lambda status, headers: None))
+    return (time.perf_counter() - started) / requests
+
+
+def middleware_overhead(path: str, requests: int) -> tuple[float, float]:
+    """Mean seconds of a request of ``path`` with the configured middleware and without any."""
+    with_middleware = request_time(WSGIHandler(), path, requests)
+    with override_settings(MIDDLEWARE=[]):
+        without_middleware = request_time(WSGIHandler(), path, requests)
+    return with_middleware, without_middleware
+
+
+class ReverseSessionMiddleware(SessionMiddleware):
+    """Previous ``CustomSessionMiddleware``, reversing the GraphQL URL and building the absolute URI per request."""
+
+    def process_request(self, request) -> None:
+        if reverse("graphql") in request.build_absolute_uri():
+            request.session = {}
+            return
+        super().process_request(request)
+
+    def process_response(self, request, response) -> HttpResponse:
+        if reverse("graphql") in request.build_absolute_uri():
+            return response
+        return super().process_response(request, response)
+
+
+def session_middleware_time(path: str, requests: int) -> tuple[float, float]:
+    """Mean seconds ``ReverseSessionMiddleware`` and ``CustomSessionMiddleware`` spend on a request of ``path``."""
+    times = []
+    for middleware_class in (ReverseSessionMiddleware, CustomSessionMiddleware):
+        response = HttpResponse()
+        middleware = middleware_class(lambda request: response)
+        # Requests memoize their host, each iteration needs a new one.
+        request_objects = [RequestFactory(HTTP_HOST="localhost").get(path) for _ in range(requests)]
+        started = time.perf_counter()
+        for request in request_objects:
+            middleware(request)
+        times.append((time.perf_counter() - started) / requests)
+    return times[0], times[1]
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from functools import cache
+from typing import Any, AsyncIterator
+
+import psycopg
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+from psycopg.conninfo import make_conninfo
+
+logger = logging.getLogger(__name__)
+
+Message = dict[str, Any]
+
+
+class Broker(ABC):
+    """
+    Publish/subscribe fan-out of events to GraphQL subscriptions.
+
+    ``publish`` is called from synchronous request code, ``subscribe`` from the ASGI event loop.
+    Subscribers wait on a queue, so an idle subscription does not consume any resources.
+    """
+
+    @abstractmethod
+    def publish(self, channel: str, message: Message) -> None: ...
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> AsyncIterator[Message]: ...
+
+
+class InProcessBroker(Broker):
+    """Fans out events to subscribers living in the same process."""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.queue_size: int = settings.EVENTS_BROKER_QUEUE_SIZE
+
+    def publish(self, channel: str, message: Message) -> None:
+        self.dispatch(channel, message)
+
+    def has_subscribers(self, channel: str) -> bool:
+        return bool(self._subscribers.get(channel))
+
+    def dispatch(self, channel: str, message: Message) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._put, queue, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[Message]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        await self.on_subscribe(channel)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    async def on_subscribe(self, channel: str) -> None:
+        pass
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, message: Message) -> None:
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Dropping event for slow subscriber")
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    Cross-process fan-out over Postgres LISTEN/NOTIFY.
+
+    Every process publishes with ``pg_notify`` and keeps a single listening connection,
+    opened with the first subscription, which dispatches notifications to local subscribers.
+    """
+
+    pg_channel = "zai_events"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._listener: asyncio.Task | None = None
+
+    def publish(self, channel: str, message: Message) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, %s)",
+                [self.pg_channel, json.dumps({"channel": channel, "message": message})],
+            )
+
+    async def on_subscribe(self, channel: str) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        db = settings.DATABASES["default"]
+        conninfo = make_conninfo(
+            dbname=str(db["NAME"]),
+            user=str(db["USER"]),
+            password=str(db["PASSWORD"]),
+            host=str(db["HOST"]),
+            port=str(db["PORT"]),
+        )
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {self.pg_channel}")
+                    async for notify in conn.notifies():
+                        try:
+                            payload = json.loads(notify.payload)
+                            self.dispatch(payload["channel"], payload["message"])
+                        except (ValueError, KeyError, TypeError) as e:
+                            logger.error(f"Dropping malformed event {e}")
+            except psycopg.Error as e:
+                logger.error(f"Events listener connection lost {e}")
+                await asyncio.sleep(1)
+            except Exception as e:
+                # Subscribers of this process wait on the listener, it must not die on unexpected errors.
+                logger.exception(f"Events listener failed {e}")
+                await asyncio.sleep(1)
+
+
+@cache
+def get_broker() -> Broker:
+    return import_string(settings.EVENTS_BROKER)()
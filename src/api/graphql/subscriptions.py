@@ -0,0 +1,5 @@
+from phonebook.user_schema.subscriptions import Subscription as PhonebookSubscription
+
+
+class Subscription(PhonebookSubscription):
+    pass
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from api.benchmark import import_time, middleware_overhead, time_to_first_request
+
+
+class Command(BaseCommand):
+    help = "Measure import time, time to first request and per-request middleware overhead of the app."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--path", default="/graphql/?query=%7B__typename%7D", help="Path and query string of benchmarked requests."
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show.")
+
+    def handle(self, *args, path: str, requests: int, top: int, **options) -> None:
+        imports = import_time()
+        self.stdout.write(f"Import time: {sum(imported.cumulative_us for imported in imports) / 1000:.0f}ms")
+        for imported in imports[:top]:
+            self.stdout.write(f"  {imported.cumulative_us / 1000:8.1f}ms {imported.module}")
+        booted, responded = time_to_first_request(path)
+        self.stdout.write(f"Application loaded: {booted * 1000:.0f}ms, first request: {responded * 1000:.0f}ms")
+        with_middleware, without_middleware = middleware_overhead(path, requests)
+        self.stdout.write(
+            f"Request: {with_middleware * 1e6:.0f}us, without middleware: {without_middleware * 1e6:.0f}us, "
+            f"middleware overhead: {(with_middleware - without_middleware) * 1e6:.0f}us"
+        )
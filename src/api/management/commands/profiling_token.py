@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from api.profiling import PROFILING_HEADER, profiling_token
+
+
+class Command(BaseCommand):
+    help = "Print a signed header forcing GraphQL requests to be profiled while profiling is enabled."
+
+    def handle(self, *args, **options) -> None:
+        self.stdout.write(f"{PROFILING_HEADER}: {profiling_token()}")
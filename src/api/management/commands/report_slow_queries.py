@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.slow_queries import read_slow_queries, summarize_slow_queries
+
+
+class Command(BaseCommand):
+    help = "Summarize the slow query log by SQL fingerprint, worst total duration first."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--plans", action="store_true", help="Print plan of the slowest execution.")
+
+    def handle(self, *args, limit: int, plans: bool, **options) -> None:
+        for summary in summarize_slow_queries(read_slow_queries())[:limit]:
+            self.stdout.write(
+                f"{summary.fingerprint_id} count={summary.count} total={summary.total_ms:.0f}ms "
+                f"mean={summary.mean_ms:.0f}ms max={summary.max_ms:.0f}ms"
+            )
+            self.stdout.write(f"  {summary.fingerprint}")
+            for resolver in sorted(summary.resolvers):
+                self.stdout.write(f"  from {resolver}")
+            if plans:
+                self.stdout.write(json.dumps(summary.plan, indent=2))
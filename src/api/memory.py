@@ -0,0 +1,67 @@
+import logging
+import os
+import resource
+import signal
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import FrameType
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+_snapshot: tracemalloc.Snapshot | None = None
+
+
+def current_rss() -> int:
+    """Resident set size of the process in bytes, peak RSS where ``/proc`` is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def dump_allocation_diff() -> Path | None:
+    """
+    Write allocation sites which grew the most since the previous call to MEMORY_DUMP_DIR.
+
+    The first call starts tracemalloc, unless MEMORY_TRACEMALLOC started it on boot,
+    and only takes the baseline snapshot.
+    """
+    global _snapshot
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.MEMORY_TRACEMALLOC_FRAMES)
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+    )
+    previous, _snapshot = _snapshot, snapshot
+    if previous is None:
+        logger.info(f"Took baseline memory snapshot of worker {os.getpid()}")
+        return None
+    directory = Path(settings.MEMORY_DUMP_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{os.getpid()}.{time.time_ns()}.txt"
+    with path.open("w") as dump:
+        dump.write(f"rss={current_rss()} traced={tracemalloc.get_traced_memory()[0]}\n")
+        for stat in snapshot.compare_to(previous, "traceback")[: settings.MEMORY_DUMP_TOP]:
+            dump.write(f"{stat}\n")
+            dump.writelines(f"    {line}\n" for line in stat.traceback.format())
+    logger.info(f"Wrote memory allocation diff of worker {os.getpid()} to {path}")
+    return path
+
+
+def _dump_allocation_diff(signum: int, frame: FrameType | None) -> None:
+    dump_allocation_diff()
+
+
+def install_allocation_diff_signal(signum: int = signal.SIGUSR2) -> None:
+    """Dump allocation diffs on ``signum``, e.g. ``kill -USR2 <worker pid>`` once for a baseline and again later."""
+    if settings.MEMORY_TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start(settings.MEMORY_TRACEMALLOC_FRAMES)
+    signal.signal(signum, _dump_allocation_diff)
@@ -1,18 +1,150 @@
+import cProfile
+import logging
+import random
+import tracemalloc
+from contextlib import ExitStack
+
+from django.conf import settings
 from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
 from django.http import HttpResponse
-from django.urls import reverse
+from django.urls import get_resolver
+
+from api.memory import current_rss
+from api.profiling import PROFILING_HEADER, is_valid_profiling_token, profiling_lock, save_profile
+from api.query_context import end_query_context, get_query_context, start_query_context
+from api.slow_queries import explain_slow_queries
+from api.sql_comments import comment_sql
+
+logger = logging.getLogger(__name__)
+
+
+def url_path(name: str) -> str:
+    """Path of URL pattern ``name`` as matched against ``request.path_info``, without script prefix."""
+    return "/" + get_resolver().reverse(name)
 
 
 class CustomSessionMiddleware(SessionMiddleware):
-    """Custom session middleware that disables authenticating via session id in graphql view."""
+    """
+    Custom session middleware that disables authenticating via session id in views authenticated
+    by JWT cookies, SESSIONLESS_URL_NAMES. Their paths are resolved once when the middleware is loaded.
+    """
+
+    def __init__(self, get_response) -> None:
+        super().__init__(get_response)
+        self.sessionless_paths = frozenset(url_path(name) for name in settings.SESSIONLESS_URL_NAMES)
 
     def process_request(self, request) -> None:
-        if reverse("graphql") in request.build_absolute_uri():
+        if request.path_info in self.sessionless_paths:
             request.session = {}
             return
         super().process_request(request)
 
     def process_response(self, request, response) -> HttpResponse:
-        if reverse("graphql") in request.build_absolute_uri():
+        if request.path_info in self.sessionless_paths:
             return response
         return super().process_response(request, response)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Starts the query context of a request and installs database execute wrappers enabled by settings.
+
+    The middleware is unused when no wrapper is enabled.
+    """
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.wrappers = []
+        if settings.SLOW_QUERY_EXPLAIN:
+            self.wrappers.append(explain_slow_queries)
+        # Inside of the slow query wrapper, the plan is taken of the statement without the comment.
+        if settings.SQL_COMMENTER:
+            self.wrappers.append(comment_sql)
+        if not self.wrappers:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request) -> HttpResponse:
+        token = start_query_context(request.headers.get("X-Request-ID"))
+        try:
+            with ExitStack() as stack:
+                for wrapper in self.wrappers:
+                    stack.enter_context(connection.execute_wrapper(wrapper))
+                return self.get_response(request)
+        finally:
+            end_query_context(token)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles GraphQL requests with cProfile, a PROFILING_SAMPLE_RATE fraction of them and requests
+    with a valid ``X-Profile`` header, see ``manage.py profiling_token``.
+
+    The middleware is unused unless PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, get_response) -> None:
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.graphql_path = url_path("graphql")
+
+    def _should_profile(self, request) -> bool:
+        if request.path_info != self.graphql_path:
+            return False
+        token = request.headers.get(PROFILING_HEADER)
+        if token is not None:
+            return is_valid_profiling_token(token)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request) -> HttpResponse:
+        if not self._should_profile(request) or not profiling_lock.acquire(blocking=False):
+            return self.get_response(request)
+        token = start_query_context(request.headers.get("X-Request-ID")) if get_query_context() is None else None
+        try:
+            profile = cProfile.Profile()
+            response = profile.runcall(self.get_response, request)
+            context = get_query_context()
+            if context is None:
+                logger.error(f"Failed to save profile of {request.path_info}, query context was ended")
+            else:
+                save_profile(profile, context.operation, context.request_id)
+            return response
+        finally:
+            profiling_lock.release()
+            if token is not None:
+                end_query_context(token)
+
+
+class MemoryTrackingMiddleware:
+    """
+    Logs GraphQL operations whose peak traced memory or RSS growth reaches MEMORY_REQUEST_LOG_THRESHOLD.
+
+    Peak memory is only known while tracemalloc is tracing, see MEMORY_TRACEMALLOC. It is shared
+    by threads of a process, so with threaded workers it may include concurrent requests.
+    The middleware is unused unless MEMORY_TRACKING is set.
+    """
+
+    def __init__(self, get_response) -> None:
+        if not settings.MEMORY_TRACKING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.graphql_path = url_path("graphql")
+
+    def __call__(self, request) -> HttpResponse:
+        if request.path_info != self.graphql_path:
+            return self.get_response(request)
+        rss = current_rss()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            traced, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        response = self.get_response(request)
+        rss_growth = current_rss() - rss
+        peak = tracemalloc.get_traced_memory()[1] - traced if tracing else 0
+        if max(peak, rss_growth) >= settings.MEMORY_REQUEST_LOG_THRESHOLD:
+            context = get_query_context()
+            operation = context.operation if context else ""
+            logger.warning(f"GraphQL operation {operation or '-'} peak={peak} rss_growth={rss_growth}")
+        return response
@@ -0,0 +1,42 @@
+import cProfile
+import re
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+
+PROFILING_HEADER = "X-Profile"
+_SALT = "api.profiling"
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_]+")
+
+# cProfile can profile one thread of a process at a time, concurrent requests are not profiled.
+profiling_lock = threading.Lock()
+
+
+def profiling_token() -> str:
+    """Value of the ``X-Profile`` header forcing a request to be profiled, valid for PROFILING_TOKEN_MAX_AGE."""
+    return signing.TimestampSigner(salt=_SALT).sign("profile")
+
+
+def is_valid_profiling_token(token: str) -> bool:
+    try:
+        return signing.TimestampSigner(salt=_SALT).unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE) == "profile"
+    except signing.BadSignature:
+        return False
+
+
+def save_profile(profile: cProfile.Profile, operation: str, request_id: str) -> Path:
+    """
+    Dump ``profile`` to PROFILING_DIR as ``<operation>.<timestamp>.<request id>.prof``, keeping the
+    newest PROFILING_MAX_FILES profiles of each operation. Files can be read with ``pstats`` or snakeviz.
+    """
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = _UNSAFE_NAME.sub("_", operation) or "anonymous"
+    path = directory / f"{name}.{time.time_ns()}.{request_id[:16]}.prof"
+    profile.dump_stats(path)
+    for old_path in sorted(directory.glob(f"{name}.*.prof"), reverse=True)[settings.PROFILING_MAX_FILES :]:
+        old_path.unlink(missing_ok=True)
+    return path
@@ -0,0 +1,60 @@
+import uuid
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+
+import graphene
+from django.db.models import QuerySet
+from graphql import OperationType
+
+
+@dataclass
+class QueryContext:
+    """What the current request is doing, used to attribute SQL statements to GraphQL fields."""
+
+    request_id: str
+    operation: str = ""
+    mutation: str = ""
+    resolver: str = ""
+
+
+_query_context: ContextVar[QueryContext | None] = ContextVar("query_context", default=None)
+
+
+def get_query_context() -> QueryContext | None:
+    return _query_context.get()
+
+
+def start_query_context(request_id: str | None = None) -> Token[QueryContext | None]:
+    """Start context of a new request, returns token for ``end_query_context``."""
+    return _query_context.set(QueryContext(request_id=request_id or uuid.uuid4().hex))
+
+
+def end_query_context(token: Token[QueryContext | None]) -> None:
+    _query_context.reset(token)
+
+
+class QueryContextMiddleware:
+    """
+    Graphene middleware recording operation, mutation and resolver of the current request.
+
+    Querysets returned by resolvers are evaluated before the resolver is left,
+    so their SQL is attributed to the resolver and not to whatever runs next.
+    """
+
+    def resolve(self, next, root, info: graphene.ResolveInfo, **kwargs):
+        context = _query_context.get()
+        if context is None:
+            return next(root, info, **kwargs)
+        if info.path.prev is None:
+            context.operation = info.operation.name.value if info.operation.name else ""
+            if info.operation.operation == OperationType.MUTATION:
+                context.mutation = info.field_name
+        previous = context.resolver
+        context.resolver = f"{info.parent_type.name}.{info.field_name}"
+        try:
+            result = next(root, info, **kwargs)
+            if isinstance(result, QuerySet):
+                result = list(result)
+            return result
+        finally:
+            context.resolver = previous
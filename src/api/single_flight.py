@@ -0,0 +1,59 @@
+import copy
+import threading
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[T]):
+    """
+    Runs concurrent calls with the same key once, callers arriving while the first call runs wait
+    for it and share its result or raise a copy of its exception.
+
+    Callers wait on threads, which serve requests of threaded workers and sync views under ASGI,
+    where each request runs its sync code on its own thread.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, _Flight[T]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], T], timeout: float | None = None) -> T:
+        """
+        Result of ``func``, run by the first caller of ``key``. Waiting callers run ``func`` themselves
+        once ``timeout`` seconds pass.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            if not flight.done.wait(timeout):
+                return func()
+            if flight.error is not None:
+                # Raising the shared instance from several threads would modify its traceback concurrently.
+                try:
+                    error = copy.copy(flight.error)
+                except Exception:
+                    return func()
+                raise error
+            return flight.result  # type: ignore[return-value]
+        try:
+            flight.result = func()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
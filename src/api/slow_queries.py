@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import transaction
+
+from api.query_context import get_query_context
+
+logger = logging.getLogger(__name__)
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_log_handler: RotatingFileHandler | None = None
+_log_lock = threading.Lock()
+
+
+def sql_fingerprint(sql: str) -> str:
+    """
+    Statement with literals and parameter lists replaced, so repeated executions
+    of the same query with different values share a fingerprint.
+    """
+    sql = _COMMENT.sub("", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def fingerprint_id(fingerprint: str) -> str:
+    return hashlib.sha1(fingerprint.encode()).hexdigest()[:16]
+
+
+def _write(record: dict[str, Any]) -> None:
+    global _log_handler
+    with _log_lock:
+        if _log_handler is None:
+            path = Path(settings.SLOW_QUERY_LOG_PATH)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _log_handler = RotatingFileHandler(
+                path, maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES, backupCount=settings.SLOW_QUERY_LOG_BACKUPS
+            )
+        _log_handler.emit(logging.makeLogRecord({"msg": json.dumps(record, default=str), "args": None}))
+
+
+def explain_slow_queries(execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+    """
+    Execute wrapper capturing ``EXPLAIN (ANALYZE, BUFFERS)`` of sampled slow ``SELECT`` and ``WITH`` statements.
+
+    ``ANALYZE`` executes the statement once more, so it runs in a savepoint which is always rolled back:
+    writes of data modifying ``WITH`` queries are not repeated and a failing ``EXPLAIN`` does not abort
+    the transaction of the caller. The plan is taken on a separate cursor, so results of the original one are kept.
+    """
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = (time.perf_counter() - started) * 1000
+    if (
+        duration < settings.SLOW_QUERY_THRESHOLD_MS
+        or many
+        or random.random() >= settings.SLOW_QUERY_SAMPLE_RATE
+        or not sql.lstrip().upper().startswith(("SELECT", "WITH"))
+    ):
+        return result
+    connection = context["connection"]
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            transaction.set_rollback(True, using=connection.alias)
+    except Exception as e:
+        logger.warning(f"Failed to explain slow query {e}")
+        return result
+    fingerprint = sql_fingerprint(sql)
+    query_context = get_query_context()
+    _write(
+        {
+            "time": time.time(),
+            "duration_ms": round(duration, 3),
+            "fingerprint_id": fingerprint_id(fingerprint),
+            "fingerprint": fingerprint,
+            "operation": query_context.operation if query_context else "",
+            "mutation": query_context.mutation if query_context else "",
+            "resolver": query_context.resolver if query_context else "",
+            "request_id": query_context.request_id if query_context else "",
+            "plan": plan,
+        }
+    )
+    return result
+
+
+@dataclass
+class FingerprintSummary:
+    fingerprint_id: str
+    fingerprint: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    resolvers: set[str] = field(default_factory=set)
+    # Plan of the slowest sampled execution.
+    plan: Any = None
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+def read_slow_queries(path: Path | None = None) -> Iterator[dict[str, Any]]:
+    """Records of the slow query log, rotated files included."""
+    path = path or Path(settings.SLOW_QUERY_LOG_PATH)
+    for log_path in sorted(path.parent.glob(f"{path.name}*")):
+        with log_path.open() as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def summarize_slow_queries(records: Iterator[dict[str, Any]]) -> list[FingerprintSummary]:
+    """Slow query records grouped by fingerprint, highest total duration first."""
+    summaries: dict[str, FingerprintSummary] = {}
+    for record in records:
+        summary = summaries.setdefault(
+            record["fingerprint_id"],
+            FingerprintSummary(fingerprint_id=record["fingerprint_id"], fingerprint=record["fingerprint"]),
+        )
+        summary.count += 1
+        summary.total_ms += record["duration_ms"]
+        if record["duration_ms"] >= summary.max_ms:
+            summary.max_ms = record["duration_ms"]
+            summary.plan = record["plan"]
+        if record.get("resolver"):
+            summary.resolvers.add(f"{record.get('operation') or '-'}:{record['resolver']}")
+    return sorted(summaries.values(), key=lambda summary: (-summary.total_ms, summary.fingerprint_id))
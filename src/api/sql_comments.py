@@ -0,0 +1,37 @@
+from functools import lru_cache
+from typing import Any, Callable
+from urllib.parse import quote
+
+from api.query_context import get_query_context
+
+
+@lru_cache(maxsize=1024)
+def _comment(operation: str, mutation: str, resolver: str, request_id: str) -> str:
+    # Keys are in sorted order, like sqlcommenter, so statements are tagged consistently.
+    tags = {
+        "graphql_mutation": mutation,
+        "graphql_operation": operation,
+        "graphql_resolver": resolver,
+        "request_id": request_id,
+    }
+    return " /*" + ",".join(f"{key}='{quote(value, safe='')}'" for key, value in tags.items() if value) + "*/"
+
+
+def sql_comment() -> str:
+    """sqlcommenter style comment naming the GraphQL operation, mutation, resolver and request id."""
+    context = get_query_context()
+    if context is None:
+        return ""
+    return _comment(context.operation, context.mutation, context.resolver, context.request_id)
+
+
+def comment_sql(execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+    """
+    Execute wrapper appending ``sql_comment()`` to statements, so database statistics such as
+    ``pg_stat_statements`` and the slow query log can be attributed to GraphQL operations.
+    """
+    comment = sql_comment()
+    if comment:
+        # Values are URL encoded, percent signs must not be taken for placeholders.
+        sql += comment if params is None else comment.replace("%", "%%")
+    return execute(sql, params, many, context)
@@ -0,0 +1,68 @@
+import hashlib
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from graphene_django.views import GraphQLView
+from graphql import GraphQLError, OperationType, get_operation_ast, parse, print_ast
+from graphql_jwt.utils import get_http_authorization
+
+from api.single_flight import SingleFlight
+
+
+@lru_cache(maxsize=512)
+def read_only_document(query: str, operation_name: str | None) -> str | None:
+    """Normalized ``query`` when its executed operation is a query, otherwise None."""
+    try:
+        document = parse(query)
+    except GraphQLError:
+        return None
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        return None
+    return print_ast(document)
+
+
+def visibility_scope(request) -> str:
+    """
+    What results of a request may depend on, its JWT credentials or session user. Requests with
+    the same scope see the same data.
+    """
+    token = get_http_authorization(request)
+    if token:
+        return "token:" + hashlib.sha256(token.encode()).hexdigest()
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return ""
+
+
+class SingleFlightGraphQLView(GraphQLView):
+    """
+    GraphQL view executing identical concurrent read-only operations once per worker.
+
+    Requests share the serialized result of the operation when their normalized document,
+    operation name, variables and visibility scope match, see GRAPHQL_SINGLE_FLIGHT.
+    """
+
+    single_flight: SingleFlight[tuple[str | None, int]] = SingleFlight()
+
+    def get_response(self, request, data, show_graphiql=False):
+        if not settings.GRAPHQL_SINGLE_FLIGHT or self.batch:
+            return super().get_response(request, data, show_graphiql)
+        query, variables, operation_name, _ = self.get_graphql_params(request, data)
+        document = read_only_document(query, operation_name) if query else None
+        if document is None:
+            return super().get_response(request, data, show_graphiql)
+        key = (
+            document,
+            operation_name,
+            json.dumps(variables, sort_keys=True, default=str),
+            visibility_scope(request),
+            show_graphiql,
+        )
+        return self.single_flight.do(
+            key,
+            lambda: super(SingleFlightGraphQLView, self).get_response(request, data, show_graphiql),
+            timeout=settings.GRAPHQL_SINGLE_FLIGHT_TIMEOUT,
+        )
@@ -0,0 +1,44 @@
+import logging
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.urls import get_resolver
+from graphql import validate_schema
+
+logger = logging.getLogger(__name__)
+
+
+def build_schema() -> None:
+    """
+    Build and validate the GraphQL schema and load URL patterns, e.g. once in the gunicorn master
+    so forked workers share them.
+    """
+    from api.graphql.schema import schema
+
+    errors = validate_schema(schema.graphql_schema)
+    if errors:
+        raise ImproperlyConfigured(f"Invalid GraphQL schema: {'; '.join(error.message for error in errors)}")
+    get_resolver().url_patterns
+    # Connections must not be shared with forked workers.
+    connections.close_all()
+
+
+def warm_worker() -> None:
+    """Open database connections and fill per-worker caches before a worker accepts requests."""
+    from phonebook.directory_snapshot import get_directory
+    from phonebook.lookups import cities, countries
+
+    started = time.perf_counter()
+    get_directory()
+    try:
+        for connection in connections.all():
+            connection.ensure_connection()
+        cities.warm()
+        countries.warm()
+    except Exception as e:
+        # The worker still serves requests, e.g. when the database is briefly unreachable,
+        # and connects and fills caches on first use instead.
+        logger.error(f"Failed to warm worker {e}")
+        return
+    logger.info(f"Warmed worker in {time.perf_counter() - started:.3f}s")
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from typing import Any, Awaitable, Callable
+
+import graphene
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from graphql import ExecutionResult
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.settings import jwt_settings
+from graphql_jwt.shortcuts import get_user_by_token
+
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+GRAPHQL_TRANSPORT_WS_PROTOCOL = "graphql-transport-ws"
+
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+
+
+@dataclass
+class WebSocketContext:
+    user: User | AnonymousUser
+    COOKIES: dict[str, str] = field(default_factory=dict)
+
+
+class GraphQLWebSocketApp:
+    """
+    ASGI application serving GraphQL subscriptions over the ``graphql-transport-ws`` protocol.
+
+    The user is authenticated once per connection with a JWT passed as ``token`` in the
+    ``connection_init`` payload, or with the JWT cookie sent with the handshake.
+    """
+
+    def __init__(self, schema: graphene.Schema) -> None:
+        self.schema = schema
+
+    async def __call__(self, scope: dict[str, Any], receive: Receive, send: Send) -> None:
+        connection = _Connection(self.schema, scope, send)
+        try:
+            while True:
+                event = await receive()
+                if event["type"] == "websocket.connect":
+                    await connection.accept()
+                elif event["type"] == "websocket.receive":
+                    await connection.handle(event.get("text") or event.get("bytes") or "")
+                elif event["type"] == "websocket.disconnect":
+                    return
+                if connection.closed:
+                    return
+        finally:
+            connection.cancel_tasks()
+
+
+class _Connection:
+    def __init__(self, schema: graphene.Schema, scope: dict[str, Any], send: Send) -> None:
+        self.schema = schema
+        self.scope = scope
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self.context: WebSocketContext | None = None
+        self.subscriptions: dict[str, asyncio.Task] = {}
+        self.closed = False
+        self._init_timeout: asyncio.Task | None = None
+
+    async def accept(self) -> None:
+        if GRAPHQL_TRANSPORT_WS_PROTOCOL not in self.scope.get("subprotocols", []):
+            await self.close(4406, "Subprotocol not acceptable")
+            return
+        await self.send({"type": "websocket.accept", "subprotocol": GRAPHQL_TRANSPORT_WS_PROTOCOL})
+        self._init_timeout = asyncio.create_task(self._close_without_init())
+
+    async def _close_without_init(self) -> None:
+        await asyncio.sleep(settings.GRAPHQL_WS_CONNECTION_INIT_TIMEOUT)
+        if self.context is None and not self.closed:
+            await self.close(4408, "Connection initialisation timeout")
+
+    async def close(self, code: int, reason: str) -> None:
+        self.closed = True
+        await self.send({"type": "websocket.close", "code": code, "reason": reason})
+
+    async def send(self, event: dict[str, Any]) -> None:
+        async with self._send_lock:
+            await self._send(event)
+
+    async def send_message(self, message: dict[str, Any]) -> None:
+        await self.send({"type": "websocket.send", "text": json.dumps(message)})
+
+    async def handle(self, raw_message: str | bytes) -> None:
+        try:
+            message = json.loads(raw_message)
+            message_type = message["type"]
+        except (ValueError, KeyError, TypeError):
+            await self.close(4400, "Invalid message received")
+            return
+        if message_type == "connection_init":
+            if self.context is not None:
+                await self.close(4429, "Too many initialisation requests")
+                return
+            self.context = await self._build_context(message.get("payload") or {})
+            await self.send_message({"type": "connection_ack"})
+        elif message_type == "ping":
+            await self.send_message({"type": "pong"})
+        elif message_type == "pong":
+            pass
+        elif message_type == "subscribe":
+            if self.context is None:
+                await self.close(4401, "Unauthorized")
+                return
+            operation_id = message.get("id")
+            if operation_id in self.subscriptions:
+                await self.close(4409, f"Subscriber for {operation_id} already exists")
+                return
+            self.subscriptions[operation_id] = asyncio.create_task(
+                self._run_subscription(operation_id, message.get("payload") or {})
+            )
+        elif message_type == "complete":
+            task = self.subscriptions.pop(message.get("id"), None)
+            if task:
+                task.cancel()
+        else:
+            await self.close(4400, f"Unknown message type {message_type}")
+
+    def cancel_tasks(self) -> None:
+        if self._init_timeout:
+            self._init_timeout.cancel()
+        for task in self.subscriptions.values():
+            task.cancel()
+        self.subscriptions.clear()
+
+    async def _build_context(self, payload: dict[str, Any]) -> WebSocketContext:
+        cookies = self._get_cookies()
+        token = payload.get("token") or cookies.get(jwt_settings.JWT_COOKIE_NAME)
+        user: User | AnonymousUser = AnonymousUser()
+        if token:
+            try:
+                user = await sync_to_async(get_user_by_token)(token)
+            except JSONWebTokenError as e:
+                logger.warning(f"Invalid websocket token {e}")
+        return WebSocketContext(user=user, COOKIES=cookies)
+
+    def _get_cookies(self) -> dict[str, str]:
+        cookie = SimpleCookie()
+        for name, value in self.scope.get("headers", []):
+            if name == b"cookie":
+                cookie.load(value.decode("latin1"))
+        return {key: morsel.value for key, morsel in cookie.items()}
+
+    async def _run_subscription(self, operation_id: str, payload: dict[str, Any]) -> None:
+        try:
+            result = await self.schema.subscribe(
+                payload.get("query", ""),
+                variable_values=payload.get("variables"),
+                operation_name=payload.get("operationName"),
+                context_value=self.context,
+            )
+            if isinstance(result, ExecutionResult):
+                await self.send_message(
+                    {
+                        "type": "error",
+                        "id": operation_id,
+                        "payload": [error.formatted for error in result.errors or []],
+                    }
+                )
+                return
+            try:
+                async for item in result:
+                    await self.send_message({"type": "next", "id": operation_id, "payload": item.formatted})
+            finally:
+                await result.aclose()
+            await self.send_message({"type": "complete", "id": operation_id})
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Errors of the broker or resolvers end only this subscription, the client is told so.
+            logger.exception(f"Subscription {operation_id} failed")
+            if not self.closed:
+                await self.send_message(
+                    {"type": "error", "id": operation_id, "payload": [{"message": "Subscription failed"}]}
+                )
+                await self.send_message({"type": "complete", "id": operation_id})
+        finally:
+            self.subscriptions.pop(operation_id, None)
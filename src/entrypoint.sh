@@ -1,8 +1,3 @@
 #!/bin/bash
 
-exec gunicorn "zai.wsgi:application" \
-    --bind 0.0.0.0:8000 \
-    --workers 4 \
-    --timeout 60 \
-    --limit-request-field_size 65536 \
-    --log-level info
+exec gunicorn "zai.wsgi:application" -c python:zai.gunicorn_config
@@ -1,10 +1,7 @@
-import itertools
 from typing import TypeVar
 
-from django.contrib import admin
 from django.db import models
 from django.db.models import Q, QuerySet, Value
-from django.http import HttpRequest
 from graphql_relay import to_global_id
 
 M = TypeVar("M", bound=models.Model)
@@ -18,13 +15,6 @@ class TimeStampMixin(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
 
-class BaseModelAdmin(admin.ModelAdmin):
-    def get_readonly_fields(self, request: HttpRequest, obj: models.Model | None = None) -> list[str] | tuple[str, ...]:
-        if obj:
-            return tuple(itertools.chain(self.readonly_fields, ("created", "modified")))
-        return self.readonly_fields
-
-
 class GrapheneModelMixin:
     id: int
 
@@ -38,14 +28,18 @@ class SearchableFilterSetMixin:
     Mixin for FilterSet search implementation.
     Add search = CharFilter(method="search_filter")
     field to FilterSet class to make it work.
+    Search fields must not span multi-valued relations, matches are not deduplicated.
     """
 
     search_fields: list[str]
 
-    def search_filter(self, queryset: QuerySet[M], name: str, value: str) -> QuerySet[M]:
-        if not value:
-            return queryset
+    def search_query(self, value: str) -> Q:
         q = Q()
         for search_field in self.search_fields:
             q.add(Q(**{f"{search_field}__icontains": Value(value)}), Q.OR)
-        return queryset.filter(q).distinct()
+        return q
+
+    def search_filter(self, queryset: QuerySet[M], name: str, value: str) -> QuerySet[M]:
+        if not value:
+            return queryset
+        return queryset.filter(self.search_query(value))
@@ -1,7 +1,17 @@
 from django.contrib import admin
 
-from model_utils import BaseModelAdmin
-from phonebook.models import PhonebookEntry, PhonebookEntryRating, PhonebookGroup, PhonebookNumber
+from admin_utils import BaseModelAdmin
+from phonebook.models import (
+    PhonebookCity,
+    PhonebookCountry,
+    PhonebookDigestBucket,
+    PhonebookEntry,
+    PhonebookEntryCounter,
+    PhonebookEntryRating,
+    PhonebookEntryRatingSummary,
+    PhonebookGroup,
+    PhonebookNumber,
+)
 
 
 @admin.register(PhonebookEntry)
@@ -18,3 +28,23 @@ class PhonebookNumberAdmin(BaseModelAdmin): ...
 
 @admin.register(PhonebookEntryRating)
 class PhonebookEntryRatingAdmin(BaseModelAdmin): ...
+
+
+@admin.register(PhonebookEntryRatingSummary)
+class PhonebookEntryRatingSummaryAdmin(BaseModelAdmin): ...
+
+
+@admin.register(PhonebookDigestBucket)
+class PhonebookDigestBucketAdmin(BaseModelAdmin): ...
+
+
+@admin.register(PhonebookEntryCounter)
+class PhonebookEntryCounterAdmin(BaseModelAdmin): ...
+
+
+@admin.register(PhonebookCity)
+class PhonebookCityAdmin(BaseModelAdmin): ...
+
+
+@admin.register(PhonebookCountry)
+class PhonebookCountryAdmin(BaseModelAdmin): ...
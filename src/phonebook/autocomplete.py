@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import TextChoices
+
+from phonebook.models import PhonebookEntry, PhonebookGroup
+
+
+class SuggestionKindEnum(TextChoices):
+    entry = "entry"
+    group = "group"
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    value: str
+    kind: str
+
+
+class _TrieNode:
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        # Original spellings of names ending in this node with number of their occurrences.
+        self.values: Counter[str] = Counter()
+
+
+class PrefixTrie:
+    """Case-insensitive prefix tree of names, completions are returned in alphabetical order."""
+
+    def __init__(self) -> None:
+        self.root = _TrieNode()
+
+    def insert(self, name: str) -> None:
+        node = self.root
+        for char in name.casefold():
+            node = node.children.setdefault(char, _TrieNode())
+        node.values[name] += 1
+
+    def remove(self, name: str) -> None:
+        path = [self.root]
+        for char in name.casefold():
+            child = path[-1].children.get(char)
+            if child is None:
+                return
+            path.append(child)
+        node = path[-1]
+        node.values[name] -= 1
+        if node.values[name] <= 0:
+            del node.values[name]
+        # Prune branches which do not lead to any name.
+        for char, parent in zip(reversed(name.casefold()), reversed(path[:-1])):
+            child = parent.children[char]
+            if child.values or child.children:
+                break
+            del parent.children[char]
+
+    def complete(self, prefix: str, limit: int) -> list[str]:
+        node: _TrieNode | None = self.root
+        for char in prefix.casefold():
+            node = node.children.get(char) if node else None
+        if node is None or limit <= 0:
+            return []
+        completions: list[str] = []
+        stack = [node]
+        while stack and len(completions) < limit:
+            node = stack.pop()
+            completions.extend(sorted(node.values)[: limit - len(completions)])
+            stack.extend(node.children[char] for char in sorted(node.children, reverse=True))
+        return completions
+
+
+class AutocompleteIndex:
+    """Names of entries of a single user and of groups these entries belong to."""
+
+    def __init__(self, user_id: int) -> None:
+        self.user_id = user_id
+        self.entries = PrefixTrie()
+        self.groups = PrefixTrie()
+        self.entry_names: dict[int, str] = {}
+        self.loaded_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, user_id: int) -> "AutocompleteIndex":
+        index = cls(user_id)
+        for entry_id, name in PhonebookEntry.objects.filter(created_by_id=user_id).values_list("id", "name"):
+            index.entry_names[entry_id] = name
+            index.entries.insert(name)
+        for name in (
+            PhonebookGroup.objects.filter(
+                phonebook_entries__created_by_id=user_id, phonebook_entries__deleted_at__isnull=True
+            )
+            .values_list("name", flat=True)
+            .distinct()
+        ):
+            index.groups.insert(name)
+        return index
+
+    def set_entry(self, entry_id: int, name: str) -> None:
+        with self._lock:
+            old_name = self.entry_names.get(entry_id)
+            if old_name == name:
+                return
+            if old_name is not None:
+                self.entries.remove(old_name)
+            self.entry_names[entry_id] = name
+            self.entries.insert(name)
+
+    def remove_entry(self, entry_id: int) -> None:
+        with self._lock:
+            name = self.entry_names.pop(entry_id, None)
+            if name is not None:
+                self.entries.remove(name)
+
+    def complete(self, prefix: str, limit: int) -> list[Suggestion]:
+        with self._lock:
+            entries = self.entries.complete(prefix, limit)
+            groups = self.groups.complete(prefix, limit)
+        suggestions = [Suggestion(value=name, kind=SuggestionKindEnum.entry) for name in entries] + [
+            Suggestion(value=name, kind=SuggestionKindEnum.group) for name in groups
+        ]
+        return sorted(suggestions, key=lambda suggestion: suggestion.value.casefold())[:limit]
+
+
+_indexes: OrderedDict[int, AutocompleteIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_autocomplete_index(user_id: int) -> AutocompleteIndex:
+    """
+    Return index of the user, loading it on first use.
+
+    Indexes live in worker memory, the least recently used are dropped above ``PHONEBOOK_AUTOCOMPLETE_MAX_USERS``.
+    Changes are applied to indexes of the worker which made them, other workers reload indexes
+    older than ``PHONEBOOK_AUTOCOMPLETE_MAX_AGE`` seconds.
+    """
+    with _indexes_lock:
+        index = _indexes.get(user_id)
+        if index is not None and time.monotonic() - index.loaded_at < settings.PHONEBOOK_AUTOCOMPLETE_MAX_AGE:
+            _indexes.move_to_end(user_id)
+            return index
+    index = AutocompleteIndex.load(user_id)
+    with _indexes_lock:
+        _indexes[user_id] = index
+        _indexes.move_to_end(user_id)
+        while len(_indexes) > settings.PHONEBOOK_AUTOCOMPLETE_MAX_USERS:
+            _indexes.popitem(last=False)
+    return index
+
+
+def autocomplete(user_id: int, prefix: str, limit: int) -> list[Suggestion]:
+    if not prefix:
+        return []
+    return get_autocomplete_index(user_id).complete(prefix, limit)
+
+
+def entry_saved(user_id: int, entry_id: int, name: str) -> None:
+    index = _indexes.get(user_id)
+    if index is not None:
+        index.set_entry(entry_id, name)
+
+
+def entry_deleted(user_id: int, entry_id: int) -> None:
+    index = _indexes.get(user_id)
+    if index is not None:
+        index.remove_entry(entry_id)
+
+
+def invalidate(user_id: int | None = None) -> None:
+    """Drop index of the user, or all indexes, so they are reloaded on next use."""
+    with _indexes_lock:
+        if user_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(user_id, None)
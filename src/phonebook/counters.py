@@ -0,0 +1,92 @@
+import logging
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, QuerySet, Sum, TextChoices
+
+from phonebook.models import PhonebookEntry, PhonebookEntryCounter
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class CountModeEnum(TextChoices):
+    # Maintained counter, updated in the same transaction as entry create/delete.
+    exact = "exact"
+    # Planner estimate of table size from pg_class.reltuples, refreshed by (auto)vacuum/analyze.
+    approximate = "approximate"
+
+
+def add_to_entry_counter(user_id: int | None, delta: int) -> None:
+    """Add ``delta`` to the counter of ``user_id``, or to the counter of entries without owner when it is None."""
+    counters = _counters(user_id)
+    if counters.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            PhonebookEntryCounter.objects.create(user_id=user_id, count=_count_entries(user_id))
+    except IntegrityError:
+        # Counter was created by a concurrent transaction in the meantime.
+        counters.update(count=F("count") + delta)
+
+
+def get_entry_count(user: User | None = None, mode: str = CountModeEnum.exact) -> int:
+    """
+    Number of entries owned by ``user``, or of all entries when ``user`` is None.
+
+    Approximate mode is only available for the global count on Postgres, other cases fall back to the counter.
+    """
+    if mode == CountModeEnum.approximate and user is None:
+        estimate = approximate_table_count(PhonebookEntry._meta.db_table)
+        if estimate is not None:
+            return estimate
+    if user is None:
+        # Sum of the per-user counters, so inserts of different users do not update one shared row.
+        total = PhonebookEntryCounter.objects.aggregate(total=Sum("count"))["total"]
+        return PhonebookEntry.objects.count() if total is None else total
+    count = _counters(user.id).values_list("count", flat=True).first()
+    if count is None:
+        # Counter is created with the first entry of its user.
+        return _count_entries(user.id)
+    return count
+
+
+def disown_entry_counter(user_id: int) -> None:
+    """Move the count of ``user_id`` to the counter of entries without owner, entries of deleted users are kept."""
+    count = _counters(user_id).values_list("count", flat=True).first()
+    if count:
+        add_to_entry_counter(None, count)
+
+
+def approximate_table_count(table: str) -> int | None:
+    """Row estimate of ``table`` or None when it is not available, e.g. table was never analyzed."""
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+@transaction.atomic
+def recount_entry_counters() -> int:
+    """Recompute all counters from scratch. Returns number of counted entries."""
+    PhonebookEntryCounter.objects.all().delete()
+    per_user = PhonebookEntry.objects.values("created_by").annotate(entries=Count("id")).order_by()
+    counters = PhonebookEntryCounter.objects.bulk_create(
+        [PhonebookEntryCounter(user_id=row["created_by"], count=row["entries"]) for row in per_user]
+    )
+    total = sum(counter.count for counter in counters)
+    logger.info(f"Recounted {total} phonebook entries")
+    return total
+
+
+def _counters(user_id: int | None) -> QuerySet[PhonebookEntryCounter]:
+    if user_id is None:
+        return PhonebookEntryCounter.objects.filter(user__isnull=True)
+    return PhonebookEntryCounter.objects.filter(user_id=user_id)
+
+
+def _count_entries(user_id: int | None) -> int:
+    return PhonebookEntry.objects.filter(created_by_id=user_id).count()
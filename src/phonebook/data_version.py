@@ -0,0 +1,24 @@
+from django.core.cache import cache
+
+PHONEBOOK_DATA_VERSION_KEY = "phonebook:data-version"
+
+
+def owner_data_version_key(user_id: int) -> str:
+    return f"{PHONEBOOK_DATA_VERSION_KEY}:{user_id}"
+
+
+def get_phonebook_data_version(key: str = PHONEBOOK_DATA_VERSION_KEY) -> int:
+    return cache.get_or_set(key, 1, timeout=None) or 1
+
+
+def bump_phonebook_data_version(key: str = PHONEBOOK_DATA_VERSION_KEY) -> None:
+    """Invalidate everything cached against the current phonebook data version."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 2, timeout=None)
+
+
+def bump_owner_data_version(user_id: int) -> None:
+    """Invalidate everything cached against the data version of entries of ``user_id``."""
+    bump_phonebook_data_version(owner_data_version_key(user_id))
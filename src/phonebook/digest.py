@@ -0,0 +1,204 @@
+import hashlib
+import logging
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+
+from phonebook.lookups import cities, countries
+from phonebook.models import PhonebookDigestBucket, PhonebookEntry, PhonebookNumber
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+EMPTY_DIGEST = "0" * 64
+
+
+def xor_digests(*digests: str) -> str:
+    value = 0
+    for digest in digests:
+        value ^= int(digest or EMPTY_DIGEST, 16)
+    return f"{value:064x}"
+
+
+def entry_digest(entry: PhonebookEntry) -> str:
+    """
+    Hash entry content together with its numbers and group names.
+
+    Numbers and groups are read straight from the database so a stale prefetch cache
+    on ``entry`` can not leak into the digest.
+    """
+    numbers = sorted(
+        f"{number_type}:{number}"
+        for number_type, number in PhonebookNumber.objects.filter(phonebook_entry_id=entry.id).values_list(
+            "type", "number"
+        )
+    )
+    groups = sorted(entry.groups.values_list("name", flat=True))
+    parts = [
+        str(entry.id),
+        entry.name,
+        cities.get_name(entry.city_id),
+        entry.street,
+        entry.postal_code,
+        countries.get_name(entry.country_id),
+        entry.type,
+        ",".join(numbers),
+        ",".join(groups),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class DigestRange:
+    level: int
+    start_id: int
+    end_id: int
+    digest: str
+    entry_count: int
+
+
+class PhonebookDigestHandler:
+    """
+    Maintains and serves the per-user Merkle tree of phonebook entries.
+
+    Leaves are ``PhonebookDigestBucket`` rows covering ``PHONEBOOK_DIGEST_BUCKET_SIZE`` ids each
+    and are updated incrementally on every write. Inner nodes are hashed from the leaves on
+    request, so serving a digest never touches the entry table.
+    """
+
+    def __init__(self) -> None:
+        self.bucket_size: int = settings.PHONEBOOK_DIGEST_BUCKET_SIZE
+        self.fanout: int = settings.PHONEBOOK_DIGEST_FANOUT
+
+    @transaction.atomic
+    def refresh_entry(self, entry: PhonebookEntry) -> None:
+        if entry.created_by_id is None:
+            return
+        digest = entry_digest(entry)
+        if digest == entry.digest:
+            return
+        self._apply(
+            user_id=entry.created_by_id,
+            entry_id=entry.id,
+            old_digest=entry.digest,
+            new_digest=digest,
+            count_delta=0 if entry.digest else 1,
+        )
+        PhonebookEntry.objects.filter(id=entry.id).update(digest=digest)
+        entry.digest = digest
+
+    @transaction.atomic
+    def remove_entry(self, entry: PhonebookEntry) -> None:
+        if entry.created_by_id is None or not entry.digest:
+            return
+        self._apply(
+            user_id=entry.created_by_id,
+            entry_id=entry.id,
+            old_digest=entry.digest,
+            new_digest=EMPTY_DIGEST,
+            count_delta=-1,
+        )
+        entry.digest = ""
+
+    @transaction.atomic
+    def rebuild(self, user: User) -> int:
+        """Recompute every entry digest and leaf of ``user`` from scratch. Returns number of entries."""
+        PhonebookDigestBucket.objects.filter(user=user).delete()
+        buckets: dict[int, PhonebookDigestBucket] = {}
+        entries = PhonebookEntry.objects.filter(created_by=user).order_by("id")
+        for entry in entries.iterator():
+            entry.digest = entry_digest(entry)
+            bucket = buckets.setdefault(
+                entry.id // self.bucket_size,
+                PhonebookDigestBucket(user=user, bucket=entry.id // self.bucket_size, digest=EMPTY_DIGEST),
+            )
+            bucket.digest = xor_digests(bucket.digest, entry.digest)
+            bucket.entry_count += 1
+            PhonebookEntry.objects.filter(id=entry.id).update(digest=entry.digest)
+        PhonebookDigestBucket.objects.bulk_create(buckets.values())
+        count = sum(bucket.entry_count for bucket in buckets.values())
+        logger.info(f"Rebuilt phonebook digest for {user=}, {count=}")
+        return count
+
+    def get_root(self, user: User) -> DigestRange:
+        leaves = self._get_leaves(user)
+        height = self._height(leaves)
+        nodes = self._build_level(leaves, height)
+        if not nodes:
+            return DigestRange(level=height, start_id=0, end_id=self._span(height), digest=EMPTY_DIGEST, entry_count=0)
+        return nodes[0]
+
+    def get_ranges(
+        self, user: User, level: int, start_id: int | None = None, end_id: int | None = None
+    ) -> list[DigestRange]:
+        """Return non-empty nodes of ``level`` overlapping the ``[start_id, end_id)`` id range."""
+        leaves = self._get_leaves(user, start_id=start_id, end_id=end_id, level=level)
+        return [
+            node
+            for node in self._build_level(leaves, level)
+            if node.entry_count
+            and (start_id is None or node.end_id > start_id)
+            and (end_id is None or node.start_id < end_id)
+        ]
+
+    def _apply(self, user_id: int, entry_id: int, old_digest: str, new_digest: str, count_delta: int) -> None:
+        bucket, _ = PhonebookDigestBucket.objects.select_for_update().get_or_create(
+            user_id=user_id,
+            bucket=entry_id // self.bucket_size,
+            defaults={"digest": EMPTY_DIGEST},
+        )
+        bucket.digest = xor_digests(bucket.digest, old_digest, new_digest)
+        bucket.entry_count += count_delta
+        bucket.save(update_fields=["digest", "entry_count", "updated_at"])
+
+    def _span(self, level: int) -> int:
+        return self.bucket_size * self.fanout**level
+
+    def _height(self, leaves: dict[int, PhonebookDigestBucket]) -> int:
+        height = 0
+        last_bucket = max(leaves, default=0)
+        while last_bucket >= self.fanout**height:
+            height += 1
+        return height
+
+    def _get_leaves(
+        self, user: User, start_id: int | None = None, end_id: int | None = None, level: int = 0
+    ) -> dict[int, PhonebookDigestBucket]:
+        buckets = PhonebookDigestBucket.objects.filter(user=user, entry_count__gt=0)
+        span = self._span(level)
+        if start_id is not None:
+            buckets = buckets.filter(bucket__gte=(start_id // span) * span // self.bucket_size)
+        if end_id is not None:
+            buckets = buckets.filter(bucket__lt=-(-end_id // span) * span // self.bucket_size)
+        return {bucket.bucket: bucket for bucket in buckets}
+
+    def _build_level(self, leaves: dict[int, PhonebookDigestBucket], level: int) -> list[DigestRange]:
+        nodes = {
+            index: DigestRange(
+                level=0,
+                start_id=index * self.bucket_size,
+                end_id=(index + 1) * self.bucket_size,
+                digest=bucket.digest,
+                entry_count=bucket.entry_count,
+            )
+            for index, bucket in leaves.items()
+        }
+        for current_level in range(1, level + 1):
+            children: dict[int, list[tuple[int, DigestRange]]] = {}
+            for index, node in sorted(nodes.items()):
+                children.setdefault(index // self.fanout, []).append((index, node))
+            span = self._span(current_level)
+            nodes = {
+                index: DigestRange(
+                    level=current_level,
+                    start_id=index * span,
+                    end_id=(index + 1) * span,
+                    digest=hashlib.sha256(
+                        "".join(f"{child_index}:{child.digest};" for child_index, child in group).encode()
+                    ).hexdigest(),
+                    entry_count=sum(child.entry_count for _, child in group),
+                )
+                for index, group in children.items()
+            }
+        return [node for _, node in sorted(nodes.items())]
@@ -0,0 +1,213 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+from django.db.models import Q
+
+from phonebook.models import PhonebookEntry, PhonebookNumber
+from phonebook.normalization import normalize_number
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ZAIDIR03"
+# magic, built_at, counts of entries and numbers, offsets of entries and numbers sections.
+HEADER = struct.Struct("<8sd2I2Q")
+# entry id, owner id (0 when unset)
+ENTRY = struct.Struct("<QQ")
+# normalized number padded with NUL bytes, entry index
+NUMBER_KEY_SIZE = 20
+NUMBER = struct.Struct(f"<{NUMBER_KEY_SIZE}sI")
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    id: int
+    user_id: int | None
+
+
+def _number_key(number: str | None) -> bytes:
+    return normalize_number(number)[-NUMBER_KEY_SIZE:].encode().ljust(NUMBER_KEY_SIZE, b"\0")
+
+
+def build_directory_snapshot(path: Path) -> int:
+    """
+    Compile entries and their normalized numbers into a snapshot file at ``path``.
+
+    The file is written next to ``path`` and moved into place, so workers which still map
+    the previous snapshot keep reading it until they swap. Returns number of entries.
+    """
+    # Taken before reading, so writes racing with the build are looked up in the database, see Directory.
+    built_at = time.time()
+    entries = list(PhonebookEntry.objects.order_by("id").values_list("id", "created_by_id"))
+    entry_indexes = {entry_id: index for index, (entry_id, _) in enumerate(entries)}
+    entry_section = b"".join(ENTRY.pack(entry_id, user_id or 0) for entry_id, user_id in entries)
+
+    # Entries created after they were read are skipped, they are newer than built_at.
+    number_keys = sorted(
+        (_number_key(number), entry_indexes[entry_id])
+        for entry_id, number in PhonebookNumber.objects.filter(phonebook_entry__deleted_at__isnull=True).values_list(
+            "phonebook_entry_id", "number"
+        )
+        if entry_id in entry_indexes and normalize_number(number)
+    )
+    number_section = b"".join(NUMBER.pack(key, index) for key, index in number_keys)
+
+    sections = [entry_section, number_section]
+    offsets = []
+    offset = HEADER.size
+    for section in sections:
+        offsets.append(offset)
+        offset += len(section)
+    header = HEADER.pack(MAGIC, built_at, len(entries), len(number_keys), *offsets)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as snapshot:
+        snapshot.write(header)
+        for section in sections:
+            snapshot.write(section)
+        snapshot.flush()
+        os.fsync(snapshot.fileno())
+    tmp_path.replace(path)
+    logger.info(f"Built directory snapshot {path} with {len(entries)} entries")
+    return len(entries)
+
+
+class DirectorySnapshot:
+    """
+    Read-only view of a snapshot file built by ``build_directory_snapshot``.
+
+    The file is memory mapped, so all workers share the same page cache copy, and records
+    are decoded straight from the mapping on lookup.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as snapshot:
+            stat = os.fstat(snapshot.fileno())
+            self.file_id = (stat.st_ino, stat.st_mtime_ns)
+            self._mmap = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        (
+            magic,
+            self.built_at,
+            self.entry_count,
+            self.number_count,
+            self._entries_offset,
+            self._numbers_offset,
+        ) = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a directory snapshot")
+
+    def entry(self, index: int) -> SnapshotEntry:
+        entry_id, user_id = ENTRY.unpack_from(self._buffer, self._entries_offset + index * ENTRY.size)
+        return SnapshotEntry(id=entry_id, user_id=user_id or None)
+
+    def _number_record(self, position: int) -> tuple[bytes, int]:
+        return NUMBER.unpack_from(self._buffer, self._numbers_offset + position * NUMBER.size)
+
+    @staticmethod
+    def _lower_bound(count: int, key: bytes, record: Callable[[int], tuple[bytes, int]]) -> int:
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if record(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find_number(self, number: str) -> list[SnapshotEntry]:
+        key = _number_key(number)
+        entries = []
+        position = self._lower_bound(self.number_count, key, self._number_record)
+        while position < self.number_count:
+            record_key, index = self._number_record(position)
+            if record_key != key:
+                break
+            entries.append(self.entry(index))
+            position += 1
+        return entries
+
+
+class Directory:
+    """Snapshot of the directory of a worker, swapped for a new one when the snapshot file is rebuilt."""
+
+    def __init__(self, snapshot: DirectorySnapshot) -> None:
+        self.snapshot = snapshot
+
+    def swap(self, snapshot: DirectorySnapshot) -> None:
+        self.snapshot = snapshot
+
+    def find_number(self, number: str, user_id: int | None = None) -> list[SnapshotEntry]:
+        return [entry for entry in self.snapshot.find_number(number) if user_id is None or entry.user_id == user_id]
+
+    def find_entry_ids(self, number: str, user_id: int) -> list[int]:
+        """
+        Ids of entries of ``user_id`` with given number.
+
+        Snapshot misses writes made after it was built by any worker, so entries written since then
+        are looked up in the database as well and all candidates are checked against their current numbers.
+        """
+        changed_at = datetime.fromtimestamp(self.snapshot.built_at, tz=UTC)
+        candidate_ids = {entry.id for entry in self.find_number(number, user_id=user_id)}
+        candidate_ids.update(
+            PhonebookEntry.objects.filter(created_by_id=user_id)
+            .filter(Q(updated_at__gte=changed_at) | Q(phonebook_number__updated_at__gte=changed_at))
+            .values_list("id", flat=True)
+        )
+        key = normalize_number(number)
+        return sorted(
+            {
+                entry_id
+                for entry_id, entry_number in PhonebookNumber.objects.filter(
+                    phonebook_entry_id__in=candidate_ids, phonebook_entry__deleted_at__isnull=True
+                ).values_list("phonebook_entry_id", "number")
+                if key and normalize_number(entry_number) == key
+            }
+        )
+
+
+_directory: Directory | None = None
+_directory_checked_at = 0.0
+_directory_lock = threading.Lock()
+
+
+def get_directory() -> Directory | None:
+    """
+    Return directory of the current worker or None when no snapshot was built.
+
+    Snapshot file is checked for replacement at most every ``PHONEBOOK_SNAPSHOT_CHECK_INTERVAL``
+    seconds and a new snapshot is swapped in without blocking readers of the previous one.
+    """
+    global _directory, _directory_checked_at
+    if time.monotonic() - _directory_checked_at < settings.PHONEBOOK_SNAPSHOT_CHECK_INTERVAL:
+        return _directory
+    with _directory_lock:
+        _directory_checked_at = time.monotonic()
+        path = Path(settings.PHONEBOOK_SNAPSHOT_PATH)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return _directory
+        if _directory is not None and _directory.snapshot.file_id == (stat.st_ino, stat.st_mtime_ns):
+            return _directory
+        try:
+            snapshot = DirectorySnapshot(path)
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"Failed to load directory snapshot {path} {e}")
+            return _directory
+        if _directory is None:
+            _directory = Directory(snapshot)
+        else:
+            _directory.swap(snapshot)
+        logger.info(f"Loaded directory snapshot {path} with {snapshot.entry_count} entries")
+        return _directory
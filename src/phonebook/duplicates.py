@@ -0,0 +1,193 @@
+import itertools
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from phonebook.data_version import get_phonebook_data_version, owner_data_version_key
+from phonebook.models import PhonebookEntry, PhonebookNumber
+from phonebook.normalization import normalize_number, normalize_text
+from users.models import User
+
+# Signatures are split into BANDS bands of ROWS hashes, entries sharing any band are candidates.
+# Pairs with Jaccard similarity s are found with probability 1 - (1 - s**ROWS)**BANDS,
+# e.g. about 0.99 for s = 0.7 and 0.34 for s = 0.4.
+MINHASH_BANDS = 16
+MINHASH_ROWS = 4
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        zlib.crc32(f"a{i}".encode()) * 2654435761 % _MERSENNE_PRIME or 1,
+        zlib.crc32(f"b{i}".encode()) * 40503 % _MERSENNE_PRIME,
+    )
+    for i in range(MINHASH_BANDS * MINHASH_ROWS)
+]
+
+NUMBER_WEIGHT = 0.4
+NAME_WEIGHT = 0.4
+ADDRESS_WEIGHT = 0.2
+
+
+@dataclass(frozen=True)
+class EntryFeatures:
+    entry_id: int
+    numbers: frozenset[str]
+    name: frozenset[str]
+    address: frozenset[str]
+
+    @property
+    def shingles(self) -> frozenset[str]:
+        return (
+            frozenset(f"n:{number}" for number in self.numbers)
+            | frozenset(f"t:{gram}" for gram in self.name)
+            | frozenset(f"a:{gram}" for gram in self.address)
+        )
+
+
+@dataclass(frozen=True)
+class DuplicateGroup:
+    entry_ids: tuple[int, ...]
+    # Highest similarity of a pair of entries in the group.
+    score: float
+
+
+def trigrams(text: str) -> frozenset[str]:
+    text = normalize_text(text)
+    if len(text) < 3:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i : i + 3] for i in range(len(text) - 2))
+
+
+def minhash(shingles: frozenset[str]) -> tuple[int, ...]:
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingles]
+    return tuple(min((a * value + b) % _MERSENNE_PRIME for value in hashes) for a, b in _PERMUTATIONS)
+
+
+def candidate_pairs(features: list[EntryFeatures]) -> set[tuple[int, int]]:
+    """
+    Pairs of entry positions which may be duplicates.
+
+    Entries are put into one bucket per MinHash band and every shared normalized number,
+    only entries sharing a bucket are compared, so work grows with bucket sizes instead of
+    with the square of the number of entries. Entries without any shingles are not compared.
+    Numbers shared by more than ``PHONEBOOK_DUPLICATES_MAX_NUMBER_BUCKET`` entries, e.g. a switchboard,
+    do not tell duplicates apart and are skipped.
+    """
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+    for position, entry in enumerate(features):
+        shingles = entry.shingles
+        if not shingles:
+            continue
+        signature = minhash(shingles)
+        for band in range(MINHASH_BANDS):
+            buckets[(band, signature[band * MINHASH_ROWS : (band + 1) * MINHASH_ROWS])].append(position)
+        for number in entry.numbers:
+            buckets[("number", number)].append(position)
+    pairs: set[tuple[int, int]] = set()
+    max_number_bucket = settings.PHONEBOOK_DUPLICATES_MAX_NUMBER_BUCKET
+    for key, positions in buckets.items():
+        if key[0] == "number" and len(positions) > max_number_bucket:
+            continue
+        pairs.update(itertools.combinations(positions, 2))
+    return pairs
+
+
+def _jaccard(left: frozenset[str], right: frozenset[str]) -> float:
+    union = len(left | right)
+    return len(left & right) / union if union else 0.0
+
+
+def score_pairs(features: list[EntryFeatures], pairs: list[tuple[int, int]]) -> list[float]:
+    """
+    Weighted similarity of numbers, name and address of each pair.
+
+    Numbers are only weighed when both entries have some, a missing number is not a difference.
+    """
+    scores = []
+    for left, right in pairs:
+        left_features, right_features = features[left], features[right]
+        score = NAME_WEIGHT * _jaccard(left_features.name, right_features.name) + ADDRESS_WEIGHT * _jaccard(
+            left_features.address, right_features.address
+        )
+        weight = NAME_WEIGHT + ADDRESS_WEIGHT
+        if left_features.numbers and right_features.numbers:
+            score += NUMBER_WEIGHT * _jaccard(left_features.numbers, right_features.numbers)
+            weight += NUMBER_WEIGHT
+        scores.append(score / weight)
+    return scores
+
+
+def load_entry_features(user: User) -> list[EntryFeatures]:
+    numbers: dict[int, set[str]] = defaultdict(set)
+    for entry_id, number in PhonebookNumber.objects.filter(phonebook_entry__created_by=user).values_list(
+        "phonebook_entry_id", "number"
+    ):
+        if normalized := normalize_number(number):
+            numbers[entry_id].add(normalized)
+    return [
+        EntryFeatures(
+            entry_id=entry_id,
+            numbers=frozenset(numbers[entry_id]),
+            name=trigrams(name),
+            address=trigrams(" ".join([street, postal_code, city, country])),
+        )
+        for entry_id, name, street, postal_code, city, country in PhonebookEntry.objects.filter(created_by=user)
+        .order_by("id")
+        .values_list("id", "name", "street", "postal_code", "city__name", "country__name")
+    ]
+
+
+def get_duplicate_entries(user: User, threshold: float | None = None) -> list[DuplicateGroup]:
+    """``find_duplicate_entries`` cached until user's entries, their numbers or groups change."""
+    threshold = settings.PHONEBOOK_DUPLICATES_THRESHOLD if threshold is None else threshold
+    # Clamped and rounded, so clients can not fill the cache with a key per float value.
+    threshold = round(min(max(threshold, 0.0), 1.0), 2)
+    cache_key = f"phonebook:duplicates:{user.id}:{threshold}"
+    version_key = owner_data_version_key(user.id)
+    cached = cache.get_many([version_key, cache_key])
+    version = cached.get(version_key) or get_phonebook_data_version(version_key)
+    if cache_key in cached and cached[cache_key][0] == version:
+        return cached[cache_key][1]
+    groups = find_duplicate_entries(user, threshold)
+    cache.set(cache_key, (version, groups), timeout=settings.PHONEBOOK_DUPLICATES_CACHE_TIMEOUT)
+    return groups
+
+
+def find_duplicate_entries(user: User, threshold: float | None = None) -> list[DuplicateGroup]:
+    """Groups of user's entries which are likely duplicates of each other, largest groups first."""
+    threshold = settings.PHONEBOOK_DUPLICATES_THRESHOLD if threshold is None else threshold
+    features = load_entry_features(user)
+    pairs = sorted(candidate_pairs(features))
+
+    parents = list(range(len(features)))
+    scores: dict[int, float] = {}
+
+    def find(position: int) -> int:
+        while parents[position] != position:
+            parents[position] = parents[parents[position]]
+            position = parents[position]
+        return position
+
+    batch_size = settings.PHONEBOOK_DUPLICATES_BATCH_SIZE
+    for start in range(0, len(pairs), batch_size):
+        batch = pairs[start : start + batch_size]
+        for (left, right), score in zip(batch, score_pairs(features, batch)):
+            if score < threshold:
+                continue
+            left_root, right_root = find(left), find(right)
+            parents[right_root] = left_root
+            scores[left_root] = max(score, scores.get(left_root, 0.0), scores.get(right_root, 0.0))
+
+    groups: dict[int, list[int]] = defaultdict(list)
+    for position, entry in enumerate(features):
+        groups[find(position)].append(entry.entry_id)
+    return sorted(
+        (
+            DuplicateGroup(entry_ids=tuple(entry_ids), score=round(scores[root], 4))
+            for root, entry_ids in groups.items()
+            if len(entry_ids) > 1
+        ),
+        key=lambda group: (-len(group.entry_ids), -group.score, group.entry_ids),
+    )
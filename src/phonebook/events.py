@@ -0,0 +1,22 @@
+from django.db import models, transaction
+
+from api.broker import get_broker
+
+PHONEBOOK_EVENTS_CHANNEL = "phonebook"
+
+
+class PhonebookEventKindEnum(models.TextChoices):
+    created = "created"
+    updated = "updated"
+    deleted = "deleted"
+    rated = "rated"
+
+
+def publish_entry_event(kind: PhonebookEventKindEnum, entry_id: int, created_by_id: int | None, **extra: int) -> None:
+    """
+    Publish phonebook entry change to subscribers once the current transaction commits.
+
+    Subscribers only receive events of entries they own, see ``created_by_id``.
+    """
+    message = {"kind": kind.value, "entry_id": entry_id, "created_by_id": created_by_id, **extra}
+    transaction.on_commit(lambda: get_broker().publish(PHONEBOOK_EVENTS_CHANNEL, message))
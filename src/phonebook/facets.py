@@ -0,0 +1,96 @@
+import hashlib
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from phonebook.data_version import PHONEBOOK_DATA_VERSION_KEY, get_phonebook_data_version
+from phonebook.exceptions import PhonebookError
+from phonebook.filters import PhonebookFilterSet
+from phonebook.lookups import cities, countries
+from phonebook.models import PhonebookEntry
+
+FACET_FIELDS = ("type", "city", "country", "group")
+
+
+@dataclass(frozen=True)
+class FacetCount:
+    value: str
+    count: int
+
+
+@dataclass(frozen=True)
+class PhonebookFacets:
+    total: int
+    facets: dict[str, list[FacetCount]] = field(default_factory=dict)
+
+
+def get_phonebook_facets(filters: dict[str, Any]) -> PhonebookFacets:
+    """
+    Entry counts per type, city, country and group of entries matching ``PhonebookFilterSet`` filters.
+
+    Results are cached per filter and phonebook data version. Cached result and current version are
+    fetched together, so a cache hit costs a single cache round trip.
+    """
+    filters = {key: value for key, value in filters.items() if value not in (None, "")}
+    cache_key = "phonebook:facets:" + hashlib.sha256(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    cached = cache.get_many([PHONEBOOK_DATA_VERSION_KEY, cache_key])
+    version = cached.get(PHONEBOOK_DATA_VERSION_KEY) or get_phonebook_data_version()
+    if cache_key in cached and cached[cache_key][0] == version:
+        return cached[cache_key][1]
+    facets = compute_phonebook_facets(filters)
+    cache.set(cache_key, (version, facets), timeout=settings.PHONEBOOK_FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+def compute_phonebook_facets(filters: dict[str, Any]) -> PhonebookFacets:
+    """Count facets of filtered entries in a single GROUPING SETS query."""
+    filterset = PhonebookFilterSet(data=filters, queryset=PhonebookEntry.objects.all())
+    if not filterset.is_valid():
+        raise PhonebookError(reason="Invalid facets filter!")
+    filtered_sql, filtered_params = filterset.qs.order_by().values("id").query.sql_with_params()
+
+    qn = connection.ops.quote_name
+    sql = f"""
+        SELECT
+            e.type, e.city_id, e.country_id, g.name,
+            GROUPING(e.type, e.city_id, e.country_id, g.name), COUNT(DISTINCT e.id)
+        FROM {qn(PhonebookEntry._meta.db_table)} e
+        LEFT JOIN LATERAL unnest(e.group_names) AS g(name) ON true
+        WHERE e.id IN ({filtered_sql})
+        GROUP BY GROUPING SETS ((e.type), (e.city_id), (e.country_id), (g.name), ())
+    """
+    # GROUPING() sets a bit for every column which is not part of the grouping set of the row.
+    grouping_to_facet = {0b0111: "type", 0b1011: "city", 0b1101: "country", 0b1110: "group"}
+    total = 0
+    facets: dict[str, list[FacetCount]] = defaultdict(list)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, filtered_params)
+        rows = cursor.fetchall()
+    # Cities and countries are grouped by id and named from lookup caches.
+    city_names = cities.get_names(city_id for _, city_id, _, _, _, _ in rows if city_id is not None)
+    country_names = countries.get_names(country_id for _, _, country_id, _, _, _ in rows if country_id is not None)
+    for entry_type, city_id, country_id, group, grouping, count in rows:
+        if grouping == 0b1111:
+            total = count
+            continue
+        facet = grouping_to_facet[grouping]
+        value = {
+            "type": entry_type,
+            "city": city_names.get(city_id),
+            "country": country_names.get(country_id),
+            "group": group,
+        }[facet]
+        if value is not None:
+            facets[facet].append(FacetCount(value=value, count=count))
+    return PhonebookFacets(
+        total=total,
+        facets={
+            facet: sorted(facets[facet], key=lambda facet_count: (-facet_count.count, facet_count.value))
+            for facet in FACET_FIELDS
+        },
+    )
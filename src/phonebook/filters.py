@@ -1,18 +1,72 @@
-from django_filters import CharFilter, FilterSet, OrderingFilter
+from django.db.models import Q, QuerySet
+from django_filters import BaseInFilter, CharFilter, FilterSet, NumberFilter, OrderingFilter
+from django_filters.constants import EMPTY_VALUES
 
 from model_utils import SearchableFilterSetMixin
+from phonebook.lookups import cities, countries
 from phonebook.models import PhonebookEntry
 
 
+class CharInFilter(BaseInFilter, CharFilter):
+    pass
+
+
+class StableOrderingFilter(OrderingFilter):
+    """Ordering with ``id`` as the last key, so entries with equal values keep their position between pages."""
+
+    def filter(self, qs: QuerySet, value: list[str]) -> QuerySet:
+        if value in EMPTY_VALUES:
+            return qs
+        ordering = [self.get_ordering_value(param) for param in value if param not in EMPTY_VALUES]
+        return qs.order_by(*ordering, "id")
+
+
 class PhonebookFilterSet(SearchableFilterSetMixin, FilterSet):
     class Meta:
         model = PhonebookEntry
-        fields = {"type": ["exact"], "city": ["exact"]}
+        fields = {"type": ["exact"]}
 
-    search_fields: list[str] = ["name", "city", "groups__name", "slug"]
+    search_fields: list[str] = ["name", "slug"]
     search = CharFilter(method="search_filter")
-    order_by = OrderingFilter(
+    # Names are resolved to ids by phonebook.lookups, so entries are filtered by an integer column.
+    city = CharFilter(method="city_filter")
+    country = CharFilter(method="country_filter")
+    # Group names are stored lower case, see PhonebookHandler.create, and matched with the GIN index of group_names.
+    group = CharFilter(method="group_filter")
+    groups_any = CharInFilter(method="groups_any_filter")
+    groups_all = CharInFilter(method="groups_all_filter")
+    id_gte = NumberFilter(field_name="id", lookup_expr="gte")
+    id_lt = NumberFilter(field_name="id", lookup_expr="lt")
+    order_by = StableOrderingFilter(
         fields={
             "created_at": "created_at",
+            "rating_score": "rating",
         }
     )
+
+    def search_query(self, value: str) -> Q:
+        # Cities and groups match by whole name, so neither a join nor a LIKE over group_names is needed.
+        q = super().search_query(value) | Q(group_names__contains=[value.lower()])
+        city_id = cities.find_id(value)
+        return q | Q(city_id=city_id) if city_id is not None else q
+
+    def city_filter(self, queryset: QuerySet[PhonebookEntry], name: str, value: str) -> QuerySet[PhonebookEntry]:
+        city_id = cities.find_id(value)
+        return queryset.filter(city_id=city_id) if city_id is not None else queryset.none()
+
+    def country_filter(self, queryset: QuerySet[PhonebookEntry], name: str, value: str) -> QuerySet[PhonebookEntry]:
+        country_id = countries.find_id(value)
+        return queryset.filter(country_id=country_id) if country_id is not None else queryset.none()
+
+    def group_filter(self, queryset: QuerySet[PhonebookEntry], name: str, value: str) -> QuerySet[PhonebookEntry]:
+        return queryset.filter(group_names__contains=[value.lower()])
+
+    def groups_any_filter(
+        self, queryset: QuerySet[PhonebookEntry], name: str, value: list[str]
+    ) -> QuerySet[PhonebookEntry]:
+        return queryset.filter(group_names__overlap=[group.lower() for group in value])
+
+    def groups_all_filter(
+        self, queryset: QuerySet[PhonebookEntry], name: str, value: list[str]
+    ) -> QuerySet[PhonebookEntry]:
+        return queryset.filter(group_names__contains=[group.lower() for group in value])
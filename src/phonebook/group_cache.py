@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from phonebook.models import PhonebookGroup
+
+PHONEBOOK_GROUP_CACHE_VERSION_KEY = "phonebook:group-cache-version"
+
+_group_ids: OrderedDict[str, int] = OrderedDict()
+_group_ids_lock = threading.Lock()
+_version: int | None = None
+_checked_at = float("-inf")
+
+
+def _check_version() -> None:
+    """Drop cached ids when another worker renamed or deleted a group, at most every CHECK_INTERVAL seconds."""
+    global _version, _checked_at
+    if time.monotonic() - _checked_at < settings.PHONEBOOK_GROUP_CACHE_CHECK_INTERVAL:
+        return
+    version = cache.get(PHONEBOOK_GROUP_CACHE_VERSION_KEY)
+    with _group_ids_lock:
+        if version != _version:
+            _group_ids.clear()
+            _version = version
+        _checked_at = time.monotonic()
+
+
+def _remember(group_ids: dict[str, int]) -> None:
+    # Ids read inside a transaction may belong to rows it created, they are cached only once it commits.
+    transaction.on_commit(partial(_store, group_ids))
+
+
+def _store(group_ids: dict[str, int]) -> None:
+    with _group_ids_lock:
+        _group_ids.update(group_ids)
+        for name in group_ids:
+            _group_ids.move_to_end(name)
+        while len(_group_ids) > settings.PHONEBOOK_GROUP_CACHE_SIZE:
+            _group_ids.popitem(last=False)
+
+
+def _cached(names: Iterable[str]) -> dict[str, int]:
+    _check_version()
+    with _group_ids_lock:
+        found = {}
+        for name in names:
+            if (group_id := _group_ids.get(name)) is not None:
+                _group_ids.move_to_end(name)
+                found[name] = group_id
+        return found
+
+
+def get_group_ids(names: Iterable[str]) -> list[int]:
+    """
+    Ids of groups with given names, lower cased, creating missing groups.
+
+    Ids are cached per worker once the current transaction commits, missing names are resolved
+    with a single ``INSERT ... ON CONFLICT (name) DO UPDATE ... RETURNING id``, so concurrent
+    requests creating the same group get the same id instead of an ``IntegrityError``.
+    """
+    names = list(dict.fromkeys(name.lower() for name in names))
+    group_ids = _cached(names)
+    missing = [name for name in names if name not in group_ids]
+    if missing:
+        groups = PhonebookGroup.objects.bulk_create(
+            [PhonebookGroup(name=name) for name in missing],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["name"],
+        )
+        created = {group.name: group.id for group in groups}
+        _remember(created)
+        group_ids.update(created)
+    return [group_ids[name] for name in names]
+
+
+def get_group_id(name: str) -> int:
+    return get_group_ids([name])[0]
+
+
+def find_group_id(name: str) -> int | None:
+    """Id of an existing group with given name, without creating it."""
+    if group_id := _cached([name]).get(name):
+        return group_id
+    group_id = PhonebookGroup.objects.filter(name=name).values_list("id", flat=True).first()
+    if group_id is not None:
+        _remember({name: group_id})
+    return group_id
+
+
+def clear() -> None:
+    """Drop cached ids of this worker only."""
+    global _checked_at
+    with _group_ids_lock:
+        _group_ids.clear()
+        _checked_at = float("-inf")
+
+
+def invalidate() -> None:
+    """Drop cached ids of this worker and make other workers drop theirs on next version check."""
+    global _version
+    try:
+        version = cache.incr(PHONEBOOK_GROUP_CACHE_VERSION_KEY)
+    except ValueError:
+        version = 1
+        cache.set(PHONEBOOK_GROUP_CACHE_VERSION_KEY, version, timeout=None)
+    with _group_ids_lock:
+        _group_ids.clear()
+        _version = version
@@ -0,0 +1,21 @@
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import OuterRef, QuerySet
+
+from phonebook.models import PhonebookEntry, PhonebookGroup
+
+
+def sync_entry_group_names(entry: PhonebookEntry) -> None:
+    """Copy names of entry's groups into ``group_names`` of the row and of the instance."""
+    entry.group_names = list(
+        PhonebookGroup.objects.filter(phonebook_entries=entry).order_by("id").values_list("name", flat=True)
+    )
+    PhonebookEntry.all_objects.filter(id=entry.id).update(group_names=entry.group_names)
+
+
+def sync_group_names(entries: QuerySet[PhonebookEntry]) -> int:
+    """Recompute ``group_names`` of many entries with a single ``UPDATE``, e.g. after a group was renamed."""
+    return entries.update(
+        group_names=ArraySubquery(
+            PhonebookGroup.objects.filter(phonebook_entries=OuterRef("pk")).order_by("id").values("name")
+        )
+    )
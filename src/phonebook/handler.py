@@ -1,15 +1,36 @@
 import logging
+from collections import Counter
 from dataclasses import dataclass
+from datetime import date
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
 
+from phonebook.digest import PhonebookDigestHandler
+from phonebook.events import PhonebookEventKindEnum, publish_entry_event
 from phonebook.exceptions import PhonebookError
-from phonebook.models import PhonebookEntry, PhonebookEntryRating, PhonebookGroup, PhonebookNumber
+from phonebook.group_cache import find_group_id, get_group_id, get_group_ids
+from phonebook.lookups import cities, countries
+from phonebook.models import (
+    PhonebookEntry,
+    PhonebookEntryRating,
+    PhonebookEntryRatingSummary,
+    PhonebookNumber,
+)
+from phonebook.normalization import normalize_number
+from phonebook.purge import hard_delete_entries
+from phonebook.rating_aggregates import add_to_rating_aggregates
+from phonebook.rating_buffer import get_rating_buffer
 from users.models import User
 
 logger = logging.getLogger(__name__)
 
+# Validated by phonebook.lookups, full_clean would query every referenced row again.
+LOOKUP_FIELDS = ["city", "country"]
+
 
 @dataclass(frozen=True)
 class AddPhonebookEntryNumberData:
@@ -34,25 +55,23 @@ class PhonebookHandler:
         try:
             phonebook_entry = PhonebookEntry.objects.create(
                 name=name,
-                city=city,
+                city_id=cities.get_id(city),
                 street=street,
                 postal_code=postal_code,
-                country=country,
+                country_id=countries.get_id(country),
                 type=type,
                 created_by=created_by,
             )
-            phonebook_entry.full_clean()
-            group_list = []
-            for group in groups:
-                phonebook_group, _ = PhonebookGroup.objects.get_or_create(name=group.lower())
-                group_list.append(phonebook_group)
-            phonebook_entry.groups.set(group_list)
+            phonebook_entry.full_clean(exclude=LOOKUP_FIELDS)
+            phonebook_entry.groups.set(get_group_ids(groups))
             for number in numbers:
                 PhonebookNumber.objects.create(
                     phonebook_entry=phonebook_entry,
                     type=number.number_type,
                     number=number.number,
                 )
+            PhonebookDigestHandler().refresh_entry(phonebook_entry)
+            publish_entry_event(PhonebookEventKindEnum.created, phonebook_entry.id, created_by.id)
         except ValidationError as e:
             logger.warning(f"Error while creating phonebook entry {e}")
             raise PhonebookError(reason="Error while creating phonebook entry!")
@@ -80,7 +99,7 @@ class PhonebookHandler:
                 entry.name = name
                 fields_to_update.append("name")
             if city:
-                entry.city = city
+                entry.city_id = cities.get_id(city)
                 fields_to_update.append("city")
             if street:
                 entry.street = street
@@ -89,13 +108,15 @@ class PhonebookHandler:
                 entry.postal_code = postal_code
                 fields_to_update.append("postal_code")
             if country:
-                entry.country = country
+                entry.country_id = countries.get_id(country)
                 fields_to_update.append("country")
             if type:
                 entry.type = type
                 fields_to_update.append("type")
-            entry.full_clean()
+            entry.full_clean(exclude=LOOKUP_FIELDS)
             entry.save(update_fields=fields_to_update)
+            PhonebookDigestHandler().refresh_entry(entry)
+            publish_entry_event(PhonebookEventKindEnum.updated, entry.id, entry.created_by_id)
         except (PhonebookEntry.DoesNotExist, ValidationError) as e:
             logger.error(f"Failed to update entry {e}")
             raise PhonebookError(reason="Failed to update entry!") from e
@@ -107,25 +128,62 @@ class PhonebookHandler:
         user: User,
         entry_id: int,
     ) -> None:
+        if settings.PHONEBOOK_FAST_DELETE or settings.PHONEBOOK_SOFT_DELETE:
+            self.delete_many(user=user, entry_ids=[entry_id])
+            return
         try:
             entry = PhonebookEntry.objects.get(id=entry_id)
             if entry.created_by != user:
                 logger.error("Failed to update entry")
                 raise PhonebookError(reason="You are not owner of this entry")
+            PhonebookDigestHandler().remove_entry(entry)
+            publish_entry_event(PhonebookEventKindEnum.deleted, entry.id, entry.created_by_id)
             entry.delete()
         except PhonebookEntry.DoesNotExist as e:
             logger.error(f"Failed to delete entry {e}")
             raise PhonebookError(reason="Entry with given id does not exists!") from e
 
+    @transaction.atomic
+    def delete_many(self, user: User, entry_ids: list[int]) -> int:
+        """
+        Delete entries with set-based statements instead of Django's delete collector.
+
+        With ``PHONEBOOK_SOFT_DELETE`` entries are only marked as deleted with a single ``UPDATE``
+        and hard deleted later by ``manage.py purge_deleted_entries``. Delete signals of entries are
+        sent here in both modes, so counters and caches are kept up to date. Returns number of deleted entries.
+        """
+        entry_ids = sorted(set(entry_ids))
+        entries = list(PhonebookEntry.objects.select_for_update().filter(id__in=entry_ids))
+        if len(entries) != len(entry_ids):
+            logger.error(f"Failed to delete entries {entry_ids}, some do not exist")
+            raise PhonebookError(reason="Entry with given id does not exists!")
+        if any(entry.created_by_id != user.id for entry in entries):
+            logger.error("Failed to delete entries")
+            raise PhonebookError(reason="You are not owner of this entry")
+
+        digest_handler = PhonebookDigestHandler()
+        for entry in entries:
+            digest_handler.remove_entry(entry)
+            publish_entry_event(PhonebookEventKindEnum.deleted, entry.id, entry.created_by_id)
+            pre_delete.send(sender=PhonebookEntry, instance=entry, using=entry._state.db, origin=entry)
+        if settings.PHONEBOOK_SOFT_DELETE:
+            PhonebookEntry.objects.filter(id__in=entry_ids).update(deleted_at=timezone.now())
+        else:
+            hard_delete_entries(entry_ids)
+        for entry in entries:
+            post_delete.send(sender=PhonebookEntry, instance=entry, using=entry._state.db, origin=entry)
+        return len(entries)
+
     @transaction.atomic
     def add_to_group(self, user: User, entry_id: int, group: str) -> PhonebookEntry:
         try:
-            entry = PhonebookEntry.objects.get(id=entry_id)
+            entry = PhonebookEntry.objects.select_for_update().get(id=entry_id)
             if entry.created_by != user:
                 logger.error("Failed to update entry")
                 raise PhonebookError(reason="You are not owner of this entry")
-            phonebook_group, _ = PhonebookGroup.objects.get_or_create(name=group.lower())
-            entry.groups.add(phonebook_group)
+            entry.groups.add(get_group_id(group))
+            PhonebookDigestHandler().refresh_entry(entry)
+            publish_entry_event(PhonebookEventKindEnum.updated, entry.id, entry.created_by_id)
             return entry
         except PhonebookEntry.DoesNotExist as e:
             logger.error(f"Failed to add entry to group {e}")
@@ -134,13 +192,18 @@ class PhonebookHandler:
     @transaction.atomic
     def remove_from_group(self, user: User, entry_id: int, group: str) -> None:
         try:
-            entry = PhonebookEntry.objects.get(id=entry_id)
+            entry = PhonebookEntry.objects.select_for_update().get(id=entry_id)
             if entry.created_by != user:
                 logger.error("Failed to update entry")
                 raise PhonebookError(reason="You are not owner of this entry")
-            phonebook_group = PhonebookGroup.objects.get(name=group)
-            entry.groups.remove(phonebook_group)
-        except (PhonebookEntry.DoesNotExist, PhonebookGroup.DoesNotExist) as e:
+            group_id = find_group_id(group)
+            if group_id is None:
+                logger.error(f"Failed to delete entry group {group}, group does not exist")
+                raise PhonebookError(reason="Failed to delete entry group!")
+            entry.groups.remove(group_id)
+            PhonebookDigestHandler().refresh_entry(entry)
+            publish_entry_event(PhonebookEventKindEnum.updated, entry.id, entry.created_by_id)
+        except PhonebookEntry.DoesNotExist as e:
             logger.error(f"Failed to delete entry group {e}")
             raise PhonebookError(reason="Failed to delete entry group!") from e
 
@@ -157,6 +220,8 @@ class PhonebookHandler:
                 number=number,
             )
             phonebook_number.full_clean()
+            PhonebookDigestHandler().refresh_entry(entry)
+            publish_entry_event(PhonebookEventKindEnum.updated, entry.id, entry.created_by_id)
             return entry
         except (PhonebookEntry.DoesNotExist, ValidationError) as e:
             logger.error(f"Failed to add entry number {e}")
@@ -165,9 +230,16 @@ class PhonebookHandler:
     @transaction.atomic
     def remove_number(self, entry_number_id: int, user: User) -> PhonebookEntry:
         try:
-            number = PhonebookNumber.objects.select_related("phonebook_entry__created_by").get(id=entry_number_id)
+            # Base manager of numbers does not skip numbers of soft deleted entries.
+            number = PhonebookNumber.objects.select_related("phonebook_entry__created_by").get(
+                id=entry_number_id, phonebook_entry__deleted_at__isnull=True
+            )
             if number.phonebook_entry.created_by == user:
                 number.delete()
+                PhonebookDigestHandler().refresh_entry(number.phonebook_entry)
+                publish_entry_event(
+                    PhonebookEventKindEnum.updated, number.phonebook_entry.id, number.phonebook_entry.created_by_id
+                )
             else:
                 logger.error("Failed to remove entry number")
                 raise PhonebookError(reason="You are not owner of this entry")
@@ -180,14 +252,126 @@ class PhonebookHandler:
     def add_rating(self, entry_id: int, rate: int, user: User) -> PhonebookEntry:
         try:
             entry = PhonebookEntry.objects.get(id=entry_id)
-            if not (0 <= rate <= 6):
-                raise PhonebookError(reason="Invalid rating range. Range is 0 to 6")
+            self._validate_rate(rate)
             PhonebookEntryRating.objects.create(
                 phonebook_entry=entry,
                 rate=rate,
                 created_by=user,
             )
+            add_to_rating_aggregates({entry.id: (rate, 1)})
+            entry.refresh_from_db(fields=["rating_sum", "rating_count", "rating_score"])
+            publish_entry_event(PhonebookEventKindEnum.rated, entry.id, entry.created_by_id, rate=rate)
             return entry
         except PhonebookEntry.DoesNotExist as e:
             logger.error(f"Failed to add entry rating {e}")
             raise PhonebookError(reason="Failed to add entry rating!") from e
+
+    @transaction.atomic
+    def merge(self, user: User, target_id: int, source_ids: list[int]) -> PhonebookEntry:
+        """
+        Merge source entries into the target entry and delete them.
+
+        Numbers, ratings, rating summaries and group links of sources are moved to the target
+        with set-based statements, numbers already present on the target are dropped and
+        rating aggregates of the target are increased by those of sources.
+        """
+        source_ids = sorted(set(source_ids) - {target_id})
+        if not source_ids:
+            raise PhonebookError(reason="No entries to merge!")
+        entries = {
+            entry.id: entry
+            for entry in PhonebookEntry.objects.select_for_update().filter(id__in=[target_id, *source_ids])
+        }
+        if len(entries) != len(source_ids) + 1:
+            logger.error(f"Failed to merge entries {source_ids} into {target_id}, some do not exist")
+            raise PhonebookError(reason="Entry with given id does not exists!")
+        if any(entry.created_by_id != user.id for entry in entries.values()):
+            logger.error("Failed to merge entries")
+            raise PhonebookError(reason="You are not owner of this entry")
+        target = entries[target_id]
+
+        seen_numbers = {
+            (normalize_number(number), number_type)
+            for number, number_type in PhonebookNumber.objects.filter(phonebook_entry_id=target_id).values_list(
+                "number", "type"
+            )
+        }
+        duplicate_number_ids = []
+        for number_id, number, number_type in (
+            PhonebookNumber.objects.filter(phonebook_entry_id__in=source_ids)
+            .order_by("id")
+            .values_list("id", "number", "type")
+        ):
+            key = (normalize_number(number), number_type)
+            if key in seen_numbers:
+                duplicate_number_ids.append(number_id)
+            seen_numbers.add(key)
+        PhonebookNumber.objects.filter(id__in=duplicate_number_ids).delete()
+        PhonebookNumber.objects.filter(phonebook_entry_id__in=source_ids).update(phonebook_entry_id=target_id)
+
+        PhonebookEntryRating.objects.filter(phonebook_entry_id__in=source_ids).update(phonebook_entry_id=target_id)
+        self._merge_rating_summaries(target_id, source_ids)
+        rating_sum = sum(entries[source_id].rating_sum for source_id in source_ids)
+        rating_count = sum(entries[source_id].rating_count for source_id in source_ids)
+        if rating_count:
+            add_to_rating_aggregates({target_id: (rating_sum, rating_count)})
+
+        # INSERT ... ON CONFLICT DO NOTHING, links the target already has are skipped.
+        target.groups.add(
+            *PhonebookEntry.groups.through.objects.filter(phonebookentry_id__in=source_ids)
+            .values_list("phonebookgroup_id", flat=True)
+            .distinct()
+        )
+
+        digest_handler = PhonebookDigestHandler()
+        for source_id in source_ids:
+            digest_handler.remove_entry(entries[source_id])
+            publish_entry_event(PhonebookEventKindEnum.deleted, source_id, user.id)
+        PhonebookEntry.objects.filter(id__in=source_ids).delete()
+
+        target.refresh_from_db()
+        target.save(update_fields=["updated_at"])
+        digest_handler.refresh_entry(target)
+        publish_entry_event(PhonebookEventKindEnum.updated, target_id, user.id)
+        logger.info(f"Merged entries {source_ids} into {target_id}")
+        return target
+
+    @staticmethod
+    def _merge_rating_summaries(target_id: int, source_ids: list[int]) -> None:
+        totals: dict[date, PhonebookEntryRatingSummary] = {}
+        for summary in PhonebookEntryRatingSummary.objects.select_for_update().filter(
+            phonebook_entry_id__in=[target_id, *source_ids]
+        ):
+            merged = totals.setdefault(
+                summary.day, PhonebookEntryRatingSummary(phonebook_entry_id=target_id, day=summary.day)
+            )
+            merged.rate_sum += summary.rate_sum
+            merged.rate_count += summary.rate_count
+            merged.histogram = dict(Counter(merged.histogram) + Counter(summary.histogram))
+        PhonebookEntryRatingSummary.objects.filter(phonebook_entry_id__in=source_ids).delete()
+        # INSERT ... ON CONFLICT (phonebook_entry_id, day) DO UPDATE, totals already include target summaries.
+        PhonebookEntryRatingSummary.objects.bulk_create(
+            list(totals.values()),
+            update_conflicts=True,
+            unique_fields=["phonebook_entry", "day"],
+            update_fields=["rate_sum", "rate_count", "histogram"],
+        )
+
+    def buffer_rating(self, entry_id: int, rate: int, user: User) -> None:
+        """
+        Queue rating in the worker rating buffer instead of writing it right away.
+
+        Only the rating range and entry existence are checked, the vote and entry aggregates
+        are written in bulk when the buffer is flushed.
+        """
+        self._validate_rate(rate)
+        if not PhonebookEntry.objects.filter(id=entry_id).exists():
+            logger.error(f"Failed to add entry rating, entry {entry_id} does not exist")
+            raise PhonebookError(reason="Failed to add entry rating!")
+        get_rating_buffer().add(entry_id=entry_id, rate=rate, user_id=user.id)
+
+    @staticmethod
+    def _validate_rate(rate: int) -> None:
+        min_rate, max_rate = settings.PHONEBOOK_RATING_MIN, settings.PHONEBOOK_RATING_MAX
+        if not (min_rate <= rate <= max_rate):
+            raise PhonebookError(reason=f"Invalid rating range. Range is {min_rate} to {max_rate}")
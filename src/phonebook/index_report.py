@@ -0,0 +1,91 @@
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db import connection
+
+# Tables with fewer live rows are cheap to scan sequentially and are not reported.
+SEQ_SCAN_MIN_ROWS = 10000
+
+
+@dataclass(frozen=True)
+class IndexUsage:
+    table: str
+    index: str
+    scans: int
+    size: int
+
+
+@dataclass(frozen=True)
+class MissingIndex:
+    table: str
+    index: str
+    reason: str
+
+
+def _app_tables() -> list[str]:
+    return [model._meta.db_table for model in apps.get_app_config("phonebook").get_models()]
+
+
+def unused_indexes() -> list[IndexUsage]:
+    """
+    Indexes of phonebook tables never scanned since statistics were last reset, largest first.
+
+    Unique and primary key indexes are skipped, they enforce constraints even when never read.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT s.relname, s.indexrelname, s.idx_scan, pg_relation_size(s.indexrelid)
+            FROM pg_stat_user_indexes s
+            JOIN pg_index i ON i.indexrelid = s.indexrelid
+            WHERE s.relname = ANY(%s) AND s.idx_scan = 0 AND NOT i.indisunique AND NOT i.indisprimary
+            ORDER BY pg_relation_size(s.indexrelid) DESC, s.indexrelname
+            """,
+            [_app_tables()],
+        )
+        return [IndexUsage(*row) for row in cursor.fetchall()]
+
+
+def missing_indexes() -> list[MissingIndex]:
+    """
+    Indexes declared in ``Meta.indexes`` which do not exist or are invalid, e.g. after a failed
+    ``CREATE INDEX CONCURRENTLY``, and tables read mostly by sequential scans.
+    """
+    missing = []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, i.relname, x.indisvalid
+            FROM pg_index x
+            JOIN pg_class c ON c.oid = x.indrelid
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE c.relname = ANY(%s)
+            """,
+            [_app_tables()],
+        )
+        existing = {(table, index): valid for table, index, valid in cursor.fetchall()}
+        for model in apps.get_app_config("phonebook").get_models():
+            table = model._meta.db_table
+            for index in model._meta.indexes:
+                valid = existing.get((table, index.name))
+                if valid is None:
+                    missing.append(MissingIndex(table=table, index=index.name, reason="not created"))
+                elif not valid:
+                    missing.append(MissingIndex(table=table, index=index.name, reason="invalid, rebuild it"))
+
+        cursor.execute(
+            """
+            SELECT relname, seq_scan, COALESCE(idx_scan, 0)
+            FROM pg_stat_user_tables
+            WHERE relname = ANY(%s) AND n_live_tup >= %s AND seq_scan > COALESCE(idx_scan, 0)
+            ORDER BY seq_tup_read DESC
+            """,
+            [_app_tables(), SEQ_SCAN_MIN_ROWS],
+        )
+        for table, seq_scans, index_scans in cursor.fetchall():
+            missing.append(
+                MissingIndex(
+                    table=table, index="", reason=f"{seq_scans} sequential scans and {index_scans} index scans"
+                )
+            )
+    return missing
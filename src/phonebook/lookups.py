@@ -0,0 +1,133 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from functools import partial
+from typing import Generic, TypeVar
+
+from django.conf import settings
+from django.db import transaction
+
+from phonebook.models import PhonebookCity, PhonebookCountry
+from phonebook.normalization import normalize_text
+
+L = TypeVar("L", PhonebookCity, PhonebookCountry)
+
+
+class LookupCache(Generic[L]):
+    """
+    Per-worker cache of a ``PhonebookLookup`` table, mapping normalized names to ids and ids to names.
+
+    Lookup rows are never renamed or removed by the application, so cached values stay valid
+    and only the least recently used above ``PHONEBOOK_LOOKUP_CACHE_SIZE`` are dropped.
+    Rows are cached once the transaction reading them commits, rolled back rows are never cached.
+    """
+
+    def __init__(self, model: type[L]) -> None:
+        self.model: type[L] = model
+        self._ids: OrderedDict[str, int] = OrderedDict()
+        self._names: OrderedDict[int, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, rows: Iterable[tuple[int, str, str]]) -> None:
+        # Rows read inside a transaction may be created by it, they are cached only once it commits.
+        transaction.on_commit(partial(self._store, list(rows)))
+
+    def _remember_id(self, normalized_name: str, lookup_id: int) -> None:
+        transaction.on_commit(partial(self._store_id, normalized_name, lookup_id))
+
+    def _store(self, rows: list[tuple[int, str, str]]) -> None:
+        max_size = settings.PHONEBOOK_LOOKUP_CACHE_SIZE
+        with self._lock:
+            for lookup_id, name, normalized_name in rows:
+                self._ids[normalized_name] = lookup_id
+                self._ids.move_to_end(normalized_name)
+                self._names[lookup_id] = name
+                self._names.move_to_end(lookup_id)
+            while len(self._ids) > max_size:
+                self._ids.popitem(last=False)
+            while len(self._names) > max_size:
+                self._names.popitem(last=False)
+
+    def _store_id(self, normalized_name: str, lookup_id: int) -> None:
+        with self._lock:
+            self._ids[normalized_name] = lookup_id
+            self._ids.move_to_end(normalized_name)
+            while len(self._ids) > settings.PHONEBOOK_LOOKUP_CACHE_SIZE:
+                self._ids.popitem(last=False)
+
+    def _cached_id(self, normalized_name: str) -> int | None:
+        with self._lock:
+            lookup_id = self._ids.get(normalized_name)
+            if lookup_id is not None:
+                self._ids.move_to_end(normalized_name)
+            return lookup_id
+
+    def get_id(self, name: str) -> int:
+        """
+        Id of the row of ``name``, created with ``INSERT ... ON CONFLICT`` when missing.
+
+        Raises ``ValidationError`` for names which are blank or too long.
+        """
+        name = self.model._meta.get_field("name").clean(" ".join(name.split()), None)
+        normalized_name = normalize_text(name)
+        lookup_id = self._cached_id(normalized_name)
+        if lookup_id is not None:
+            return lookup_id
+        (row,) = self.model.objects.bulk_create(
+            [self.model(name=name, normalized_name=normalized_name)],
+            update_conflicts=True,
+            unique_fields=["normalized_name"],
+            update_fields=["normalized_name"],
+        )
+        # Only the id is returned, name of an existing row may differ in case or whitespace
+        # and is read on first get_name.
+        self._remember_id(normalized_name, row.id)
+        return row.id
+
+    def find_id(self, name: str) -> int | None:
+        """Id of the row of ``name`` or None, without creating it."""
+        normalized_name = normalize_text(name)
+        lookup_id = self._cached_id(normalized_name)
+        if lookup_id is not None:
+            return lookup_id
+        row = self.model.objects.filter(normalized_name=normalized_name).values_list("id", "name").first()
+        if row is None:
+            return None
+        self._remember([(row[0], row[1], normalized_name)])
+        return row[0]
+
+    def get_names(self, lookup_ids: Iterable[int]) -> dict[int, str]:
+        """Names of given ids, missing ones are read with a single query."""
+        lookup_ids = list(lookup_ids)
+        names: dict[int, str] = {}
+        with self._lock:
+            for lookup_id in lookup_ids:
+                if (name := self._names.get(lookup_id)) is not None:
+                    self._names.move_to_end(lookup_id)
+                    names[lookup_id] = name
+        missing = set(lookup_ids) - names.keys()
+        if missing:
+            rows = list(self.model.objects.filter(id__in=missing).values_list("id", "name", "normalized_name"))
+            self._remember(rows)
+            names.update((lookup_id, name) for lookup_id, name, _ in rows)
+        return names
+
+    def get_name(self, lookup_id: int) -> str:
+        return self.get_names([lookup_id])[lookup_id]
+
+    def warm(self) -> None:
+        """Load up to ``PHONEBOOK_LOOKUP_CACHE_SIZE`` rows, e.g. before a worker accepts requests."""
+        self._remember(
+            self.model.objects.order_by("id").values_list("id", "name", "normalized_name")[
+                : settings.PHONEBOOK_LOOKUP_CACHE_SIZE
+            ]
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            self._names.clear()
+
+
+cities: LookupCache[PhonebookCity] = LookupCache(PhonebookCity)
+countries: LookupCache[PhonebookCountry] = LookupCache(PhonebookCountry)
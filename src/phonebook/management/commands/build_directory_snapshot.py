@@ -0,0 +1,17 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from phonebook.directory_snapshot import build_directory_snapshot
+
+
+class Command(BaseCommand):
+    help = "Compile entries, normalized numbers and groups into a snapshot file memory mapped by workers."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--output", type=Path, default=Path(settings.PHONEBOOK_SNAPSHOT_PATH))
+
+    def handle(self, *args, output: Path, **options) -> None:
+        count = build_directory_snapshot(output)
+        self.stdout.write(f"Built directory snapshot {output} with {count} entries")
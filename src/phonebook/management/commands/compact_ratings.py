@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from phonebook.rating_rollup import compact_ratings
+
+
+class Command(BaseCommand):
+    help = "Fold ratings older than the retention window into per-entry daily summaries."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--retention-days", type=int, default=settings.PHONEBOOK_RATING_RETENTION_DAYS)
+        parser.add_argument("--batch-size", type=int, default=settings.PHONEBOOK_RATING_COMPACTION_BATCH_SIZE)
+
+    def handle(self, *args, retention_days: int, batch_size: int, **options) -> None:
+        result = compact_ratings(retention_days=retention_days, batch_size=batch_size)
+        self.stdout.write(f"Compacted {result.compacted_ratings} ratings into {result.summaries} daily summaries")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from phonebook.duplicates import find_duplicate_entries
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Report groups of likely duplicate entries in users' phonebooks."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--user-id", type=int, action="append", dest="user_ids", help="Limit to given user(s).")
+        parser.add_argument("--threshold", type=float, help="Minimal similarity of duplicates, between 0 and 1.")
+
+    def handle(self, *args, user_ids: list[int] | None = None, threshold: float | None = None, **options) -> None:
+        users = User.objects.filter(phonebookentry__isnull=False).distinct()
+        if user_ids:
+            users = users.filter(id__in=user_ids)
+        for user in users.iterator():
+            groups = find_duplicate_entries(user, threshold)
+            self.stdout.write(f"{user.email}: {len(groups)} duplicate groups")
+            for group in groups:
+                self.stdout.write(f"  {group.score:.2f} {', '.join(str(entry_id) for entry_id in group.entry_ids)}")
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from phonebook.purge import purge_deleted_entries
+
+
+class Command(BaseCommand):
+    help = "Hard delete soft deleted phonebook entries in small batches, e.g. from an off-peak cron job."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--batch-size", type=int, default=settings.PHONEBOOK_PURGE_BATCH_SIZE)
+        parser.add_argument(
+            "--min-age", type=int, default=settings.PHONEBOOK_PURGE_MIN_AGE, help="Seconds since soft delete."
+        )
+        parser.add_argument(
+            "--pause", type=float, default=settings.PHONEBOOK_PURGE_PAUSE, help="Seconds between batches."
+        )
+
+    def handle(self, *args, batch_size: int, min_age: int, pause: float, **options) -> None:
+        purged = purge_deleted_entries(batch_size=batch_size, min_age=timedelta(seconds=min_age), pause=pause)
+        self.stdout.write(f"Purged {purged} soft deleted phonebook entries")
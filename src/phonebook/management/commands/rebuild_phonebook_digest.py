@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from phonebook.digest import PhonebookDigestHandler
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Recompute phonebook sync digests from scratch, e.g. after a bulk import bypassing PhonebookHandler."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--user-id", type=int, action="append", dest="user_ids", help="Limit to given user(s).")
+
+    def handle(self, *args, user_ids: list[int] | None = None, **options) -> None:
+        users = User.objects.filter(phonebookentry__isnull=False).distinct()
+        if user_ids:
+            users = users.filter(id__in=user_ids)
+        handler = PhonebookDigestHandler()
+        for user in users.iterator():
+            count = handler.rebuild(user)
+            self.stdout.write(f"Rebuilt digest of {user.email} ({count} entries)")
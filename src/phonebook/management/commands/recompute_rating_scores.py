@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from phonebook.rating_aggregates import recompute_rating_scores
+
+
+class Command(BaseCommand):
+    help = "Recompute ranking score of all phonebook entries, e.g. after changing PHONEBOOK_RATING_PRIOR_* settings."
+
+    def handle(self, *args, **options) -> None:
+        updated = recompute_rating_scores()
+        self.stdout.write(f"Recomputed rating score of {updated} entries")
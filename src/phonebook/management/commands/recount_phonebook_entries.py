@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from phonebook.counters import recount_entry_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute phonebook entry counters from scratch, e.g. after a bulk import bypassing model signals."
+
+    def handle(self, *args, **options) -> None:
+        total = recount_entry_counters()
+        self.stdout.write(f"Recounted {total} phonebook entries")
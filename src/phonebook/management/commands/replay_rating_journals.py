@@ -0,0 +1,18 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from phonebook.rating_buffer import replay_orphan_journals
+
+
+class Command(BaseCommand):
+    help = "Write ratings left in journals of stopped workers when buffered rating ingestion is enabled."
+
+    def handle(self, *args, **options) -> None:
+        journal_dir = Path(settings.PHONEBOOK_RATING_BUFFER_JOURNAL_DIR)
+        if not journal_dir.exists():
+            self.stdout.write("No rating journals found")
+            return
+        replayed = replay_orphan_journals(journal_dir)
+        self.stdout.write(f"Replayed {replayed} ratings")
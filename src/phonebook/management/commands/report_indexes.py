@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from phonebook.index_report import missing_indexes, unused_indexes
+
+
+class Command(BaseCommand):
+    help = "Report unused and missing indexes of phonebook tables from PostgreSQL statistics."
+
+    def handle(self, *args, **options) -> None:
+        if connection.vendor != "postgresql":
+            raise CommandError("Index statistics are only available on PostgreSQL")
+        self.stdout.write("Unused indexes:")
+        for usage in unused_indexes():
+            self.stdout.write(f"  {usage.table}.{usage.index} scans={usage.scans} size={usage.size // 1024}kB")
+        self.stdout.write("Missing indexes:")
+        for missing in missing_indexes():
+            self.stdout.write(f"  {missing.table}.{missing.index or '*'} {missing.reason}")
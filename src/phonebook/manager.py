@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class PhonebookEntryManager(models.Manager):
+    """
+    Manager of entries which are not soft deleted.
+
+    Soft deleted entries are only reachable through ``PhonebookEntry.all_objects`` until they are
+    hard deleted by ``manage.py purge_deleted_entries``.
+    """
+
+    def get_queryset(self) -> models.QuerySet:
+        return super().get_queryset().filter(deleted_at__isnull=True)
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("phonebook", "0004_phonebookentry_slug"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="phonebookentry",
+            name="digest",
+            field=models.CharField(blank=True, default="", editable=False, max_length=64),
+        ),
+        migrations.CreateModel(
+            name="PhonebookDigestBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("bucket", models.PositiveIntegerField()),
+                ("digest", models.CharField(max_length=64)),
+                ("entry_count", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="phonebook_digest_buckets",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("user", "bucket"), name="unique_phonebook_digest_bucket")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:43
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+BATCH_SIZE = 1000
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    PhonebookEntry = apps.get_model("phonebook", "PhonebookEntry")
+    PhonebookEntryRating = apps.get_model("phonebook", "PhonebookEntryRating")
+    last_id = 0
+    while True:
+        entry_ids = list(
+            PhonebookEntry.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:BATCH_SIZE]
+        )
+        if not entry_ids:
+            return
+        aggregates = (
+            PhonebookEntryRating.objects.filter(phonebook_entry_id__in=entry_ids)
+            .values("phonebook_entry_id")
+            .annotate(rating_sum=Sum("rate"), rating_count=Count("id"))
+        )
+        for aggregate in aggregates:
+            PhonebookEntry.objects.filter(id=aggregate["phonebook_entry_id"]).update(
+                rating_sum=aggregate["rating_sum"], rating_count=aggregate["rating_count"]
+            )
+        last_id = entry_ids[-1]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("phonebook", "0005_phonebookentry_digest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="phonebookentry",
+            name="rating_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="phonebookentry",
+            name="rating_sum",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("phonebook", "0006_phonebookentry_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PhonebookEntryRatingSummary",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("day", models.DateField()),
+                ("rate_sum", models.PositiveBigIntegerField(default=0)),
+                ("rate_count", models.PositiveIntegerField(default=0)),
+                ("histogram", models.JSONField(default=dict)),
+                (
+                    "phonebook_entry",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="phonebook_rating_summary",
+                        to="phonebook.phonebookentry",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("phonebook_entry", "day"), name="unique_phonebook_rating_summary_day"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:48
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField, Value
+
+BATCH_SIZE = 1000
+PRIOR_MEAN = 3.0
+PRIOR_WEIGHT = 10
+
+
+def backfill_rating_score(apps, schema_editor):
+    PhonebookEntry = apps.get_model("phonebook", "PhonebookEntry")
+    score = ExpressionWrapper(
+        (Value(PRIOR_WEIGHT * PRIOR_MEAN) + F("rating_sum")) / (Value(float(PRIOR_WEIGHT)) + F("rating_count")),
+        output_field=FloatField(),
+    )
+    last_id = 0
+    while True:
+        entry_ids = list(
+            PhonebookEntry.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:BATCH_SIZE]
+        )
+        if not entry_ids:
+            return
+        PhonebookEntry.objects.filter(id__in=entry_ids).update(rating_score=score)
+        last_id = entry_ids[-1]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("phonebook", "0007_phonebookentryratingsummary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="phonebookentry",
+            name="rating_score",
+            field=models.FloatField(default=3.0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_score, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="phonebookentry",
+            index=models.Index(fields=["-rating_score", "id"], name="phonebook_entry_score_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="phonebookentry",
+            index=models.Index(fields=["city", "type", "-rating_score"], name="phonebook_entry_city_score_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="phonebookentry",
+            index=models.Index(fields=["type", "-rating_score"], name="phonebook_entry_type_score_idx"),
+        ),
+    ]
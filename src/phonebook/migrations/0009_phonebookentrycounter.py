@@ -0,0 +1,53 @@
+# Generated by Django 5.1.15 on 2026-10-19 15:54
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_entry_counters(apps, schema_editor):
+    PhonebookEntry = apps.get_model("phonebook", "PhonebookEntry")
+    PhonebookEntryCounter = apps.get_model("phonebook", "PhonebookEntryCounter")
+    per_user = PhonebookEntry.objects.values("created_by").annotate(entries=Count("id")).order_by()
+    PhonebookEntryCounter.objects.bulk_create(
+        [PhonebookEntryCounter(user_id=row["created_by"], count=row["entries"]) for row in per_user]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("phonebook", "0008_phonebookentry_rating_score"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PhonebookEntryCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("count", models.BigIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="phonebook_entry_counters",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        django.db.models.functions.comparison.Coalesce("user", models.Value(0)),
+                        name="unique_phonebook_entry_counter_user",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_entry_counters, migrations.RunPython.noop),
+    ]
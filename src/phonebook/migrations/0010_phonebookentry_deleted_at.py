@@ -0,0 +1,69 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("phonebook", "0009_phonebookentrycounter"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="phonebookentry",
+            name="phonebook_entry_score_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="phonebookentry",
+            name="phonebook_entry_city_score_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="phonebookentry",
+            name="phonebook_entry_type_score_idx",
+        ),
+        migrations.AddField(
+            model_name="phonebookentry",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="phonebookentry",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["-rating_score", "id"],
+                name="phonebook_entry_score_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="phonebookentry",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["city", "type", "-rating_score"],
+                name="phonebook_entry_city_score_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="phonebookentry",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["type", "-rating_score"],
+                name="phonebook_entry_type_score_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="phonebookentry",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["created_by", "id"],
+                name="phonebook_entry_owner_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="phonebookentry",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["deleted_at"],
+                name="phonebook_entry_deleted_idx",
+            ),
+        ),
+    ]
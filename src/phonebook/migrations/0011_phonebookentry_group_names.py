@@ -0,0 +1,42 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:13
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import migrations, models
+from django.db.models import OuterRef
+
+
+def backfill_group_names(apps, schema_editor):
+    PhonebookEntry = apps.get_model("phonebook", "PhonebookEntry")
+    PhonebookGroup = apps.get_model("phonebook", "PhonebookGroup")
+    PhonebookEntry.objects.update(
+        group_names=ArraySubquery(
+            PhonebookGroup.objects.filter(phonebook_entries=OuterRef("pk")).order_by("id").values("name")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("phonebook", "0010_phonebookentry_deleted_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="phonebookentry",
+            name="group_names",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.TextField(), blank=True, default=list, editable=False, size=None
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="phonebookentry",
+            index=django.contrib.postgres.indexes.GinIndex(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["group_names"],
+                name="phonebook_entry_groups_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_group_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:40
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("phonebook", "0011_phonebookentry_group_names"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PhonebookCity",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.TextField(max_length=50, validators=[django.core.validators.MaxLengthValidator(50)])),
+                ("normalized_name", models.TextField(editable=False, unique=True)),
+            ],
+            options={
+                "verbose_name_plural": "phonebook cities",
+            },
+        ),
+        migrations.CreateModel(
+            name="PhonebookCountry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.TextField(max_length=50, validators=[django.core.validators.MaxLengthValidator(50)])),
+                ("normalized_name", models.TextField(editable=False, unique=True)),
+            ],
+            options={
+                "verbose_name_plural": "phonebook countries",
+            },
+        ),
+        migrations.AddField(
+            model_name="phonebookentry",
+            name="city_ref",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="phonebook.phonebookcity",
+            ),
+        ),
+        migrations.AddField(
+            model_name="phonebookentry",
+            name="country_ref",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="phonebook.phonebookcountry",
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+import re
+from typing import Any
+
+from django.db import migrations, transaction
+
+BACKFILL_BATCH_SIZE = 2000
+_WHITESPACE = re.compile(r"\s+")
+
+
+def backfill_city_country(apps, schema_editor):
+    """
+    Intern city and country names of entries, one batch of entries at a time.
+
+    Each batch is committed on its own, so locks are held only for one batch and an interrupted
+    backfill continues with entries which are not linked yet.
+    """
+    PhonebookEntry = apps.get_model("phonebook", "PhonebookEntry")
+    lookups: dict[str, tuple[Any, dict[str, int]]] = {
+        "city": (apps.get_model("phonebook", "PhonebookCity"), {}),
+        "country": (apps.get_model("phonebook", "PhonebookCountry"), {}),
+    }
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            entries = list(
+                PhonebookEntry.objects.filter(id__gt=last_id, city_ref__isnull=True)
+                .order_by("id")
+                .only("id", "city", "country")[:BACKFILL_BATCH_SIZE]
+            )
+            if not entries:
+                break
+            for field, (model, ids) in lookups.items():
+                names: dict[str, str] = {}
+                for entry in entries:
+                    name = _WHITESPACE.sub(" ", getattr(entry, field)).strip()
+                    names.setdefault(name.casefold(), name)
+                missing = [key for key in names if key not in ids]
+                model.objects.bulk_create(
+                    [model(name=names[key], normalized_name=key) for key in missing], ignore_conflicts=True
+                )
+                ids.update(model.objects.filter(normalized_name__in=missing).values_list("normalized_name", "id"))
+                for entry in entries:
+                    name = _WHITESPACE.sub(" ", getattr(entry, field)).strip()
+                    setattr(entry, f"{field}_ref_id", ids[name.casefold()])
+            PhonebookEntry.objects.bulk_update(entries, ["city_ref", "country_ref"])
+        last_id = entries[-1].id
+
+
+class Migration(migrations.Migration):
+    # Batches of the backfill are committed one by one instead of in a single transaction.
+    atomic = False
+
+    dependencies = [
+        ("phonebook", "0012_phonebook_city_country"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_city_country, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("phonebook", "0013_backfill_city_country"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="phonebookentry",
+            name="phonebook_entry_city_score_idx",
+        ),
+        migrations.RemoveField(
+            model_name="phonebookentry",
+            name="city",
+        ),
+        migrations.RemoveField(
+            model_name="phonebookentry",
+            name="country",
+        ),
+        migrations.RenameField(
+            model_name="phonebookentry",
+            old_name="city_ref",
+            new_name="city",
+        ),
+        migrations.RenameField(
+            model_name="phonebookentry",
+            old_name="country_ref",
+            new_name="country",
+        ),
+        migrations.AlterField(
+            model_name="phonebookentry",
+            name="city",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="phonebook_entries",
+                to="phonebook.phonebookcity",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="phonebookentry",
+            name="country",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="phonebook_entries",
+                to="phonebook.phonebookcountry",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="phonebookentry",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["city", "type", "-rating_score"],
+                name="phonebook_entry_city_score_idx",
+            ),
+        ),
+    ]
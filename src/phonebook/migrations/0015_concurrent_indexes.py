@@ -0,0 +1,72 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:26
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+def _concurrently(schema_editor) -> dict[str, bool]:
+    return {"concurrently": True} if schema_editor.connection.vendor == "postgresql" else {}
+
+
+def drop_number_entry_fk_index(apps, schema_editor):
+    """Drop index of the phonebook_entry foreign key, phonebook_number_entry_idx starts with the same column."""
+    PhonebookNumber = apps.get_model("phonebook", "PhonebookNumber")
+    for name in schema_editor._constraint_names(PhonebookNumber, ["phonebook_entry_id"], index=True):
+        schema_editor.execute(schema_editor._delete_index_sql(PhonebookNumber, name, **_concurrently(schema_editor)))
+
+
+def create_number_entry_fk_index(apps, schema_editor):
+    PhonebookNumber = apps.get_model("phonebook", "PhonebookNumber")
+    schema_editor.execute(
+        schema_editor._create_index_sql(
+            PhonebookNumber,
+            fields=[PhonebookNumber._meta.get_field("phonebook_entry")],
+            **_concurrently(schema_editor),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can not run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("phonebook", "0014_phonebookentry_city_country_refs"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="phonebookentry",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["created_by", "created_at", "id"],
+                name="phonebook_entry_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="phonebookentryrating",
+            index=models.Index(fields=["phonebook_entry", "created_at"], name="phonebook_rating_entry_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="phonebooknumber",
+            index=models.Index(fields=["phonebook_entry", "number"], name="phonebook_number_entry_idx"),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(drop_number_entry_fk_index, create_number_entry_fk_index),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="phonebooknumber",
+                    name="phonebook_entry",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="phonebook_number",
+                        to="phonebook.phonebookentry",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-19 17:03
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can not run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("phonebook", "0015_concurrent_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="phonebookentry",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["city", "-rating_score", "id"],
+                name="phonebook_entry_city_top_idx",
+            ),
+        ),
+    ]
@@ -1,8 +1,16 @@
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import MaxLengthValidator
 from django.db import models
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
 from model_utils import GrapheneModelMixin, TimeStampMixin
+from phonebook.manager import PhonebookEntryManager
+
+ALIVE = Q(deleted_at__isnull=True)
 
 
 class PhonebookEntryTypeEnum(models.TextChoices):
@@ -22,13 +30,42 @@ class PhonebookGroup(TimeStampMixin):
         return f"PhonebookGroup({self.name=})"
 
 
+class PhonebookLookup(models.Model):
+    """
+    Interned value shared by many entries, e.g. a city.
+
+    Values equal after whitespace and case normalization share a row, ``name`` keeps the first spelling.
+    Rows are resolved through ``phonebook.lookups``.
+    """
+
+    name = models.TextField(max_length=50, validators=[MaxLengthValidator(50)])
+    normalized_name = models.TextField(unique=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.name=})"
+
+
+class PhonebookCity(PhonebookLookup):
+    class Meta:
+        verbose_name_plural = "phonebook cities"
+
+
+class PhonebookCountry(PhonebookLookup):
+    class Meta:
+        verbose_name_plural = "phonebook countries"
+
+
 class PhonebookEntry(TimeStampMixin, GrapheneModelMixin):
     slug = models.SlugField(default="")
     name = models.TextField(max_length=300, validators=[MaxLengthValidator(300)])
-    city = models.TextField(max_length=50, validators=[MaxLengthValidator(50)])
+    # Leading column of phonebook_entry_city_score_idx, which serves city lookups as well.
+    city = models.ForeignKey(PhonebookCity, on_delete=models.PROTECT, related_name="phonebook_entries", db_index=False)
     street = models.TextField(max_length=50, validators=[MaxLengthValidator(50)])
     postal_code = models.TextField(max_length=50, validators=[MaxLengthValidator(50)])
-    country = models.TextField(max_length=50, validators=[MaxLengthValidator(50)])
+    country = models.ForeignKey(PhonebookCountry, on_delete=models.PROTECT, related_name="phonebook_entries")
     type = models.TextField(choices=PhonebookEntryTypeEnum.choices)
     groups = models.ManyToManyField(
         PhonebookGroup,
@@ -36,19 +73,57 @@ class PhonebookEntry(TimeStampMixin, GrapheneModelMixin):
         help_text=_("Group that phone entry belongs"),
         related_name="phonebook_entries",
     )
+    # Names of ``groups`` kept in sync by phonebook.signals, so group filters and reads skip the M2M join.
+    group_names = ArrayField(models.TextField(), default=list, blank=True, editable=False)
     created_by = models.ForeignKey("users.User", on_delete=models.SET_NULL, null=True, blank=True)
+    digest = models.CharField(max_length=64, blank=True, default="", editable=False)
+    rating_sum = models.PositiveBigIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    # Bayesian average of ratings, see phonebook.rating_aggregates.bayesian_rating_score
+    rating_score = models.FloatField(default=settings.PHONEBOOK_RATING_PRIOR_MEAN, editable=False)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = PhonebookEntryManager()
+    all_objects = models.Manager()
 
     phonebook_number: models.QuerySet["PhonebookNumber"]
 
+    class Meta:
+        # Entries are read through PhonebookEntryManager, so indexes skip soft deleted rows.
+        indexes = [
+            models.Index(fields=["-rating_score", "id"], name="phonebook_entry_score_idx", condition=ALIVE),
+            models.Index(
+                fields=["city", "type", "-rating_score"], name="phonebook_entry_city_score_idx", condition=ALIVE
+            ),
+            models.Index(fields=["city", "-rating_score", "id"], name="phonebook_entry_city_top_idx", condition=ALIVE),
+            models.Index(fields=["type", "-rating_score"], name="phonebook_entry_type_score_idx", condition=ALIVE),
+            models.Index(fields=["created_by", "id"], name="phonebook_entry_owner_idx", condition=ALIVE),
+            models.Index(
+                fields=["created_by", "created_at", "id"], name="phonebook_entry_created_idx", condition=ALIVE
+            ),
+            GinIndex(fields=["group_names"], name="phonebook_entry_groups_idx", condition=ALIVE),
+            models.Index(
+                fields=["deleted_at"], name="phonebook_entry_deleted_idx", condition=Q(deleted_at__isnull=False)
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"PhonebookEntry({self.name=})"
 
 
 class PhonebookNumber(TimeStampMixin, GrapheneModelMixin):
-    phonebook_entry = models.ForeignKey(PhonebookEntry, on_delete=models.CASCADE, related_name="phonebook_number")
+    # Indexed by phonebook_number_entry_idx, which starts with this column.
+    phonebook_entry = models.ForeignKey(
+        PhonebookEntry, on_delete=models.CASCADE, related_name="phonebook_number", db_index=False
+    )
     number = models.TextField(max_length=20, null=True, validators=[MaxLengthValidator(20)])
     type = models.TextField(choices=PhonebookNumberTypeEnum.choices)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["phonebook_entry", "number"], name="phonebook_number_entry_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"PhonebookNumber({self.phonebook_entry=}, {self.number=}, {self.type=})"
 
@@ -58,5 +133,78 @@ class PhonebookEntryRating(TimeStampMixin):
     rate = models.PositiveIntegerField()
     created_by = models.ForeignKey("users.User", on_delete=models.SET_NULL, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["phonebook_entry", "created_at"], name="phonebook_rating_entry_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"PhonebookNumberRating({self.phonebook_entry=}, {self.rate=}, {self.created_by})"
+
+
+class PhonebookEntryRatingSummary(TimeStampMixin):
+    """
+    Ratings of a single entry from a single day, folded by the rating compaction job.
+
+    ``histogram`` maps rate to number of votes, e.g. ``{"5": 10, "6": 2}``.
+    """
+
+    phonebook_entry = models.ForeignKey(
+        PhonebookEntry, on_delete=models.CASCADE, related_name="phonebook_rating_summary"
+    )
+    day = models.DateField()
+    rate_sum = models.PositiveBigIntegerField(default=0)
+    rate_count = models.PositiveIntegerField(default=0)
+    histogram = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["phonebook_entry", "day"], name="unique_phonebook_rating_summary_day"),
+        ]
+
+    def __str__(self) -> str:
+        return f"PhonebookEntryRatingSummary({self.phonebook_entry_id=}, {self.day=}, {self.rate_count=})"
+
+
+class PhonebookDigestBucket(TimeStampMixin):
+    """
+    Leaf of the per-user Merkle tree over entry id ranges.
+
+    ``digest`` is the XOR of the digests of all entries owned by ``user`` whose id falls
+    into ``bucket``, so it can be updated in place whenever a single entry changes.
+    """
+
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="phonebook_digest_buckets")
+    bucket = models.PositiveIntegerField()
+    digest = models.CharField(max_length=64)
+    entry_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "bucket"], name="unique_phonebook_digest_bucket"),
+        ]
+
+    def __str__(self) -> str:
+        return f"PhonebookDigestBucket({self.user_id=}, {self.bucket=}, {self.entry_count=})"
+
+
+class PhonebookEntryCounter(TimeStampMixin):
+    """
+    Number of entries owned by ``user``, or of entries without owner when ``user`` is null.
+
+    Total of all entries is the sum of counters, so concurrent inserts of different users do not wait
+    on a single row. Maintained by ``phonebook.signals`` on entry create and delete, see ``phonebook.counters``.
+    """
+
+    user = models.ForeignKey(
+        "users.User", on_delete=models.CASCADE, null=True, blank=True, related_name="phonebook_entry_counters"
+    )
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(Coalesce("user", Value(0)), name="unique_phonebook_entry_counter_user"),
+        ]
+
+    def __str__(self) -> str:
+        return f"PhonebookEntryCounter({self.user_id=}, {self.count=})"
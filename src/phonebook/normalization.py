@@ -0,0 +1,14 @@
+import re
+
+_NON_DIGITS = re.compile(r"\D")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_number(number: str | None) -> str:
+    """Digits of a phone number, e.g. ``"+48 500-500-500"`` becomes ``"48500500500"``."""
+    return _NON_DIGITS.sub("", number or "")
+
+
+def normalize_text(text: str | None) -> str:
+    """Case-folded text with whitespace runs collapsed to a single space."""
+    return _WHITESPACE.sub(" ", text or "").strip().casefold()
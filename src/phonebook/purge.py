@@ -0,0 +1,67 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
+
+from phonebook.models import PhonebookEntry, PhonebookEntryRating, PhonebookEntryRatingSummary, PhonebookNumber
+
+logger = logging.getLogger(__name__)
+
+
+def _raw_delete(queryset: QuerySet) -> None:
+    """Single ``DELETE`` statement, without collecting related objects and sending signals."""
+    queryset._raw_delete(queryset.db)  # type: ignore[attr-defined]
+
+
+def hard_delete_entries(entry_ids: list[int]) -> None:
+    """
+    Remove entries and their related rows with one ``DELETE`` per table.
+
+    Related rows of models with delete signal receivers go through Django's delete collector,
+    so their receivers still run. Delete signals of the entries themselves are not sent.
+    """
+    for model in (PhonebookEntryRating, PhonebookEntryRatingSummary, PhonebookNumber):
+        related = model.objects.filter(phonebook_entry_id__in=entry_ids)
+        if pre_delete.has_listeners(model) or post_delete.has_listeners(model):
+            related.delete()
+        else:
+            _raw_delete(related)
+    _raw_delete(PhonebookEntry.groups.through.objects.filter(phonebookentry_id__in=entry_ids))
+    _raw_delete(PhonebookEntry.all_objects.filter(id__in=entry_ids))
+
+
+def purge_deleted_entries(
+    batch_size: int | None = None, min_age: timedelta | None = None, pause: float | None = None
+) -> int:
+    """
+    Hard delete soft deleted entries, in batches of ``batch_size`` entries each in its own transaction.
+
+    Only entries deleted at least ``min_age`` ago are purged. Sleeping ``pause`` seconds between batches
+    keeps locks short and leaves room for regular traffic. Returns number of purged entries.
+    """
+    batch_size = batch_size or settings.PHONEBOOK_PURGE_BATCH_SIZE
+    min_age = timedelta(seconds=settings.PHONEBOOK_PURGE_MIN_AGE) if min_age is None else min_age
+    pause = settings.PHONEBOOK_PURGE_PAUSE if pause is None else pause
+    cutoff = timezone.now() - min_age
+    purged = 0
+    while True:
+        with transaction.atomic():
+            entry_ids = list(
+                PhonebookEntry.all_objects.filter(deleted_at__lte=cutoff)
+                .order_by("deleted_at")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not entry_ids:
+                break
+            hard_delete_entries(entry_ids)
+        purged += len(entry_ids)
+        if len(entry_ids) < batch_size:
+            break
+        time.sleep(pause)
+    logger.info(f"Purged {purged} soft deleted phonebook entries")
+    return purged
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db.models import Case, Expression, ExpressionWrapper, F, FloatField, Value, When
+from django.db.models.expressions import Combinable
+
+from phonebook.models import PhonebookEntry
+
+
+def bayesian_rating_score(rating_sum: Combinable, rating_count: Combinable) -> Expression:
+    """
+    Bayesian average of entry ratings.
+
+    Every entry starts with ``PHONEBOOK_RATING_PRIOR_WEIGHT`` virtual votes of ``PHONEBOOK_RATING_PRIOR_MEAN``,
+    so entries with a handful of high votes do not outrank entries with many slightly lower ones.
+    """
+    weight = settings.PHONEBOOK_RATING_PRIOR_WEIGHT
+    prior = Value(float(weight * settings.PHONEBOOK_RATING_PRIOR_MEAN))
+    return ExpressionWrapper((prior + rating_sum) / (Value(float(weight)) + rating_count), output_field=FloatField())
+
+
+def add_to_rating_aggregates(totals: dict[int, tuple[int, int]]) -> None:
+    """
+    Add ``{entry_id: (rate_sum, rate_count)}`` to entry rating aggregates and refresh their score.
+
+    All entries are updated with a single UPDATE statement.
+    """
+    if not totals:
+        return
+    rate_sum = Case(*[When(id=id, then=Value(total[0])) for id, total in totals.items()])
+    rate_count = Case(*[When(id=id, then=Value(total[1])) for id, total in totals.items()])
+    PhonebookEntry.objects.filter(id__in=totals).update(
+        rating_sum=F("rating_sum") + rate_sum,
+        rating_count=F("rating_count") + rate_count,
+        rating_score=bayesian_rating_score(F("rating_sum") + rate_sum, F("rating_count") + rate_count),
+    )
+
+
+def recompute_rating_scores(batch_size: int = 1000) -> int:
+    """Recompute ``rating_score`` of all entries, e.g. after changing the rating prior. Returns number of entries."""
+    updated, last_id = 0, 0
+    while True:
+        entry_ids = list(
+            PhonebookEntry.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if not entry_ids:
+            return updated
+        updated += PhonebookEntry.objects.filter(id__in=entry_ids).update(
+            rating_score=bayesian_rating_score(F("rating_sum"), F("rating_count"))
+        )
+        last_id = entry_ids[-1]
@@ -0,0 +1,219 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from phonebook.events import PhonebookEventKindEnum, publish_entry_event
+from phonebook.models import PhonebookEntry, PhonebookEntryRating
+from phonebook.rating_aggregates import add_to_rating_aggregates
+
+logger = logging.getLogger(__name__)
+
+
+class RatingBufferDurability:
+    # Buffered votes live only in worker memory and are lost if the worker is killed.
+    memory = "memory"
+    # Every vote is appended and fsynced to a per-worker journal before it is acknowledged.
+    journal = "journal"
+
+
+@dataclass(frozen=True)
+class BufferedRating:
+    entry_id: int
+    rate: int
+    user_id: int | None
+
+
+def update_rating_aggregates(ratings: list[BufferedRating]) -> None:
+    totals: dict[int, tuple[int, int]] = {}
+    for rating in ratings:
+        rate_sum, rate_count = totals.get(rating.entry_id, (0, 0))
+        totals[rating.entry_id] = (rate_sum + rating.rate, rate_count + 1)
+    add_to_rating_aggregates(totals)
+
+
+class RatingBuffer:
+    """
+    Per-worker buffer of rating votes.
+
+    Votes are written with a single ``bulk_create`` together with the entry aggregates once
+    the buffer holds ``size`` votes or its oldest vote is ``max_delay`` seconds old.
+    """
+
+    def __init__(self, size: int, max_delay: float, durability: str, journal_dir: Path) -> None:
+        self.size = size
+        self.max_delay = max_delay
+        self.durability = durability
+        self.journal_dir = journal_dir
+        self._ratings: list[BufferedRating] = []
+        self._first_added_at: float | None = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self.pid = os.getpid()
+        # Unique per buffer, PIDs of dead workers are reused after a restart and their journals must not be taken over.
+        self.journal_path = journal_dir / f"ratings-{self.pid}-{uuid.uuid4().hex}.jsonl"
+        if self.durability == RatingBufferDurability.journal:
+            self.journal_dir.mkdir(parents=True, exist_ok=True)
+            replay_orphan_journals(self.journal_dir)
+
+    def __len__(self) -> int:
+        return len(self._ratings)
+
+    def add(self, entry_id: int, rate: int, user_id: int | None) -> None:
+        rating = BufferedRating(entry_id=entry_id, rate=rate, user_id=user_id)
+        with self._lock:
+            if self.durability == RatingBufferDurability.journal:
+                self._write_journal(rating)
+            self._ratings.append(rating)
+            if self._first_added_at is None:
+                self._first_added_at = time.monotonic()
+                self._schedule_flush()
+            is_full = len(self._ratings) >= self.size
+        if is_full:
+            self._safe_flush()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                ratings, self._ratings = self._ratings, []
+                self._first_added_at = None
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+            if not ratings:
+                return 0
+            try:
+                written = write_ratings(ratings)
+            except Exception:
+                with self._lock:
+                    self._ratings = ratings + self._ratings
+                    self._first_added_at = self._first_added_at or time.monotonic()
+                logger.exception(f"Failed to flush {len(ratings)} buffered ratings")
+                raise
+            if self.durability == RatingBufferDurability.journal:
+                self._rewrite_journal()
+            return written
+
+    def _schedule_flush(self) -> None:
+        self._timer = threading.Timer(self.max_delay, self._flush_from_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _safe_flush(self) -> None:
+        # Votes stay buffered when the flush fails, so they are retried on the next threshold.
+        try:
+            self.flush()
+        except Exception:
+            with self._lock:
+                if self._ratings and self._timer is None:
+                    self._schedule_flush()
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self._safe_flush()
+        finally:
+            # Timer threads are not reused, do not leave their connection open.
+            connection.close()
+
+    def _write_journal(self, rating: BufferedRating) -> None:
+        with self.journal_path.open("a") as journal:
+            journal.write(json.dumps(asdict(rating)) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def _rewrite_journal(self) -> None:
+        with self._lock:
+            tmp_path = self.journal_path.with_suffix(".tmp")
+            with tmp_path.open("w") as journal:
+                journal.writelines(json.dumps(asdict(rating)) + "\n" for rating in self._ratings)
+                journal.flush()
+                os.fsync(journal.fileno())
+            tmp_path.replace(self.journal_path)
+
+
+@transaction.atomic
+def write_ratings(ratings: list[BufferedRating]) -> int:
+    """Write buffered votes, dropping votes of deleted entries. Returns number of written votes."""
+    owners = dict(
+        PhonebookEntry.objects.filter(id__in={rating.entry_id for rating in ratings}).values_list("id", "created_by_id")
+    )
+    ratings = [rating for rating in ratings if rating.entry_id in owners]
+    PhonebookEntryRating.objects.bulk_create(
+        [
+            PhonebookEntryRating(
+                phonebook_entry_id=rating.entry_id,
+                rate=rating.rate,
+                created_by_id=rating.user_id,
+            )
+            for rating in ratings
+        ]
+    )
+    update_rating_aggregates(ratings)
+    for rating in ratings:
+        publish_entry_event(PhonebookEventKindEnum.rated, rating.entry_id, owners[rating.entry_id], rate=rating.rate)
+    return len(ratings)
+
+
+def replay_orphan_journals(journal_dir: Path) -> int:
+    """
+    Write votes left in journals of dead workers. Returns number of replayed votes.
+
+    Must run before the buffer of this process writes its journal. Journals with the pid of this process
+    were left by an earlier process with the same pid, e.g. before a container restart, and are replayed.
+    """
+    replayed = 0
+    for path in journal_dir.glob("ratings-*.jsonl"):
+        pid = int(path.stem.removeprefix("ratings-").split("-")[0])
+        if pid != os.getpid() and _is_alive(pid):
+            continue
+        claimed_path = path.with_name(f"{path.name}.{os.getpid()}.replay")
+        try:
+            path.rename(claimed_path)
+        except FileNotFoundError:
+            # Another worker claimed the journal first.
+            continue
+        with claimed_path.open() as journal:
+            ratings = [BufferedRating(**json.loads(line)) for line in journal if line.strip()]
+        written = write_ratings(ratings) if ratings else 0
+        claimed_path.unlink()
+        replayed += written
+        logger.info(f"Replayed {written} ratings from journal of worker {pid}")
+    return replayed
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_buffer: RatingBuffer | None = None
+_buffer_lock = threading.Lock()
+
+
+def get_rating_buffer() -> RatingBuffer:
+    """Return buffer of the current worker process, creating a fresh one after fork."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None or _buffer.pid != os.getpid():
+            _buffer = RatingBuffer(
+                size=settings.PHONEBOOK_RATING_BUFFER_SIZE,
+                max_delay=settings.PHONEBOOK_RATING_BUFFER_MAX_DELAY,
+                durability=settings.PHONEBOOK_RATING_BUFFER_DURABILITY,
+                journal_dir=Path(settings.PHONEBOOK_RATING_BUFFER_JOURNAL_DIR),
+            )
+            atexit.register(_buffer.flush)
+        return _buffer
@@ -0,0 +1,109 @@
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from phonebook.models import PhonebookEntryRating, PhonebookEntryRatingSummary
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CompactionResult:
+    compacted_ratings: int
+    summaries: int
+
+
+def compaction_cutoff(retention_days: int) -> datetime:
+    """Start of the oldest day which is still kept as raw ratings."""
+    cutoff_day = timezone.localdate() - timedelta(days=retention_days)
+    return timezone.make_aware(datetime.combine(cutoff_day, time.min))
+
+
+def compact_ratings(retention_days: int | None = None, batch_size: int | None = None) -> CompactionResult:
+    """
+    Fold ratings older than the retention window into per-entry, per-day summaries.
+
+    Work is done in batches of raw rating rows, each batch in its own transaction, so the job can
+    be run while ratings are being written. Safe to run repeatedly, e.g. from cron or a scheduler.
+    Entry ``rating_sum``/``rating_count`` aggregates already include compacted ratings and are left untouched.
+    """
+    retention_days = settings.PHONEBOOK_RATING_RETENTION_DAYS if retention_days is None else retention_days
+    batch_size = batch_size or settings.PHONEBOOK_RATING_COMPACTION_BATCH_SIZE
+    cutoff = compaction_cutoff(retention_days)
+    compacted, summaries = 0, 0
+    while True:
+        batch_compacted, batch_summaries = _compact_batch(cutoff, batch_size)
+        if not batch_compacted:
+            break
+        compacted += batch_compacted
+        summaries += batch_summaries
+    logger.info(f"Compacted {compacted} ratings older than {cutoff} into {summaries} summaries")
+    return CompactionResult(compacted_ratings=compacted, summaries=summaries)
+
+
+@transaction.atomic
+def _compact_batch(cutoff: datetime, batch_size: int) -> tuple[int, int]:
+    rating_ids = list(
+        PhonebookEntryRating.objects.filter(created_at__lt=cutoff)
+        .order_by("id")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not rating_ids:
+        return 0, 0
+    rows = (
+        PhonebookEntryRating.objects.filter(id__in=rating_ids)
+        .annotate(day=TruncDate("created_at"))
+        .values("phonebook_entry_id", "day", "rate")
+        .annotate(votes=Count("id"))
+        .order_by()
+    )
+    histograms: dict[tuple[int, date], Counter[str]] = {}
+    for row in rows:
+        histograms.setdefault((row["phonebook_entry_id"], row["day"]), Counter())[str(row["rate"])] += row["votes"]
+
+    existing = {
+        (summary.phonebook_entry_id, summary.day): summary
+        for summary in PhonebookEntryRatingSummary.objects.select_for_update().filter(
+            phonebook_entry_id__in={entry_id for entry_id, _ in histograms},
+            day__in={day for _, day in histograms},
+        )
+    }
+    to_create, to_update = [], []
+    for (entry_id, day), histogram in histograms.items():
+        summary = existing.get((entry_id, day))
+        if summary is None:
+            summary = PhonebookEntryRatingSummary(phonebook_entry_id=entry_id, day=day)
+            to_create.append(summary)
+        else:
+            to_update.append(summary)
+        summary.histogram = dict(Counter(summary.histogram) + histogram)
+        summary.rate_sum += sum(int(rate) * votes for rate, votes in histogram.items())
+        summary.rate_count += sum(histogram.values())
+    PhonebookEntryRatingSummary.objects.bulk_create(to_create)
+    PhonebookEntryRatingSummary.objects.bulk_update(to_update, ["histogram", "rate_sum", "rate_count"])
+    PhonebookEntryRating.objects.filter(id__in=rating_ids).delete()
+    return len(rating_ids), len(histograms)
+
+
+def rating_histogram(entry_id: int) -> dict[int, int]:
+    """Votes per rate of an entry, combining compacted summaries with raw ratings."""
+    histogram: Counter[int] = Counter()
+    for summary_histogram in PhonebookEntryRatingSummary.objects.filter(phonebook_entry_id=entry_id).values_list(
+        "histogram", flat=True
+    ):
+        histogram.update({int(rate): votes for rate, votes in summary_histogram.items()})
+    for rate, votes in (
+        PhonebookEntryRating.objects.filter(phonebook_entry_id=entry_id)
+        .values_list("rate")
+        .annotate(votes=Count("id"))
+        .order_by()
+    ):
+        histogram[rate] += votes
+    return dict(sorted(histogram.items()))
@@ -1,11 +1,140 @@
-from django.db.models.signals import pre_save
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.utils.text import slugify
 
-from phonebook.models import PhonebookEntry
+from phonebook import autocomplete, group_cache
+from phonebook.counters import add_to_entry_counter, disown_entry_counter
+from phonebook.data_version import bump_owner_data_version, bump_phonebook_data_version
+from phonebook.group_names import sync_entry_group_names, sync_group_names
+from phonebook.models import PhonebookEntry, PhonebookGroup, PhonebookNumber
+from users.models import User
 
 
 @receiver(pre_save, sender=PhonebookEntry)
 def phonebook_pre_save(sender, instance: PhonebookEntry, *args, **kwargs) -> None:
     if not instance.slug:
         instance.slug = slugify(instance.name)
+
+
+@receiver(post_save, sender=PhonebookEntry)
+@receiver(post_delete, sender=PhonebookEntry)
+@receiver(post_save, sender=PhonebookNumber)
+@receiver(post_delete, sender=PhonebookNumber)
+@receiver(m2m_changed, sender=PhonebookEntry.groups.through)
+def phonebook_data_changed(sender, *args, **kwargs) -> None:
+    if kwargs.get("action", "post_").startswith("post_"):
+        transaction.on_commit(bump_phonebook_data_version)
+
+
+def _bump_owner_data_versions(owner_ids: set[int | None]) -> None:
+    for owner_id in owner_ids:
+        if owner_id is not None:
+            transaction.on_commit(partial(bump_owner_data_version, owner_id))
+
+
+@receiver(post_save, sender=PhonebookEntry)
+@receiver(post_delete, sender=PhonebookEntry)
+def phonebook_owner_entry_changed(sender, instance: PhonebookEntry, *args, **kwargs) -> None:
+    _bump_owner_data_versions({instance.created_by_id})
+
+
+@receiver(post_save, sender=PhonebookNumber)
+@receiver(post_delete, sender=PhonebookNumber)
+def phonebook_owner_number_changed(sender, instance: PhonebookNumber, *args, **kwargs) -> None:
+    # Numbers are deleted before their entry when it is deleted, so the entry is still there.
+    _bump_owner_data_versions(
+        set(PhonebookEntry.all_objects.filter(id=instance.phonebook_entry_id).values_list("created_by_id", flat=True))
+    )
+
+
+@receiver(m2m_changed, sender=PhonebookEntry.groups.through)
+def phonebook_owner_groups_changed(sender, instance, action: str, reverse: bool, pk_set, *args, **kwargs) -> None:
+    if not reverse:
+        if action.startswith("post_"):
+            _bump_owner_data_versions({instance.created_by_id})
+    elif action in ("post_add", "post_remove"):
+        _bump_owner_data_versions(
+            set(PhonebookEntry.all_objects.filter(id__in=pk_set).values_list("created_by_id", flat=True))
+        )
+    elif action == "pre_clear":
+        # Links of a cleared group are gone after the clear, owners of its entries are read before it.
+        _bump_owner_data_versions(
+            set(PhonebookEntry.all_objects.filter(groups=instance).values_list("created_by_id", flat=True))
+        )
+
+
+@receiver(post_save, sender=PhonebookEntry)
+@receiver(post_delete, sender=PhonebookEntry)
+def phonebook_entry_counted(sender, instance: PhonebookEntry, *args, **kwargs) -> None:
+    if kwargs.get("created") is False:
+        return
+    add_to_entry_counter(instance.created_by_id, 1 if kwargs.get("created") else -1)
+
+
+@receiver(pre_delete, sender=User)
+def phonebook_owner_deleted(sender, instance: User, *args, **kwargs) -> None:
+    # Entries outlive their owner, see PhonebookEntry.created_by.
+    disown_entry_counter(instance.id)
+
+
+@receiver(post_save, sender=PhonebookEntry)
+def phonebook_entry_autocomplete_saved(sender, instance: PhonebookEntry, *args, **kwargs) -> None:
+    if instance.created_by_id:
+        transaction.on_commit(partial(autocomplete.entry_saved, instance.created_by_id, instance.id, instance.name))
+
+
+@receiver(post_delete, sender=PhonebookEntry)
+def phonebook_entry_autocomplete_deleted(sender, instance: PhonebookEntry, *args, **kwargs) -> None:
+    if instance.created_by_id:
+        transaction.on_commit(partial(autocomplete.entry_deleted, instance.created_by_id, instance.id))
+
+
+@receiver(m2m_changed, sender=PhonebookEntry.groups.through)
+def phonebook_group_names_changed(sender, instance, action: str, reverse: bool, pk_set, *args, **kwargs) -> None:
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        sync_entry_group_names(instance)
+    elif pk_set:
+        sync_group_names(PhonebookEntry.all_objects.filter(id__in=pk_set))
+    else:
+        # Links of a cleared group are gone already, entries are found by its name instead.
+        sync_group_names(PhonebookEntry.all_objects.filter(group_names__contains=[instance.name]))
+
+
+@receiver(post_save, sender=PhonebookGroup)
+@receiver(post_delete, sender=PhonebookGroup)
+def phonebook_group_cache_changed(sender, *args, **kwargs) -> None:
+    if not kwargs.get("created"):
+        transaction.on_commit(group_cache.invalidate)
+
+
+@receiver(post_save, sender=PhonebookGroup)
+def phonebook_group_renamed(sender, instance: PhonebookGroup, created: bool, *args, **kwargs) -> None:
+    if not created:
+        sync_group_names(PhonebookEntry.all_objects.filter(groups=instance))
+
+
+@receiver(post_delete, sender=PhonebookGroup)
+def phonebook_group_names_deleted(sender, instance: PhonebookGroup, *args, **kwargs) -> None:
+    sync_group_names(PhonebookEntry.all_objects.filter(group_names__contains=[instance.name]))
+
+
+@receiver(m2m_changed, sender=PhonebookEntry.groups.through)
+def phonebook_groups_autocomplete_changed(sender, instance, action: str, reverse: bool, *args, **kwargs) -> None:
+    if not action.startswith("post_"):
+        return
+    # Group names of a user are derived from all user's entries, reload them instead of tracking counts.
+    user_id = None if reverse else instance.created_by_id
+    transaction.on_commit(partial(autocomplete.invalidate, user_id))
+
+
+@receiver(post_save, sender=PhonebookGroup)
+@receiver(post_delete, sender=PhonebookGroup)
+def phonebook_group_autocomplete_changed(sender, *args, **kwargs) -> None:
+    # A new group is not linked to any entry yet.
+    if not kwargs.get("created"):
+        transaction.on_commit(autocomplete.invalidate)
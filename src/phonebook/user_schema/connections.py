@@ -0,0 +1,70 @@
+from functools import partial
+from typing import Any
+
+import graphene
+from django.db.models import QuerySet
+from graphene_django.filter import DjangoFilterConnectionField
+
+from phonebook.counters import get_entry_count
+from phonebook.models import PhonebookEntry
+
+
+class CountedQuerySet:
+    """
+    Queryset with a known length.
+
+    Connection pagination calls ``len`` instead of running ``COUNT(*)`` over the queryset, slicing
+    still returns a lazy queryset, so only the requested page is fetched.
+    """
+
+    def __init__(self, queryset: QuerySet[PhonebookEntry], count: int) -> None:
+        self.queryset = queryset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, key: slice) -> QuerySet[PhonebookEntry]:
+        return self.queryset[key]
+
+
+class PhonebookEntryConnectionField(DjangoFilterConnectionField):
+    """
+    Connection of phonebook entries which takes its total from entry counters while no filter is applied.
+
+    With ``owned`` the connection lists entries of the requesting user and uses the user's counter,
+    otherwise it lists all entries and uses the global one.
+    """
+
+    def __init__(self, *args, owned: bool = False, **kwargs) -> None:
+        self.owned = owned
+        super().__init__(*args, **kwargs)
+
+    def get_queryset_resolver(self) -> partial:
+        return partial(
+            self.resolve_counted_queryset,
+            filterset_class=self.filterset_class,
+            filtering_args=self.filtering_args,
+            owned=self.owned,
+        )
+
+    @classmethod
+    def resolve_counted_queryset(
+        cls,
+        connection: type[graphene.relay.Connection],
+        iterable: QuerySet[PhonebookEntry],
+        info: graphene.ResolveInfo,
+        args: dict[str, Any],
+        filtering_args: dict[str, Any],
+        filterset_class: type,
+        owned: bool,
+    ) -> QuerySet[PhonebookEntry] | CountedQuerySet:
+        queryset = cls.resolve_queryset(connection, iterable, info, args, filtering_args, filterset_class)
+        # Ordering does not change the total.
+        if any(args.get(name) not in (None, "") for name in filtering_args if name != "order_by"):
+            return queryset
+        if not owned:
+            return CountedQuerySet(queryset, get_entry_count())
+        if info.context.user.is_authenticated:
+            return CountedQuerySet(queryset, get_entry_count(info.context.user))
+        return queryset
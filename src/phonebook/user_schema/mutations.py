@@ -1,6 +1,7 @@
 import logging
 
 import graphene
+from django.conf import settings
 from graphene import ClientIDMutation
 
 from api.exceptions import InputIdTypeMismatchError
@@ -170,6 +171,45 @@ class DeletePhonebookEntry(ClientIDMutation):
             return cls(result=DeletePhonebookEntryError(reason=e.reason))
 
 
+class DeletePhonebookEntriesSuccess(graphene.ObjectType):
+    deleted_count = graphene.Int()
+
+
+class DeletePhonebookEntriesError(graphene.ObjectType):
+    reason = graphene.String()
+
+
+class DeletePhonebookEntriesResult(graphene.Union):
+    class Meta:
+        types = (DeletePhonebookEntriesSuccess, DeletePhonebookEntriesError)
+
+
+class DeletePhonebookEntries(ClientIDMutation):
+    class Input:
+        ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+    result = graphene.Field(DeletePhonebookEntriesResult)
+
+    @classmethod
+    @login_required
+    def mutate_and_get_payload(
+        cls,
+        root,
+        info: graphene.ResolveInfo,
+        ids: list[str],
+    ) -> "DeletePhonebookEntries":
+        try:
+            deleted_count = PhonebookHandler().delete_many(
+                user=info.context.user,
+                entry_ids=[int(validate_gid(entry_id, "PhonebookEntryNode")) for entry_id in ids],
+            )
+            return cls(result=DeletePhonebookEntriesSuccess(deleted_count=deleted_count))
+        except InputIdTypeMismatchError:
+            return cls(result=DeletePhonebookEntriesError(reason="Invalid phonebook entry id!"))
+        except PhonebookError as e:
+            return cls(result=DeletePhonebookEntriesError(reason=e.reason))
+
+
 class AddPhonebookEntryGroupSuccess(graphene.ObjectType):
     phonebook = graphene.Field(PhonebookEntryNode)
 
@@ -339,7 +379,8 @@ class RemovePhonebookEntryNumber(ClientIDMutation):
 
 
 class AddPhonebookEntryRatingSuccess(graphene.ObjectType):
-    phonebook = graphene.Field(PhonebookEntryNode)
+    phonebook = graphene.Field(PhonebookEntryNode, description="Rated entry, empty when the rating was queued.")
+    queued = graphene.Boolean(description="Rating was accepted into the ingestion buffer and is written later.")
 
 
 class AddPhonebookEntryRatingError(graphene.ObjectType):
@@ -368,24 +409,75 @@ class AddPhonebookEntryRatingGroup(ClientIDMutation):
         rate: int,
     ) -> "AddPhonebookEntryRatingGroup":
         try:
+            if settings.PHONEBOOK_RATING_BUFFER_ENABLED:
+                PhonebookHandler().buffer_rating(
+                    user=info.context.user,
+                    entry_id=int(validate_gid(entry_id, "PhonebookEntryNode")),
+                    rate=rate,
+                )
+                return cls(result=AddPhonebookEntryRatingSuccess(queued=True))
             entry = PhonebookHandler().add_rating(
                 user=info.context.user,
                 entry_id=int(validate_gid(entry_id, "PhonebookEntryNode")),
                 rate=rate,
             )
-            return cls(result=AddPhonebookEntryRatingSuccess(phonebook=entry))
+            return cls(result=AddPhonebookEntryRatingSuccess(phonebook=entry, queued=False))
         except InputIdTypeMismatchError:
             return cls(result=AddPhonebookEntryRatingError(reason="Invalid phonebook entry id!"))
         except PhonebookError as e:
             return cls(result=AddPhonebookEntryRatingError(reason=e.reason))
 
 
+class MergePhonebookEntriesSuccess(graphene.ObjectType):
+    phonebook = graphene.Field(PhonebookEntryNode)
+
+
+class MergePhonebookEntriesError(graphene.ObjectType):
+    reason = graphene.String()
+
+
+class MergePhonebookEntriesResult(graphene.Union):
+    class Meta:
+        types = (MergePhonebookEntriesSuccess, MergePhonebookEntriesError)
+
+
+class MergePhonebookEntries(ClientIDMutation):
+    class Input:
+        target_id = graphene.ID(required=True)
+        source_ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+    result = graphene.Field(MergePhonebookEntriesResult)
+
+    @classmethod
+    @login_required
+    def mutate_and_get_payload(
+        cls,
+        root,
+        info: graphene.ResolveInfo,
+        target_id: str,
+        source_ids: list[str],
+    ) -> "MergePhonebookEntries":
+        try:
+            entry = PhonebookHandler().merge(
+                user=info.context.user,
+                target_id=int(validate_gid(target_id, "PhonebookEntryNode")),
+                source_ids=[int(validate_gid(source_id, "PhonebookEntryNode")) for source_id in source_ids],
+            )
+            return cls(result=MergePhonebookEntriesSuccess(phonebook=entry))
+        except InputIdTypeMismatchError:
+            return cls(result=MergePhonebookEntriesError(reason="Invalid phonebook entry id!"))
+        except PhonebookError as e:
+            return cls(result=MergePhonebookEntriesError(reason=e.reason))
+
+
 class Mutation(graphene.ObjectType):
     add_phonebook_entry = AddPhonebookEntry.Field()
     update_phonebook_entry = UpdatePhonebookEntry.Field()
     delete_phonebook_entry = DeletePhonebookEntry.Field()
+    delete_phonebook_entries = DeletePhonebookEntries.Field()
     add_phonebook_entry_group = AddPhonebookEntryGroup.Field()
     remove_phonebook_entry_group = RemovePhonebookEntryGroup.Field()
     add_phonebook_entry_number = AddPhonebookEntryNumber.Field()
     remove_phonebook_entry_number = RemovePhonebookEntryNumber.Field()
     add_phonebook_entry_rate = AddPhonebookEntryRatingGroup.Field()
+    merge_phonebook_entries = MergePhonebookEntries.Field()
@@ -2,11 +2,17 @@ from decimal import Decimal
 
 import graphene
 from django.db.models import QuerySet
-from django.db.models.aggregates import Avg, Count
 from graphene_django import DjangoObjectType
-from graphene_django.filter import DjangoFilterConnectionField
 
+from api.graphql_utils import login_required
+from phonebook.autocomplete import Suggestion, SuggestionKindEnum, autocomplete
+from phonebook.counters import CountModeEnum, get_entry_count
+from phonebook.digest import DigestRange, PhonebookDigestHandler
+from phonebook.directory_snapshot import get_directory
+from phonebook.duplicates import DuplicateGroup, get_duplicate_entries
+from phonebook.facets import FacetCount, PhonebookFacets, get_phonebook_facets
 from phonebook.filters import PhonebookFilterSet
+from phonebook.lookups import cities, countries
 from phonebook.models import (
     PhonebookEntry,
     PhonebookEntryTypeEnum,
@@ -14,9 +20,16 @@ from phonebook.models import (
     PhonebookNumber,
     PhonebookNumberTypeEnum,
 )
+from phonebook.rating_rollup import rating_histogram
+from phonebook.user_schema.connections import PhonebookEntryConnectionField
 
 TypeEnum = graphene.Enum.from_enum(PhonebookEntryTypeEnum, name="PhonebookEntryTypeEnum")
 NumberTypeEnum = graphene.Enum.from_enum(PhonebookNumberTypeEnum, name="PhonebookNumberTypeEnum")
+CountEnum = graphene.Enum.from_enum(CountModeEnum, name="CountModeEnum")
+KindEnum = graphene.Enum.from_enum(SuggestionKindEnum, name="SuggestionKindEnum")
+
+TOP_PHONEBOOK_ENTRIES_MAX_LIMIT = 100
+AUTOCOMPLETE_MAX_LIMIT = 50
 
 
 class PhonebookNumberNode(DjangoObjectType):
@@ -27,6 +40,16 @@ class PhonebookNumberNode(DjangoObjectType):
         fields = ("number",)
         interfaces = (graphene.relay.Node,)
 
+    @classmethod
+    def get_node(cls, info: graphene.ResolveInfo, id: int) -> PhonebookNumber | None:
+        queryset = cls.get_queryset(cls._meta.model.objects, info)
+        try:
+            return queryset.get(
+                pk=id, phonebook_entry__created_by=info.context.user, phonebook_entry__deleted_at__isnull=True
+            )
+        except cls._meta.model.DoesNotExist:
+            return None
+
 
 class PhonebookGroupNode(DjangoObjectType):
     class Meta:
@@ -34,12 +57,21 @@ class PhonebookGroupNode(DjangoObjectType):
         fields = ("name",)
 
 
+class RatingHistogramBucket(graphene.ObjectType):
+    rate = graphene.Int()
+    count = graphene.Int()
+
+
 class PhonebookEntryNode(DjangoObjectType):
     type = TypeEnum()
     numbers = graphene.List(PhonebookNumberNode)
+    city = graphene.String()
+    country = graphene.String()
     groups = graphene.List(graphene.String)
     rating = graphene.Decimal()
     rating_count = graphene.Int()
+    rating_score = graphene.Float()
+    rating_histogram = graphene.List(RatingHistogramBucket)
 
     class Meta:
         model = PhonebookEntry
@@ -61,26 +93,178 @@ class PhonebookEntryNode(DjangoObjectType):
     def resolve_numbers(self, info: graphene.ResolveInfo) -> QuerySet["PhonebookNumber"]:
         return self.phonebook_number.all()
 
+    def resolve_city(self, info: graphene.ResolveInfo) -> str:
+        return cities.get_name(self.city_id)
+
+    def resolve_country(self, info: graphene.ResolveInfo) -> str:
+        return countries.get_name(self.country_id)
+
     def resolve_groups(self, info: graphene.ResolveInfo) -> list[str]:
-        return self.groups.all().values_list("name", flat=True)
+        return self.group_names
 
     def resolve_rating(self, info: graphene.ResolveInfo) -> Decimal:
-        return round(Decimal(self.phonebook_rating.aggregate(Avg("rate", default=0))["rate__avg"]), 2)
+        return round(Decimal(self.rating_sum) / (self.rating_count or 1), 2)
 
     def resolve_rating_count(self, info: graphene.ResolveInfo) -> int:
-        return self.rating__count
+        return self.rating_count
 
+    def resolve_rating_score(self, info: graphene.ResolveInfo) -> float:
+        return self.rating_score
 
-class Query(graphene.ObjectType):
-    phonebook_entry = DjangoFilterConnectionField(PhonebookEntryNode)
-    phonebook_entry_count = graphene.Int()
+    def resolve_rating_histogram(self, info: graphene.ResolveInfo) -> list[RatingHistogramBucket]:
+        return [RatingHistogramBucket(rate=rate, count=count) for rate, count in rating_histogram(self.id).items()]
 
-    def resolve_phonebook_entry(self, info: graphene.ResolveInfo, **kwargs) -> QuerySet[PhonebookEntry]:
+
+class PhonebookDigestRangeNode(graphene.ObjectType):
+    level = graphene.Int()
+    start_id = graphene.Int()
+    end_id = graphene.Int()
+    digest = graphene.String()
+    entry_count = graphene.Int()
+
+
+class AutocompleteSuggestion(graphene.ObjectType):
+    value = graphene.String()
+    kind = KindEnum()
+
+
+class DuplicateEntryGroup(graphene.ObjectType):
+    entries = graphene.List(PhonebookEntryNode)
+    score = graphene.Float()
+
+    def resolve_entries(self: DuplicateGroup, info: graphene.ResolveInfo) -> QuerySet[PhonebookEntry]:
         return (
-            PhonebookEntry.objects.annotate(rating__count=Count("phonebook_rating"))
-            .prefetch_related("groups", "phonebook_number")
-            .all()
+            PhonebookEntry.objects.prefetch_related("phonebook_number")
+            .filter(id__in=self.entry_ids, created_by=info.context.user)
+            .order_by("id")
         )
 
-    def resolve_phonebook_entry_count(self, info: graphene.ResolveInfo, **kwargs) -> int:
-        return PhonebookEntry.objects.all().count()
+
+class PhonebookFacetCount(graphene.ObjectType):
+    value = graphene.String()
+    count = graphene.Int()
+
+
+class PhonebookFacetsNode(graphene.ObjectType):
+    total = graphene.Int()
+    types = graphene.List(PhonebookFacetCount)
+    cities = graphene.List(PhonebookFacetCount)
+    countries = graphene.List(PhonebookFacetCount)
+    groups = graphene.List(PhonebookFacetCount)
+
+    def resolve_types(self: PhonebookFacets, info: graphene.ResolveInfo) -> list[FacetCount]:
+        return self.facets["type"]
+
+    def resolve_cities(self: PhonebookFacets, info: graphene.ResolveInfo) -> list[FacetCount]:
+        return self.facets["city"]
+
+    def resolve_countries(self: PhonebookFacets, info: graphene.ResolveInfo) -> list[FacetCount]:
+        return self.facets["country"]
+
+    def resolve_groups(self: PhonebookFacets, info: graphene.ResolveInfo) -> list[FacetCount]:
+        return self.facets["group"]
+
+
+class PhonebookFacetsFilter(graphene.InputObjectType):
+    type = TypeEnum()
+    city = graphene.String()
+    search = graphene.String()
+
+
+class Query(graphene.ObjectType):
+    phonebook_entry = PhonebookEntryConnectionField(PhonebookEntryNode)
+    phonebook_entry_count = graphene.Int(
+        mode=CountEnum(default_value=CountModeEnum.exact),
+        description="Number of all entries. Approximate count is read from table statistics.",
+    )
+    top_phonebook_entries = graphene.List(
+        PhonebookEntryNode,
+        city=graphene.String(),
+        type=TypeEnum(),
+        group=graphene.String(),
+        limit=graphene.Int(default_value=10),
+        description="Best rated entries, ranked by Bayesian average of ratings.",
+    )
+    autocomplete = graphene.List(
+        AutocompleteSuggestion,
+        prefix=graphene.String(required=True),
+        limit=graphene.Int(default_value=10),
+        description="Names of user's entries and their groups starting with prefix.",
+    )
+    phonebook_entries_by_number = graphene.List(
+        PhonebookEntryNode,
+        number=graphene.String(required=True),
+        description="User's entries with given number, matched ignoring formatting when directory snapshot is built.",
+    )
+    find_duplicate_entries = graphene.List(
+        DuplicateEntryGroup,
+        threshold=graphene.Float(),
+        description="Groups of user's entries with similar numbers, name and address.",
+    )
+    phonebook_facets = graphene.Field(PhonebookFacetsNode, filter=PhonebookFacetsFilter())
+    phonebook_digest = graphene.List(
+        PhonebookDigestRangeNode,
+        level=graphene.Int(),
+        start_id=graphene.Int(),
+        end_id=graphene.Int(),
+        description="Merkle tree nodes of user's entries. Returns tree root when level is omitted.",
+    )
+
+    def resolve_phonebook_entry(self, info: graphene.ResolveInfo, **kwargs) -> QuerySet[PhonebookEntry]:
+        return PhonebookEntry.objects.prefetch_related("phonebook_number").all()
+
+    def resolve_phonebook_entry_count(self, info: graphene.ResolveInfo, mode: str = CountModeEnum.exact) -> int:
+        return get_entry_count(mode=mode)
+
+    def resolve_top_phonebook_entries(
+        self,
+        info: graphene.ResolveInfo,
+        city: str | None = None,
+        type: str | None = None,
+        group: str | None = None,
+        limit: int = 10,
+    ) -> QuerySet[PhonebookEntry]:
+        queryset = PhonebookEntry.objects.prefetch_related("phonebook_number")
+        if city:
+            queryset = queryset.filter(city_id=cities.find_id(city))
+        if type:
+            queryset = queryset.filter(type=type)
+        if group:
+            queryset = queryset.filter(group_names__contains=[group.lower()])
+        return queryset.order_by("-rating_score", "id")[: min(max(limit, 0), TOP_PHONEBOOK_ENTRIES_MAX_LIMIT)]
+
+    @login_required
+    def resolve_phonebook_digest(
+        self,
+        info: graphene.ResolveInfo,
+        level: int | None = None,
+        start_id: int | None = None,
+        end_id: int | None = None,
+    ) -> list[DigestRange]:
+        handler = PhonebookDigestHandler()
+        if level is None:
+            return [handler.get_root(info.context.user)]
+        return handler.get_ranges(info.context.user, level=level, start_id=start_id, end_id=end_id)
+
+    @login_required
+    def resolve_autocomplete(self, info: graphene.ResolveInfo, prefix: str, limit: int = 10) -> list[Suggestion]:
+        return autocomplete(info.context.user.id, prefix, min(max(limit, 0), AUTOCOMPLETE_MAX_LIMIT))
+
+    @login_required
+    def resolve_phonebook_entries_by_number(self, info: graphene.ResolveInfo, number: str) -> QuerySet[PhonebookEntry]:
+        queryset = PhonebookEntry.objects.prefetch_related("phonebook_number").filter(created_by=info.context.user)
+        directory = get_directory()
+        if directory is None:
+            return queryset.filter(phonebook_number__number=number).distinct().order_by("id")
+        return queryset.filter(id__in=directory.find_entry_ids(number, info.context.user.id)).order_by("id")
+
+    @login_required
+    def resolve_find_duplicate_entries(
+        self, info: graphene.ResolveInfo, threshold: float | None = None
+    ) -> list[DuplicateGroup]:
+        return get_duplicate_entries(info.context.user, threshold)
+
+    def resolve_phonebook_facets(
+        self, info: graphene.ResolveInfo, filter: PhonebookFacetsFilter | None = None
+    ) -> PhonebookFacets:
+        return get_phonebook_facets(dict(filter or {}))
@@ -0,0 +1,48 @@
+from typing import AsyncIterator
+
+import graphene
+from graphql import GraphQLError
+from graphql_relay import to_global_id
+
+from api.broker import get_broker
+from api.graphql_utils import login_required, validate_gid
+from phonebook.events import PHONEBOOK_EVENTS_CHANNEL, PhonebookEventKindEnum
+from phonebook.models import PhonebookEntry
+
+EventKindEnum = graphene.Enum.from_enum(PhonebookEventKindEnum, name="PhonebookEventKindEnum")
+
+
+class PhonebookEntryEvent(graphene.ObjectType):
+    kind = EventKindEnum()
+    entry_id = graphene.ID()
+    rate = graphene.Int()
+
+
+async def entry_events(user_id: int, entry_id: int | None = None) -> AsyncIterator[PhonebookEntryEvent]:
+    """Events of entries owned by ``user_id``, only of ``entry_id`` when given."""
+    async for message in get_broker().subscribe(PHONEBOOK_EVENTS_CHANNEL):
+        if message.get("created_by_id") != user_id:
+            continue
+        if entry_id is not None and message["entry_id"] != entry_id:
+            continue
+        yield PhonebookEntryEvent(
+            kind=message["kind"],
+            entry_id=to_global_id("PhonebookEntryNode", message["entry_id"]),
+            rate=message.get("rate"),
+        )
+
+
+class Subscription(graphene.ObjectType):
+    phonebook_entry_events = graphene.Field(PhonebookEntryEvent, entry_id=graphene.ID())
+
+    @login_required
+    async def subscribe_phonebook_entry_events(
+        root, info: graphene.ResolveInfo, entry_id: str | None = None
+    ) -> AsyncIterator[PhonebookEntryEvent]:
+        user = info.context.user
+        if not entry_id:
+            return entry_events(user.id)
+        entry_pk = int(validate_gid(entry_id, "PhonebookEntryNode"))
+        if not await PhonebookEntry.objects.filter(id=entry_pk, created_by=user).aexists():
+            raise GraphQLError("Entry with given id does not exists!")
+        return entry_events(user.id, entry_pk)
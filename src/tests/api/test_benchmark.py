@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from api.benchmark import ImportTime, middleware_overhead, parse_import_time
+
+IMPORT_TIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | io
+import time:        50 |         50 |     django.utils.version
+import time:       900 |        950 |   django.utils
+import time:      1000 |       1950 | django
+"""
+
+
+def test_parse_import_time() -> None:
+    assert parse_import_time(IMPORT_TIME_OUTPUT) == [
+        ImportTime(module="django", self_us=1000, cumulative_us=1950),
+        ImportTime(module="io", self_us=300, cumulative_us=420),
+    ]
+
+
+@pytest.mark.django_db
+def test_middleware_overhead() -> None:
+    with_middleware, without_middleware = middleware_overhead("/graphql/?query=%7B__typename%7D", 5)
+    assert with_middleware > 0
+    assert without_middleware > 0
+
+
+def test_admin_not_imported_when_disabled() -> None:
+    code = (
+        "import sys, django; django.setup(); "
+        "from django.urls import get_resolver; get_resolver().url_patterns; "
+        "print('django.contrib.admin' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "ADMIN_ENABLED": "False", "DEBUG_TOOLBAR": "False"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,68 @@
+import logging
+import resource
+import sys
+import tracemalloc
+from unittest.mock import Mock
+
+import pytest
+
+from api import memory
+from api.memory import current_rss, dump_allocation_diff
+from zai import gunicorn_config
+
+
+@pytest.fixture
+def memory_dump_dir(settings, tmp_path, monkeypatch):
+    settings.MEMORY_DUMP_DIR = str(tmp_path)
+    monkeypatch.setattr(memory, "_snapshot", None)
+    yield tmp_path
+    tracemalloc.stop()
+
+
+def test_current_rss() -> None:
+    assert current_rss() > 0
+
+
+@pytest.mark.parametrize("platform,scale", [("linux", 1024), ("darwin", 1)])
+def test_current_rss_without_proc(monkeypatch, platform, scale) -> None:
+    monkeypatch.setattr(memory, "open", Mock(side_effect=FileNotFoundError), raising=False)
+    monkeypatch.setattr(sys, "platform", platform)
+    monkeypatch.setattr(resource, "getrusage", Mock(return_value=Mock(ru_maxrss=2048)))
+
+    assert current_rss() == 2048 * scale
+
+
+def test_dump_allocation_diff(memory_dump_dir) -> None:
+    assert dump_allocation_diff() is None
+    assert tracemalloc.is_tracing()
+
+    allocated = [bytearray(1024) for _ in range(1000)]
+    path = dump_allocation_diff()
+
+    assert path is not None and path.parent == memory_dump_dir
+    assert "test_memory.py" in path.read_text()
+    assert allocated
+
+
+@pytest.mark.django_db
+def test_memory_tracking_middleware_logs_operation(client, settings, memory_dump_dir, caplog) -> None:
+    settings.MEMORY_TRACKING = True
+    settings.MEMORY_REQUEST_LOG_THRESHOLD = 0
+    tracemalloc.start()
+
+    with caplog.at_level(logging.WARNING, logger="api.middleware"):
+        client.post("/graphql/", {"query": "query Ping { __typename }"}, content_type="application/json")
+        client.get("/admin/login/")
+
+    assert [record.message.split()[:3] for record in caplog.records] == [["GraphQL", "operation", "Ping"]]
+
+
+def test_gunicorn_recycles_worker_over_max_rss(monkeypatch) -> None:
+    worker = Mock(alive=True)
+    monkeypatch.setattr(gunicorn_config, "worker_max_rss", current_rss() * 2)
+    gunicorn_config.post_request(worker, None, {}, None)
+    assert worker.alive
+
+    monkeypatch.setattr(gunicorn_config, "worker_max_rss", 1)
+    gunicorn_config.post_request(worker, None, {}, None)
+    assert not worker.alive
@@ -0,0 +1,46 @@
+from django.contrib.sessions.backends.base import SessionBase
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from api.benchmark import session_middleware_time
+from api.middleware import CustomSessionMiddleware
+
+
+def _session_middleware(session_key: str = "") -> CustomSessionMiddleware:
+    def view(request) -> HttpResponse:
+        if session_key:
+            request.session[session_key] = "value"
+        return HttpResponse()
+
+    return CustomSessionMiddleware(view)
+
+
+def test_session_middleware_skips_graphql_path(settings) -> None:
+    request = RequestFactory().post("/graphql/")
+    response = _session_middleware("key")(request)
+
+    assert request.session == {"key": "value"}
+    assert isinstance(response, HttpResponse)
+    assert settings.SESSION_COOKIE_NAME not in response.cookies
+
+
+def test_session_middleware_skips_graphql_path_with_script_prefix() -> None:
+    request = RequestFactory().get("/graphql/", SCRIPT_NAME="/app")
+    _session_middleware()(request)
+
+    assert request.session == {}
+
+
+def test_session_middleware_loads_session_on_other_paths(db, settings) -> None:
+    request = RequestFactory().get("/admin/login/", QUERY_STRING="next=/graphql/")
+    response = _session_middleware("key")(request)
+
+    assert isinstance(request.session, SessionBase)
+    assert isinstance(response, HttpResponse)
+    assert settings.SESSION_COOKIE_NAME in response.cookies
+
+
+def test_session_middleware_time() -> None:
+    before, after = session_middleware_time("/graphql/", 10)
+    assert before > 0
+    assert after > 0
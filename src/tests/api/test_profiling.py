@@ -0,0 +1,50 @@
+import pstats
+
+import pytest
+
+from api.profiling import PROFILING_HEADER, profiling_token
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 0
+    settings.PROFILING_DIR = str(tmp_path)
+    settings.PROFILING_MAX_FILES = 2
+    return tmp_path
+
+
+def _query(client, headers: dict[str, str] | None = None):
+    return client.post(
+        "/graphql/", {"query": "query Ping { __typename }"}, content_type="application/json", headers=headers
+    )
+
+
+@pytest.mark.django_db
+def test_profiling_signed_request(client, profiling) -> None:
+    for _ in range(3):
+        response = _query(client, headers={PROFILING_HEADER: profiling_token()})
+        assert response.status_code == 200
+
+    paths = sorted(profiling.iterdir())
+    assert len(paths) == 2
+    assert all(path.name.startswith("Ping.") for path in paths)
+    assert pstats.Stats(str(paths[0])).get_stats_profile().func_profiles
+
+
+@pytest.mark.django_db
+def test_profiling_ignores_unsigned_and_other_requests(client, profiling) -> None:
+    _query(client, headers={PROFILING_HEADER: "profile:forged"})
+    _query(client)
+    client.get("/admin/login/")
+
+    assert list(profiling.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_profiling_sample_rate(client, settings, profiling) -> None:
+    settings.PROFILING_SAMPLE_RATE = 1
+    _query(client)
+    client.get("/admin/login/", headers={PROFILING_HEADER: profiling_token()})
+
+    assert [path.name.split(".")[0] for path in profiling.iterdir()] == ["Ping"]
@@ -0,0 +1,174 @@
+import json
+from unittest.mock import ANY
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from graphene.test import Client
+
+from api import slow_queries
+from api.graphql.schema import schema
+from api.query_context import (
+    QueryContext,
+    QueryContextMiddleware,
+    end_query_context,
+    get_query_context,
+    start_query_context,
+)
+from api.slow_queries import explain_slow_queries, read_slow_queries, sql_fingerprint, summarize_slow_queries
+
+
+class FakeCursor:
+    def __init__(self, executed: list) -> None:
+        self.executed = executed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def execute(self, sql, params) -> None:
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return [[{"Plan": {"Node Type": "Seq Scan"}}]]
+
+
+class FakeConnection:
+    # Savepoint of the plan is taken on the test database.
+    alias = "default"
+
+    def __init__(self) -> None:
+        self.executed: list = []
+        self.connection = self
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self.executed)
+
+
+@pytest.fixture
+def slow_query_log(settings, tmp_path, monkeypatch):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_SAMPLE_RATE = 1
+    settings.SLOW_QUERY_LOG_PATH = str(tmp_path / "slow_queries.log")
+    monkeypatch.setattr(slow_queries, "_log_handler", None)
+    return tmp_path / "slow_queries.log"
+
+
+def _execute(sql, params, many, context) -> str:
+    return "result"
+
+
+def test_sql_fingerprint() -> None:
+    assert sql_fingerprint("SELECT * FROM t WHERE a = 'x''y' AND b = 10\n AND c IN (%s, %s, %s)") == (
+        "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)"
+    )
+    assert sql_fingerprint("SELECT * FROM t WHERE c IN (%s)") == sql_fingerprint("SELECT * FROM t WHERE c IN (%s, %s)")
+
+
+@pytest.mark.django_db
+def test_explain_slow_queries_writes_plan(slow_query_log) -> None:
+    fake_connection = FakeConnection()
+    token = start_query_context("request-1")
+    query_context = token.var.get()
+    assert query_context
+    query_context.operation = "Phonebook"
+    query_context.resolver = "Query.phonebookEntry"
+    try:
+        result = explain_slow_queries(
+            _execute, "SELECT * FROM t WHERE id = %s", [1], False, {"connection": fake_connection}
+        )
+    finally:
+        end_query_context(token)
+
+    assert result == "result"
+    assert fake_connection.executed == [("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT * FROM t WHERE id = %s", [1])]
+    [record] = read_slow_queries()
+    assert record["fingerprint"] == "SELECT * FROM t WHERE id = ?"
+    assert record["operation"] == "Phonebook"
+    assert record["resolver"] == "Query.phonebookEntry"
+    assert record["request_id"] == "request-1"
+    assert record["plan"] == [{"Plan": {"Node Type": "Seq Scan"}}]
+
+
+def test_explain_slow_queries_skips_writes_and_fast_statements(settings, slow_query_log) -> None:
+    fake_connection = FakeConnection()
+    explain_slow_queries(_execute, "UPDATE t SET a = 1", None, False, {"connection": fake_connection})
+    settings.SLOW_QUERY_THRESHOLD_MS = 1000
+    explain_slow_queries(_execute, "SELECT 1", None, False, {"connection": fake_connection})
+
+    assert fake_connection.executed == []
+    assert not slow_query_log.exists()
+
+
+@pytest.mark.django_db
+def test_explain_slow_queries_explains_with_statements(slow_query_log) -> None:
+    fake_connection = FakeConnection()
+    sql = "WITH ids AS (SELECT id FROM t) SELECT * FROM ids"
+
+    explain_slow_queries(_execute, sql, None, False, {"connection": fake_connection})
+
+    assert fake_connection.executed == [(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", None)]
+
+
+@pytest.mark.django_db
+def test_explain_slow_queries_keeps_transaction_on_failure(data_fixture, slow_query_log) -> None:
+    user = data_fixture.create_user()
+    # EXPLAIN (ANALYZE) is not supported by the test database, so explaining fails.
+    with transaction.atomic():
+        result = explain_slow_queries(_execute, "SELECT 1", None, False, {"connection": connection})
+        user.refresh_from_db()
+
+    assert result == "result"
+    assert not slow_query_log.exists()
+
+
+@pytest.mark.django_db
+def test_query_context_middleware_attributes_sql_to_resolver(data_fixture) -> None:
+    user = data_fixture.create_user()
+    data_fixture.create_phonebook_entry(created_by=user)
+    resolvers = []
+
+    def record_resolver(execute, sql, params, many, context):
+        query_context = get_query_context()
+        resolvers.append(query_context.resolver if query_context else "")
+        return execute(sql, params, many, context)
+
+    class TestContext:
+        def __init__(self, user):
+            self.user = user
+            self.COOKIES: dict = {}
+
+    token = start_query_context()
+    try:
+        with connection.execute_wrapper(record_resolver):
+            result = Client(schema, context_value=TestContext(user), middleware=[QueryContextMiddleware()]).execute(
+                "query Phonebook { phonebookEntry { edges { node { name numbers { number } } } } }"
+            )
+        assert token.var.get() == QueryContext(request_id=ANY, operation="Phonebook")
+    finally:
+        end_query_context(token)
+
+    assert "errors" not in result
+    assert set(resolvers) == {"Query.phonebookEntry"}
+
+
+def test_report_slow_queries(slow_query_log, capsys) -> None:
+    records = [
+        {"fingerprint_id": "a", "fingerprint": "SELECT a", "duration_ms": 300, "plan": "a1", "resolver": ""},
+        {"fingerprint_id": "a", "fingerprint": "SELECT a", "duration_ms": 500, "plan": "a2", "resolver": ""},
+        {"fingerprint_id": "b", "fingerprint": "SELECT b", "duration_ms": 600, "plan": "b1", "resolver": "Q.b"},
+    ]
+    slow_query_log.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+
+    summaries = summarize_slow_queries(read_slow_queries())
+    assert [(summary.fingerprint_id, summary.count, summary.max_ms, summary.plan) for summary in summaries] == [
+        ("a", 2, 500, "a2"),
+        ("b", 1, 600, "b1"),
+    ]
+
+    call_command("report_slow_queries", limit=1)
+    output = capsys.readouterr().out
+    assert "a count=2 total=800ms mean=400ms max=500ms" in output
+    assert "SELECT b" not in output
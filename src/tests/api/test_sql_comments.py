@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+
+from api.query_context import end_query_context, start_query_context
+from api.slow_queries import sql_fingerprint
+from api.sql_comments import comment_sql, sql_comment
+from users.models import User
+
+
+def test_sql_comment_is_empty_outside_of_request() -> None:
+    assert sql_comment() == ""
+
+
+def test_sql_comment_orders_keys_and_quotes_values() -> None:
+    token = start_query_context("request 1")
+    query_context = token.var.get()
+    assert query_context
+    query_context.operation = "Phonebook"
+    query_context.resolver = "PhonebookEntryNode.rating"
+    try:
+        assert sql_comment() == (
+            " /*graphql_operation='Phonebook',graphql_resolver='PhonebookEntryNode.rating',request_id='request%201'*/"
+        )
+        query_context.mutation = "addPhonebookEntry"
+        assert sql_comment().startswith(" /*graphql_mutation='addPhonebookEntry',graphql_operation='Phonebook',")
+    finally:
+        end_query_context(token)
+
+
+@pytest.mark.django_db
+def test_comment_sql_tags_statements(data_fixture) -> None:
+    user = data_fixture.create_user()
+    executed = []
+
+    def record_sql(execute, sql, params, many, context):
+        executed.append(sql)
+        return execute(sql, params, many, context)
+
+    token = start_query_context("request 1")
+    try:
+        with connection.execute_wrapper(comment_sql), connection.execute_wrapper(record_sql):
+            assert User.objects.get(id=user.id) == user
+    finally:
+        end_query_context(token)
+
+    [sql] = executed
+    assert sql.endswith(" /*request_id='request%%201'*/")
+    assert "/*" not in sql_fingerprint(sql)
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from django.core.handlers.asgi import ASGIHandler
+from django.test import RequestFactory
+from graphene_django.views import GraphQLView
+
+from api.single_flight import SingleFlight
+from api.views import read_only_document, visibility_scope
+
+QUERY = "query Ping { __typename }"
+
+
+def test_read_only_document() -> None:
+    assert read_only_document(QUERY, None) == read_only_document("query Ping {\n  __typename\n}", None)
+    assert read_only_document("mutation Logout { deleteTokenCookie { deleted } }", None) is None
+    assert read_only_document("query Ping { __typename } mutation Logout { logout }", "Ping") is not None
+    assert read_only_document("query Ping { __typename } mutation Logout { logout }", "Logout") is None
+    assert read_only_document("query {", None) is None
+
+
+def test_visibility_scope() -> None:
+    factory = RequestFactory()
+    anonymous = factory.get("/graphql/")
+    first = factory.get("/graphql/", headers={"Authorization": "JWT first"})
+    second = factory.get("/graphql/", headers={"Authorization": "JWT second"})
+
+    assert visibility_scope(anonymous) == ""
+    assert visibility_scope(first) != visibility_scope(second)
+    assert visibility_scope(first) == visibility_scope(factory.get("/graphql/", headers={"Authorization": "JWT first"}))
+
+
+def test_single_flight_shares_result_of_concurrent_calls() -> None:
+    single_flight: SingleFlight[int] = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def func() -> int:
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return len(calls)
+
+    with ThreadPoolExecutor(4) as executor:
+        leader = executor.submit(single_flight.do, "key", func)
+        started.wait()
+        followers = [executor.submit(single_flight.do, "key", func) for _ in range(3)]
+        results = [leader.result()] + [follower.result() for follower in followers]
+
+    assert results == [1, 1, 1, 1]
+    assert single_flight.do("key", func) == 2
+
+
+def test_single_flight_shares_exception_and_times_out() -> None:
+    single_flight: SingleFlight[int] = SingleFlight()
+    started = threading.Event()
+
+    def fail() -> int:
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("failed")
+
+    with ThreadPoolExecutor(3) as executor:
+        leader = executor.submit(single_flight.do, "key", fail)
+        started.wait()
+        follower = executor.submit(single_flight.do, "key", lambda: 1)
+        impatient = executor.submit(single_flight.do, "key", lambda: 2, 0.01)
+        with pytest.raises(ValueError) as leader_error:
+            leader.result()
+        with pytest.raises(ValueError, match="failed") as follower_error:
+            follower.result()
+        assert follower_error.value is not leader_error.value
+        assert impatient.result() == 2
+
+
+@pytest.fixture
+def slow_graphql(monkeypatch) -> list[Any]:
+    calls = []
+
+    def get_response(self, request, data, show_graphiql=False):
+        calls.append(request)
+        time.sleep(0.3)
+        return json.dumps({"data": {"calls": len(calls)}}), 200
+
+    monkeypatch.setattr(GraphQLView, "get_response", get_response)
+    return calls
+
+
+async def _asgi_request(body: dict[str, Any], headers: list[tuple[bytes, bytes]]) -> dict[str, Any]:
+    events = [{"type": "http.request", "body": json.dumps(body).encode()}]
+    sent: list[Mapping[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        if events:
+            return events.pop(0)
+        await asyncio.sleep(10)
+        return {"type": "http.disconnect"}
+
+    async def send(event: Mapping[str, Any]) -> None:
+        sent.append(event)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/graphql/",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"localhost"), *headers],
+    }
+    await ASGIHandler()(scope, receive, send)
+    return json.loads(b"".join(event.get("body", b"") for event in sent if event["type"] == "http.response.body"))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_single_flight_view_asgi(settings, slow_graphql) -> None:
+    settings.GRAPHQL_SINGLE_FLIGHT = True
+
+    async def run() -> list[dict[str, Any]]:
+        return list(
+            await asyncio.gather(
+                _asgi_request({"query": QUERY}, []),
+                _asgi_request({"query": "query Ping {\n __typename\n}"}, []),
+                _asgi_request({"query": QUERY}, [(b"authorization", b"JWT token")]),
+                _asgi_request({"query": "mutation Logout { logout }"}, []),
+            )
+        )
+
+    responses = asyncio.run(run())
+
+    assert len(slow_graphql) == 3
+    assert responses[0] == responses[1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_single_flight_view_threaded(client, settings, slow_graphql) -> None:
+    settings.GRAPHQL_SINGLE_FLIGHT = True
+
+    def post(variables: dict[str, Any]) -> dict[str, Any]:
+        response = client.post("/graphql/", {"query": QUERY, "variables": variables}, content_type="application/json")
+        return response.json()
+
+    with ThreadPoolExecutor(4) as executor:
+        responses = list(executor.map(post, [{"a": 1, "b": 2}, {"b": 2, "a": 1}, {"a": 2}, {"a": 1, "b": 2}]))
+
+    assert len(slow_graphql) == 2
+    assert responses[0] == responses[1] == responses[3]
+
+    settings.GRAPHQL_SINGLE_FLIGHT = False
+    with ThreadPoolExecutor(2) as executor:
+        list(executor.map(post, [{}, {}]))
+    assert len(slow_graphql) == 4
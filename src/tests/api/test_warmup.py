@@ -0,0 +1,67 @@
+import gc
+import logging
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+
+from api.warmup import build_schema, warm_worker
+from phonebook.lookups import cities
+from zai import gunicorn_config
+
+
+def test_build_schema() -> None:
+    build_schema()
+
+
+def test_build_schema_rejects_invalid_schema(monkeypatch) -> None:
+    from api.graphql.schema import schema
+
+    monkeypatch.setattr(schema.graphql_schema, "_validation_errors", None)
+    monkeypatch.setattr(schema.graphql_schema, "query_type", None)
+    with pytest.raises(ImproperlyConfigured):
+        build_schema()
+
+
+@pytest.mark.django_db
+def test_warm_worker_loads_lookups(data_fixture, django_assert_num_queries, django_capture_on_commit_callbacks) -> None:
+    entry = data_fixture.create_phonebook_entry()
+    cities.clear()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        warm_worker()
+
+    with django_assert_num_queries(0):
+        assert cities.get_name(entry.city_id) == entry.city.name
+
+
+def test_gunicorn_on_starting_disables_gc() -> None:
+    try:
+        gunicorn_config.on_starting(None)
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+
+def test_gunicorn_when_ready_freezes_objects() -> None:
+    gc.disable()
+    try:
+        gunicorn_config.when_ready(None)
+        assert gc.get_freeze_count() > 0
+        assert gc.isenabled()
+    finally:
+        gc.unfreeze()
+        gc.enable()
+
+
+@pytest.mark.django_db
+def test_warm_worker_logs_failures(monkeypatch, caplog) -> None:
+    def unreachable() -> None:
+        raise OperationalError("connection refused")
+
+    monkeypatch.setattr(cities, "warm", unreachable)
+
+    with caplog.at_level(logging.ERROR, logger="api.warmup"):
+        warm_worker()
+
+    assert caplog.messages == ["Failed to warm worker connection refused"]
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from typing import Any
+
+from api.graphql.schema import schema
+from api.websocket import GRAPHQL_TRANSPORT_WS_PROTOCOL, GraphQLWebSocketApp
+
+
+def _run(
+    messages: list[dict[str, Any]], subprotocols: list[str] | None = None, app_schema: Any = schema
+) -> list[dict[str, Any]]:
+    events = [{"type": "websocket.connect"}]
+    events += [{"type": "websocket.receive", "text": json.dumps(message)} for message in messages]
+    sent: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        if events:
+            return events.pop(0)
+        await asyncio.sleep(0.01)
+        return {"type": "websocket.disconnect"}
+
+    async def send(event: dict[str, Any]) -> None:
+        sent.append(event)
+
+    scope = {"type": "websocket", "path": "/graphql/", "headers": [], "subprotocols": subprotocols or []}
+    asyncio.run(GraphQLWebSocketApp(app_schema)(scope, receive, send))
+    return sent
+
+
+def test_websocket_rejects_unknown_subprotocol() -> None:
+    sent = _run([])
+
+    assert sent == [{"type": "websocket.close", "code": 4406, "reason": "Subprotocol not acceptable"}]
+
+
+def test_websocket_connection_init_and_ping() -> None:
+    sent = _run([{"type": "connection_init"}, {"type": "ping"}], subprotocols=[GRAPHQL_TRANSPORT_WS_PROTOCOL])
+
+    assert sent == [
+        {"type": "websocket.accept", "subprotocol": GRAPHQL_TRANSPORT_WS_PROTOCOL},
+        {"type": "websocket.send", "text": json.dumps({"type": "connection_ack"})},
+        {"type": "websocket.send", "text": json.dumps({"type": "pong"})},
+    ]
+
+
+def test_websocket_subscribe_requires_connection_init() -> None:
+    sent = _run([{"type": "subscribe", "id": "1", "payload": {}}], subprotocols=[GRAPHQL_TRANSPORT_WS_PROTOCOL])
+
+    assert sent[-1] == {"type": "websocket.close", "code": 4401, "reason": "Unauthorized"}
+
+
+def test_websocket_subscribe_anonymous() -> None:
+    query = "subscription { phonebookEntryEvents { kind } }"
+    sent = _run(
+        [{"type": "connection_init"}, {"type": "subscribe", "id": "1", "payload": {"query": query}}],
+        subprotocols=[GRAPHQL_TRANSPORT_WS_PROTOCOL],
+    )
+
+    error = json.loads(sent[-1]["text"])
+    assert error["type"] == "error"
+    assert error["id"] == "1"
+    assert error["payload"][0]["message"] == "AuthenticationError"
+
+
+def test_websocket_closes_connection_without_init(settings) -> None:
+    settings.GRAPHQL_WS_CONNECTION_INIT_TIMEOUT = 0
+
+    sent = _run([], subprotocols=[GRAPHQL_TRANSPORT_WS_PROTOCOL])
+
+    assert sent[-1] == {"type": "websocket.close", "code": 4408, "reason": "Connection initialisation timeout"}
+
+
+def test_websocket_subscription_failure_sends_error_and_complete() -> None:
+    class FailingSchema:
+        async def subscribe(self, *args, **kwargs):
+            async def events():
+                raise RuntimeError("broker is gone")
+                yield
+
+            return events()
+
+    sent = _run(
+        [{"type": "connection_init"}, {"type": "subscribe", "id": "1", "payload": {"query": "subscription { a }"}}],
+        subprotocols=[GRAPHQL_TRANSPORT_WS_PROTOCOL],
+        app_schema=FailingSchema(),
+    )
+
+    assert [json.loads(event["text"]) for event in sent[-2:]] == [
+        {"type": "error", "id": "1", "payload": [{"message": "Subscription failed"}]},
+        {"type": "complete", "id": "1"},
+    ]
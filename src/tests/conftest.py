@@ -7,6 +7,8 @@ from graphene import Schema
 from graphene.test import Client
 
 from api.graphql.schema import schema as user_schema
+from phonebook import group_cache
+from phonebook.lookups import cities, countries
 from users.models import User
 
 
@@ -15,6 +17,16 @@ def fake() -> Generator[Faker, Any, None]:
     yield Faker()
 
 
+@pytest.fixture(autouse=True)
+def clear_phonebook_caches():
+    yield
+    # Ids are cached by committed transactions and executed on_commit callbacks,
+    # their rows are removed after the test.
+    group_cache.clear()
+    cities.clear()
+    countries.clear()
+
+
 @pytest.fixture
 def data_fixture(fake):
     from tests.fixtures import Fixtures
@@ -2,7 +2,16 @@ import random
 
 from faker import Faker
 
-from phonebook.models import PhonebookEntry, PhonebookEntryRating, PhonebookGroup, PhonebookNumber
+from phonebook.lookups import cities, countries
+from phonebook.models import (
+    PhonebookCity,
+    PhonebookCountry,
+    PhonebookEntry,
+    PhonebookEntryRating,
+    PhonebookGroup,
+    PhonebookNumber,
+)
+from phonebook.rating_aggregates import add_to_rating_aggregates
 from users.models import User
 
 
@@ -16,12 +25,16 @@ class PhonebookFixture:
             kwargs["name"] = "Test entry"
         if "city" not in kwargs:
             kwargs["city"] = self.fake.city()
+        if isinstance(kwargs["city"], str):
+            kwargs["city"] = PhonebookCity.objects.get(id=cities.get_id(kwargs["city"]))
         if "street" not in kwargs:
             kwargs["street"] = self.fake.street_address()
         if "postal_code" not in kwargs:
             kwargs["postal_code"] = self.fake.postcode()
         if "country" not in kwargs:
             kwargs["country"] = self.fake.country()
+        if isinstance(kwargs["country"], str):
+            kwargs["country"] = PhonebookCountry.objects.get(id=countries.get_id(kwargs["country"]))
         if "type" not in kwargs:
             kwargs["type"] = random.choice(["enterprise", "personal"])
         entry = PhonebookEntry(**kwargs)
@@ -52,8 +65,11 @@ class PhonebookFixture:
         return group
 
     def add_phonebook_entry_rating(self, entry: PhonebookEntry, rate: int, user: User) -> PhonebookEntryRating:
-        return PhonebookEntryRating.objects.create(
+        rating = PhonebookEntryRating.objects.create(
             phonebook_entry=entry,
             rate=rate,
             created_by=user,
         )
+        add_to_rating_aggregates({entry.id: (rate, 1)})
+        entry.refresh_from_db(fields=["rating_sum", "rating_count", "rating_score"])
+        return rating
@@ -0,0 +1,87 @@
+import pytest
+
+from phonebook import autocomplete
+from phonebook.autocomplete import PrefixTrie, Suggestion
+from phonebook.handler import PhonebookHandler
+
+
+@pytest.fixture(autouse=True)
+def clear_indexes():
+    autocomplete.invalidate()
+    yield
+    autocomplete.invalidate()
+
+
+def test_prefix_trie() -> None:
+    trie = PrefixTrie()
+    for name in ["Anna", "anna", "Andrew", "Bob", "Anastasia", "Anna"]:
+        trie.insert(name)
+
+    assert trie.complete("an", 10) == ["Anastasia", "Andrew", "Anna", "anna"]
+    assert trie.complete("AN", 2) == ["Anastasia", "Andrew"]
+    assert trie.complete("x", 10) == []
+
+    trie.remove("Anna")
+    assert trie.complete("anna", 10) == ["Anna", "anna"]
+    trie.remove("Anna")
+    trie.remove("anna")
+    trie.remove("Anastasia")
+    assert trie.complete("an", 10) == ["Andrew"]
+    assert "n" not in trie.root.children["a"].children["n"].children
+
+
+@pytest.mark.django_db
+def test_autocomplete_scoped_to_user(
+    data_fixture, django_assert_num_queries, django_capture_on_commit_callbacks
+) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, name="Joanna Smith", create_groups=False)
+    data_fixture.add_phonebook_group(entry, "jogging")
+    data_fixture.create_phonebook_entry(created_by=user, name="John Doe", create_groups=False)
+    data_fixture.create_phonebook_entry(name="Johnny Foreign", create_groups=False)
+
+    assert autocomplete.autocomplete(user.id, "jo", 10) == [
+        Suggestion(value="Joanna Smith", kind="entry"),
+        Suggestion(value="jogging", kind="group"),
+        Suggestion(value="John Doe", kind="entry"),
+    ]
+
+    with django_assert_num_queries(0):
+        assert autocomplete.autocomplete(user.id, "joh", 10) == [Suggestion(value="John Doe", kind="entry")]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PhonebookHandler().update(user=user, entry_id=entry.id, name="Johanna Smith")
+        PhonebookHandler().create(
+            name="Jonas Brown",
+            city="Warsaw",
+            street="Street",
+            postal_code="00-001",
+            country="Poland",
+            type="personal",
+            groups=[],
+            numbers=[],
+            created_by=user,
+        )
+
+    with django_assert_num_queries(0):
+        assert [suggestion.value for suggestion in autocomplete.autocomplete(user.id, "jo", 10)] == [
+            "jogging",
+            "Johanna Smith",
+            "John Doe",
+            "Jonas Brown",
+        ]
+
+
+@pytest.mark.django_db
+def test_autocomplete_reloads_after_group_change(data_fixture, django_capture_on_commit_callbacks) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, name="Tom", create_groups=False)
+    assert autocomplete.autocomplete(user.id, "t", 10) == [Suggestion(value="Tom", kind="entry")]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PhonebookHandler().add_to_group(user=user, entry_id=entry.id, group="tennis")
+
+    assert autocomplete.autocomplete(user.id, "t", 10) == [
+        Suggestion(value="tennis", kind="group"),
+        Suggestion(value="Tom", kind="entry"),
+    ]
@@ -0,0 +1,61 @@
+import pytest
+from django.core.management import call_command
+
+from phonebook.counters import CountModeEnum, get_entry_count
+from phonebook.handler import PhonebookHandler
+from phonebook.models import PhonebookEntryCounter
+
+
+@pytest.mark.django_db
+def test_entry_counters_follow_create_and_delete(data_fixture) -> None:
+    user = data_fixture.create_user()
+    user_2 = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    data_fixture.create_phonebook_entry(created_by=user_2, create_numbers=False, create_groups=False)
+
+    assert get_entry_count() == 3
+    assert get_entry_count(user) == 2
+    assert get_entry_count(user_2) == 1
+
+    PhonebookHandler().delete(user=user, entry_id=entry.id)
+
+    assert get_entry_count() == 2
+    assert get_entry_count(user) == 1
+    assert get_entry_count(data_fixture.create_user()) == 0
+
+
+@pytest.mark.django_db
+def test_get_entry_count_approximate_falls_back_to_counter(data_fixture) -> None:
+    user = data_fixture.create_user()
+    data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+
+    assert get_entry_count(mode=CountModeEnum.approximate) == 1
+    assert get_entry_count(user, mode=CountModeEnum.approximate) == 1
+
+
+@pytest.mark.django_db
+def test_recount_phonebook_entries_command(data_fixture) -> None:
+    user = data_fixture.create_user()
+    data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    PhonebookEntryCounter.objects.update(count=100)
+
+    call_command("recount_phonebook_entries")
+
+    assert get_entry_count() == 1
+    assert get_entry_count(user) == 1
+
+
+@pytest.mark.django_db
+def test_entry_count_includes_entries_without_owner(data_fixture) -> None:
+    user = data_fixture.create_user()
+    data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    data_fixture.create_phonebook_entry(created_by=None, create_numbers=False, create_groups=False)
+
+    assert get_entry_count() == 3
+
+    user.delete()
+
+    assert get_entry_count() == 3
+    assert PhonebookEntryCounter.objects.get(user__isnull=True).count == 3
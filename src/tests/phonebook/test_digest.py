@@ -0,0 +1,82 @@
+import pytest
+
+from phonebook.digest import EMPTY_DIGEST, PhonebookDigestHandler
+from phonebook.handler import AddPhonebookEntryNumberData, PhonebookHandler
+from phonebook.models import PhonebookDigestBucket
+
+
+def _create_entry(user, name: str = "Test entry"):
+    return PhonebookHandler().create(
+        name=name,
+        city="Warsaw",
+        street="Złota 44",
+        postal_code="01-001",
+        country="Poland",
+        type="enterprise",
+        groups=["company"],
+        numbers=[AddPhonebookEntryNumberData(number="500500500", number_type="mobile")],
+        created_by=user,
+    )
+
+
+@pytest.mark.django_db
+def test_digest_is_maintained_incrementally(data_fixture) -> None:
+    user = data_fixture.create_user()
+    entry = _create_entry(user)
+    root = PhonebookDigestHandler().get_root(user)
+
+    assert entry.digest
+    assert root.entry_count == 1
+
+    PhonebookHandler().add_number(entry_id=entry.id, user=user, number="600600600", number_type="mobile")
+    changed_root = PhonebookDigestHandler().get_root(user)
+    assert changed_root.digest != root.digest
+
+    PhonebookHandler().remove_number(entry_number_id=entry.phonebook_number.last().id, user=user)
+    assert PhonebookDigestHandler().get_root(user) == root
+
+
+@pytest.mark.django_db
+def test_digest_matches_rebuild(data_fixture) -> None:
+    user = data_fixture.create_user()
+    entries = [_create_entry(user, name=f"Entry {i}") for i in range(3)]
+    PhonebookHandler().add_to_group(user=user, entry_id=entries[0].id, group="red")
+    PhonebookHandler().update(user=user, entry_id=entries[1].id, city="Cracow")
+    PhonebookHandler().delete(user=user, entry_id=entries[2].id)
+    root = PhonebookDigestHandler().get_root(user)
+
+    assert PhonebookDigestHandler().rebuild(user) == 2
+    assert PhonebookDigestHandler().get_root(user) == root
+
+
+@pytest.mark.django_db
+def test_digest_empty_phonebook(data_fixture) -> None:
+    user = data_fixture.create_user()
+    entry = _create_entry(user)
+    PhonebookHandler().delete(user=user, entry_id=entry.id)
+
+    root = PhonebookDigestHandler().get_root(user)
+
+    assert root.digest == EMPTY_DIGEST
+    assert root.entry_count == 0
+    assert PhonebookDigestBucket.objects.get(user=user).digest == EMPTY_DIGEST
+
+
+@pytest.mark.django_db
+def test_digest_ranges(data_fixture, settings) -> None:
+    settings.PHONEBOOK_DIGEST_BUCKET_SIZE = 1
+    settings.PHONEBOOK_DIGEST_FANOUT = 2
+    user = data_fixture.create_user()
+    entries = [_create_entry(user, name=f"Entry {i}") for i in range(4)]
+    handler = PhonebookDigestHandler()
+
+    leaves = handler.get_ranges(user, level=0)
+    assert [(leaf.start_id, leaf.end_id) for leaf in leaves] == [(entry.id, entry.id + 1) for entry in entries]
+    assert [leaf.digest for leaf in leaves] == [entry.digest for entry in entries]
+
+    root = handler.get_root(user)
+    assert root.entry_count == 4
+    assert handler.get_ranges(user, level=root.level) == [root]
+
+    subset = handler.get_ranges(user, level=0, start_id=entries[1].id, end_id=entries[3].id)
+    assert [leaf.start_id for leaf in subset] == [entries[1].id, entries[2].id]
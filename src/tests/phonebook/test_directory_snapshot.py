@@ -0,0 +1,64 @@
+import pytest
+from django.core.management import call_command
+
+from phonebook import directory_snapshot
+from phonebook.directory_snapshot import DirectorySnapshot, SnapshotEntry, build_directory_snapshot, get_directory
+from phonebook.handler import PhonebookHandler
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, settings):
+    settings.PHONEBOOK_SNAPSHOT_PATH = str(tmp_path / "directory.snapshot")
+    settings.PHONEBOOK_SNAPSHOT_CHECK_INTERVAL = 0
+    directory_snapshot._directory = None
+    yield tmp_path / "directory.snapshot"
+    directory_snapshot._directory = None
+
+
+@pytest.mark.django_db
+def test_build_directory_snapshot(data_fixture, tmp_path) -> None:
+    user = data_fixture.create_user()
+    anna = data_fixture.create_phonebook_entry(
+        created_by=user, name="Anna Nowak", create_numbers=False, create_groups=False
+    )
+    data_fixture.add_phonebook_entry_number(anna, "+48 500-500-500", "mobile")
+    andrew = data_fixture.create_phonebook_entry(name="Andrew Smith", create_numbers=False, create_groups=False)
+    data_fixture.add_phonebook_entry_number(andrew, "48500500500", "landline")
+    data_fixture.create_phonebook_entry(name="Bob", create_numbers=False, create_groups=False)
+
+    assert build_directory_snapshot(tmp_path / "directory.snapshot") == 3
+    snapshot = DirectorySnapshot(tmp_path / "directory.snapshot")
+
+    assert snapshot.find_number("48 500 500 500") == [
+        SnapshotEntry(id=anna.id, user_id=user.id),
+        SnapshotEntry(id=andrew.id, user_id=None),
+    ]
+    assert snapshot.find_number("500500500") == []
+
+
+@pytest.mark.django_db
+def test_directory_finds_entries_written_after_build(data_fixture, snapshot_path) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, name="Anna", create_numbers=False)
+    data_fixture.add_phonebook_entry_number(entry, "500500500", "mobile")
+    call_command("build_directory_snapshot")
+    directory = get_directory()
+    assert directory is not None
+    assert directory.find_entry_ids("500 500 500", user.id) == [entry.id]
+
+    # Written after the build, e.g. by another worker.
+    data_fixture.add_phonebook_entry_number(entry, "600-600-600", "mobile")
+    entry.phonebook_number.filter(number="500500500").delete()
+
+    assert directory.find_entry_ids("600600600", user.id) == [entry.id]
+    assert directory.find_entry_ids("600600600", user.id + 1) == []
+    assert directory.find_entry_ids("500500500", user.id) == []
+
+    PhonebookHandler().delete(user=user, entry_id=entry.id)
+
+    assert directory.find_entry_ids("600600600", user.id) == []
+
+    build_directory_snapshot(snapshot_path)
+
+    assert get_directory() is directory
+    assert directory.snapshot.entry_count == 0
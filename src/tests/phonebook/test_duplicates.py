@@ -0,0 +1,100 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from phonebook.data_version import get_phonebook_data_version, owner_data_version_key
+from phonebook.duplicates import (
+    DuplicateGroup,
+    EntryFeatures,
+    candidate_pairs,
+    find_duplicate_entries,
+    get_duplicate_entries,
+    minhash,
+    trigrams,
+)
+
+
+def test_minhash_similar_sets_share_hashes() -> None:
+    left = minhash(trigrams("Jan Kowalski, Marszalkowska 1, Warszawa"))
+    right = minhash(trigrams("Jan  KOWALSKI, Marszalkowska 1, Warszawa"))
+    other = minhash(trigrams("Anna Nowak, Dluga 5, Krakow"))
+
+    assert left == right
+    assert sum(a == b for a, b in zip(left, other)) < len(left) / 4
+
+
+@pytest.mark.django_db
+def test_find_duplicate_entries(data_fixture) -> None:
+    user = data_fixture.create_user()
+    address = {"street": "Marszalkowska 1", "postal_code": "00-001", "city": "Warsaw", "country": "Poland"}
+    original = data_fixture.create_phonebook_entry(
+        created_by=user, name="Jan Kowalski", create_numbers=False, create_groups=False, **address
+    )
+    data_fixture.add_phonebook_entry_number(original, "+48 500 500 500", "mobile")
+    imported = data_fixture.create_phonebook_entry(
+        created_by=user, name="jan kowalski", create_numbers=False, create_groups=False, **address
+    )
+    data_fixture.add_phonebook_entry_number(imported, "48500500500", "mobile")
+    renamed = data_fixture.create_phonebook_entry(
+        created_by=user, name="Jan Kowalsky", create_numbers=False, create_groups=False, **address
+    )
+    data_fixture.create_phonebook_entry(
+        created_by=user,
+        name="Anna Nowak",
+        street="Dluga 5",
+        postal_code="30-001",
+        city="Cracow",
+        country="Poland",
+        create_numbers=False,
+        create_groups=False,
+    )
+    data_fixture.create_phonebook_entry(name="Jan Kowalski", create_numbers=False, create_groups=False, **address)
+
+    groups = find_duplicate_entries(user)
+
+    assert groups == [DuplicateGroup(entry_ids=(original.id, imported.id, renamed.id), score=1.0)]
+    assert find_duplicate_entries(user, threshold=0.9) == [
+        DuplicateGroup(entry_ids=(original.id, imported.id), score=1.0)
+    ]
+
+    output = StringIO()
+    call_command("find_duplicate_entries", user_ids=[user.id], stdout=output)
+    assert f"1.00 {original.id}, {imported.id}, {renamed.id}" in output.getvalue()
+
+
+@pytest.mark.django_db
+def test_get_duplicate_entries_follows_number_changes(data_fixture, django_capture_on_commit_callbacks) -> None:
+    user = data_fixture.create_user()
+    left = data_fixture.create_phonebook_entry(created_by=user, name="Jan", create_numbers=False, create_groups=False)
+    right = data_fixture.create_phonebook_entry(created_by=user, name="Anna", create_numbers=False, create_groups=False)
+
+    assert get_duplicate_entries(user, threshold=0.3) == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        data_fixture.add_phonebook_entry_number(left, "500 500 500", "mobile")
+        data_fixture.add_phonebook_entry_number(right, "500500500", "mobile")
+
+    assert [group.entry_ids for group in get_duplicate_entries(user, threshold=0.3)] == [(left.id, right.id)]
+    assert get_duplicate_entries(user, threshold=0.30001) == get_duplicate_entries(user, threshold=0.3)
+
+    version = get_phonebook_data_version(owner_data_version_key(user.id))
+    other_user = data_fixture.create_user()
+    with django_capture_on_commit_callbacks(execute=True):
+        data_fixture.create_phonebook_entry(created_by=other_user, name="Jan", create_numbers=False)
+
+    # Entries of other users do not invalidate duplicates of this one.
+    assert get_phonebook_data_version(owner_data_version_key(user.id)) == version
+
+
+def test_candidate_pairs_skip_empty_entries_and_shared_numbers(settings) -> None:
+    settings.PHONEBOOK_DUPLICATES_MAX_NUMBER_BUCKET = 2
+    empty = EntryFeatures(entry_id=1, numbers=frozenset(), name=frozenset(), address=frozenset())
+    switchboard = [
+        EntryFeatures(entry_id=i, numbers=frozenset(["500500500"]), name=trigrams(name), address=frozenset())
+        for i, name in enumerate(["Jan Kowalski", "Anna Nowak", "Piotr Zielinski"], start=2)
+    ]
+
+    assert candidate_pairs([empty, empty]) == set()
+    assert candidate_pairs(switchboard) == set()
+    assert candidate_pairs(switchboard[:2]) == {(0, 1)}
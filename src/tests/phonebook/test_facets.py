@@ -0,0 +1,57 @@
+import pytest
+
+from phonebook.facets import FacetCount, PhonebookFacets, compute_phonebook_facets, get_phonebook_facets
+
+
+@pytest.mark.django_db
+def test_compute_phonebook_facets(data_fixture) -> None:
+    user = data_fixture.create_user()
+    warsaw = data_fixture.create_phonebook_entry(
+        created_by=user, city="Warsaw", country="Poland", type="personal", create_groups=False
+    )
+    data_fixture.add_phonebook_group(warsaw, "family")
+    work = data_fixture.add_phonebook_group(warsaw, "work")
+    cracow = data_fixture.create_phonebook_entry(
+        created_by=user, city="Cracow", country="Poland", type="enterprise", create_groups=False
+    )
+    cracow.groups.add(work)
+    data_fixture.create_phonebook_entry(
+        created_by=user, city="Berlin", country="Germany", type="enterprise", create_groups=False
+    )
+
+    facets = compute_phonebook_facets({})
+
+    assert facets.total == 3
+    assert facets.facets == {
+        "type": [FacetCount("enterprise", 2), FacetCount("personal", 1)],
+        "city": [FacetCount("Berlin", 1), FacetCount("Cracow", 1), FacetCount("Warsaw", 1)],
+        "country": [FacetCount("Poland", 2), FacetCount("Germany", 1)],
+        "group": [FacetCount("work", 2), FacetCount("family", 1)],
+    }
+
+    facets = compute_phonebook_facets({"type": "enterprise", "search": "Cracow"})
+
+    assert facets.total == 1
+    assert facets.facets["group"] == [FacetCount("work", 1)]
+
+
+@pytest.mark.django_db
+def test_get_phonebook_facets_cached_until_data_changes(
+    data_fixture, monkeypatch, django_capture_on_commit_callbacks
+) -> None:
+    calls = []
+
+    def compute_phonebook_facets(filters: dict) -> PhonebookFacets:
+        calls.append(filters)
+        return PhonebookFacets(total=len(calls))
+
+    monkeypatch.setattr("phonebook.facets.compute_phonebook_facets", compute_phonebook_facets)
+
+    assert get_phonebook_facets({"city": "Warsaw", "search": None}) == PhonebookFacets(total=1)
+    assert get_phonebook_facets({"city": "Warsaw"}) == PhonebookFacets(total=1)
+    assert calls == [{"city": "Warsaw"}]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        data_fixture.create_phonebook_entry(create_numbers=False, create_groups=False)
+
+    assert get_phonebook_facets({"city": "Warsaw"}) == PhonebookFacets(total=2)
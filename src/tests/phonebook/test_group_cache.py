@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from phonebook import group_cache
+from phonebook.models import PhonebookGroup
+
+
+@pytest.mark.django_db
+def test_get_group_ids_creates_and_caches_groups(django_capture_on_commit_callbacks) -> None:
+    existing = PhonebookGroup.objects.create(name="work")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ids = group_cache.get_group_ids(["Work", "family", "work"])
+
+    assert ids == [existing.id, PhonebookGroup.objects.get(name="family").id]
+    with CaptureQueriesContext(connection) as queries:
+        assert group_cache.get_group_ids(["family", "WORK"]) == [ids[1], ids[0]]
+        assert group_cache.find_group_id("work") == existing.id
+    assert len(queries) == 0
+    assert group_cache.find_group_id("missing") is None
+    assert PhonebookGroup.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_group_cache_invalidated_on_rename(django_capture_on_commit_callbacks) -> None:
+    group_id = group_cache.get_group_id("work")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PhonebookGroup.objects.filter(id=group_id).update(name="job")
+        PhonebookGroup.objects.get(id=group_id).save()
+
+    assert group_cache.get_group_id("job") == group_id
+    assert group_cache.get_group_id("work") != group_id
+
+
+@pytest.mark.django_db
+def test_group_cache_picks_up_invalidation_of_other_workers(settings) -> None:
+    settings.PHONEBOOK_GROUP_CACHE_CHECK_INTERVAL = 0
+    group_id = group_cache.get_group_id("work")
+    group_cache.invalidate()
+    # Simulate another worker: cached id is put back, version check should drop it again.
+    group_cache._store({"work": group_id + 100})
+    group_cache._version = None
+
+    assert group_cache.get_group_id("work") == group_id
+
+
+@pytest.mark.django_db
+def test_group_cache_skips_ids_of_rolled_back_groups() -> None:
+    with pytest.raises(RuntimeError), transaction.atomic():
+        group_cache.get_group_id("work")
+        raise RuntimeError
+
+    assert not PhonebookGroup.objects.exists()
+    group_id = group_cache.get_group_id("work")
+    assert PhonebookGroup.objects.get(name="work").id == group_id
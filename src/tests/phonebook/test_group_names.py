@@ -0,0 +1,51 @@
+import pytest
+
+from phonebook.filters import PhonebookFilterSet
+from phonebook.models import PhonebookEntry, PhonebookGroup
+
+
+@pytest.mark.django_db
+def test_group_names_follow_group_changes(data_fixture) -> None:
+    entry = data_fixture.create_phonebook_entry(create_numbers=False, create_groups=False)
+    other = data_fixture.create_phonebook_entry(create_numbers=False, create_groups=False)
+    red = data_fixture.add_phonebook_group(entry, "red")
+    blue = data_fixture.add_phonebook_group(entry, "blue")
+    blue.phonebook_entries.add(other)
+    assert entry.group_names == ["red", "blue"]
+
+    blue.name = "navy"
+    blue.save()
+    entry.refresh_from_db()
+    other.refresh_from_db()
+    assert entry.group_names == ["red", "navy"]
+    assert other.group_names == ["navy"]
+
+    blue.phonebook_entries.clear()
+    entry.refresh_from_db()
+    assert entry.group_names == ["red"]
+
+    red.delete()
+    entry.refresh_from_db()
+    assert entry.group_names == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "filters,expected",
+    [
+        ({"group": "Red"}, ["first", "second"]),
+        ({"groups_any": "blue,green"}, ["second", "third"]),
+        ({"groups_all": "red,blue"}, ["second"]),
+        ({"search": "Green"}, ["third"]),
+        ({"search": "re"}, []),
+    ],
+)
+def test_phonebook_filter_set_group_filters(data_fixture, filters, expected) -> None:
+    groups = {name: PhonebookGroup.objects.create(name=name) for name in ("red", "blue", "green")}
+    for name, entry_groups in (("first", ["red"]), ("second", ["red", "blue"]), ("third", ["green"])):
+        entry = data_fixture.create_phonebook_entry(name=name, create_numbers=False, create_groups=False)
+        entry.groups.set([groups[group] for group in entry_groups])
+
+    filterset = PhonebookFilterSet(data=filters, queryset=PhonebookEntry.objects.all())
+
+    assert sorted(filterset.qs.values_list("name", flat=True)) == expected
@@ -1,9 +1,18 @@
 import pytest
 from django.utils.text import slugify
+from freezegun import freeze_time
 
+from phonebook.counters import get_entry_count
 from phonebook.exceptions import PhonebookError
 from phonebook.handler import AddPhonebookEntryNumberData, PhonebookHandler
-from phonebook.models import PhonebookEntry, PhonebookNumber
+from phonebook.models import (
+    PhonebookEntry,
+    PhonebookEntryRating,
+    PhonebookEntryRatingSummary,
+    PhonebookGroup,
+    PhonebookNumber,
+)
+from phonebook.rating_rollup import compact_ratings, rating_histogram
 
 
 @pytest.mark.django_db
@@ -32,12 +41,13 @@ def test_phonebook_handler_create_entry(data_fixture) -> None:
 
     assert entry.name == name
     assert entry.slug == slugify(name)
-    assert entry.city == city
+    assert entry.city.name == city
     assert entry.street == street
     assert entry.postal_code == postal_code
-    assert entry.country == country
+    assert entry.country.name == country
     assert entry.type == type
     assert entry.groups.all().count() == 2
+    assert entry.group_names == ["company", "red"]
     assert entry.created_by == user
     assert entry.phonebook_number.all().count() == 1
     assert PhonebookEntry.objects.all().count() == 1
@@ -94,10 +104,10 @@ def test_phonebook_handler_update_entry(data_fixture) -> None:
 
     entry.refresh_from_db()
     assert entry.name == name
-    assert entry.city == city
+    assert entry.city.name == city
     assert entry.street == street
     assert entry.postal_code == postal_code
-    assert entry.country == country
+    assert entry.country.name == country
     assert entry.type == type
 
 
@@ -140,7 +150,75 @@ def test_phonebook_handler_delete_entry(data_fixture) -> None:
     )
 
     assert not PhonebookEntry.objects.filter(id=entry.id).exists()
-    assert not PhonebookNumber.objects.filter(phonebook_entry__id=entry.id).exists()
+    assert PhonebookEntry.all_objects.get(id=entry.id).deleted_at is not None
+
+
+@pytest.mark.django_db
+def test_phonebook_handler_delete_entry_without_fast_delete(data_fixture, settings) -> None:
+    settings.PHONEBOOK_FAST_DELETE = False
+    settings.PHONEBOOK_SOFT_DELETE = False
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user)
+
+    PhonebookHandler().delete(entry_id=entry.id, user=user)
+
+    assert not PhonebookEntry.objects.filter(id=entry.id).exists()
+    assert get_entry_count(user) == 0
+
+
+@pytest.mark.django_db
+def test_phonebook_handler_delete_many(data_fixture, django_capture_on_commit_callbacks, settings) -> None:
+    settings.PHONEBOOK_SOFT_DELETE = False
+    user = data_fixture.create_user()
+    entries = [data_fixture.create_phonebook_entry(created_by=user) for _ in range(3)]
+    for entry in entries:
+        data_fixture.add_phonebook_entry_rating(entry, 5, user)
+    kept = data_fixture.create_phonebook_entry(created_by=user)
+    deleted_ids = [entry.id for entry in entries]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert PhonebookHandler().delete_many(user=user, entry_ids=deleted_ids) == 3
+
+    assert list(PhonebookEntry.objects.values_list("id", flat=True)) == [kept.id]
+    assert not PhonebookNumber.objects.filter(phonebook_entry_id__in=deleted_ids).exists()
+    assert not PhonebookEntryRating.objects.filter(phonebook_entry_id__in=deleted_ids).exists()
+    assert not PhonebookEntry.groups.through.objects.filter(phonebookentry_id__in=deleted_ids).exists()
+    assert get_entry_count(user) == 1
+
+
+@pytest.mark.django_db
+def test_phonebook_handler_delete_many_soft_delete(data_fixture, django_capture_on_commit_callbacks) -> None:
+    user = data_fixture.create_user()
+    entries = [data_fixture.create_phonebook_entry(created_by=user) for _ in range(2)]
+    kept = data_fixture.create_phonebook_entry(created_by=user)
+    deleted_ids = [entry.id for entry in entries]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert PhonebookHandler().delete_many(user=user, entry_ids=deleted_ids) == 2
+
+    assert list(PhonebookEntry.objects.values_list("id", flat=True)) == [kept.id]
+    assert PhonebookEntry.all_objects.filter(id__in=deleted_ids, deleted_at__isnull=False).count() == 2
+    assert get_entry_count(user) == 1
+
+    with pytest.raises(PhonebookError) as e:
+        PhonebookHandler().delete_many(user=user, entry_ids=deleted_ids)
+    assert e.value.reason == "Entry with given id does not exists!"
+
+
+@pytest.mark.django_db
+def test_phonebook_handler_delete_many_validation(data_fixture) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user)
+    foreign = data_fixture.create_phonebook_entry()
+
+    with pytest.raises(PhonebookError) as e:
+        PhonebookHandler().delete_many(user=user, entry_ids=[entry.id, foreign.id])
+    assert e.value.reason == "You are not owner of this entry"
+
+    with pytest.raises(PhonebookError) as e:
+        PhonebookHandler().delete_many(user=user, entry_ids=[entry.id, 9999])
+    assert e.value.reason == "Entry with given id does not exists!"
+    assert PhonebookEntry.objects.count() == 2
 
 
 @pytest.mark.django_db
@@ -185,6 +263,8 @@ def test_phonebook_handler_entry_add_to_group(data_fixture) -> None:
     groups = entry.groups.all()
     assert groups.count() == 1
     assert list(groups.values_list("name", flat=True)) == ["water"]
+    entry.refresh_from_db()
+    assert entry.group_names == ["water"]
 
 
 @pytest.mark.django_db
@@ -233,6 +313,8 @@ def test_phonebook_handler_entry_remove_group(data_fixture) -> None:
     assert not groups.filter(name="red").exists()
     assert groups.count() == 0
     assert list(groups.values_list("name", flat=True)) == []
+    entry.refresh_from_db()
+    assert entry.group_names == []
 
 
 @pytest.mark.django_db
@@ -336,6 +418,20 @@ def test_phonebook_handler_entry_remove_number_invalid_user(data_fixture) -> Non
     assert e.value.reason == "You are not owner of this entry"
 
 
+@pytest.mark.django_db
+def test_phonebook_handler_entry_remove_number_of_deleted_entry(data_fixture) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    number = data_fixture.add_phonebook_entry_number(entry, "500500500", "mobile")
+    PhonebookHandler().delete(entry_id=entry.id, user=user)
+
+    with pytest.raises(PhonebookError) as e:
+        PhonebookHandler().remove_number(entry_number_id=number.id, user=user)
+
+    assert e.value.reason == "Failed to remove entry number!"
+    assert PhonebookNumber.objects.filter(id=number.id).exists()
+
+
 @pytest.mark.django_db
 def test_phonebook_handler_entry_add_rating(data_fixture) -> None:
     user = data_fixture.create_user()
@@ -347,6 +443,9 @@ def test_phonebook_handler_entry_add_rating(data_fixture) -> None:
 
     numbers = entry.phonebook_rating.all()
     assert numbers.count() == 3
+    entry.refresh_from_db()
+    assert entry.rating_sum == 6
+    assert entry.rating_count == 3
 
 
 @pytest.mark.django_db
@@ -372,3 +471,88 @@ def test_phonebook_handler_entry_add_rating_invalid_range(data_fixture) -> None:
         PhonebookHandler().add_rating(entry_id=entry.id, rate=7, user=user)
 
     assert e.value.reason == "Invalid rating range. Range is 0 to 6"
+
+
+@pytest.mark.django_db
+def test_phonebook_handler_entry_buffer_rating(data_fixture, settings, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("phonebook.rating_buffer._buffer", None)
+    settings.PHONEBOOK_RATING_BUFFER_SIZE = 2
+    settings.PHONEBOOK_RATING_BUFFER_JOURNAL_DIR = str(tmp_path)
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+
+    PhonebookHandler().buffer_rating(entry_id=entry.id, rate=5, user=user)
+    PhonebookHandler().buffer_rating(entry_id=entry.id, rate=1, user=user)
+
+    entry.refresh_from_db()
+    assert entry.phonebook_rating.count() == 2
+    assert entry.rating_count == 2
+
+
+@pytest.mark.django_db
+def test_phonebook_handler_entry_buffer_rating_validation(data_fixture) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+
+    with pytest.raises(PhonebookError) as e:
+        PhonebookHandler().buffer_rating(entry_id=entry.id, rate=7, user=user)
+    assert e.value.reason == "Invalid rating range. Range is 0 to 6"
+
+    with pytest.raises(PhonebookError) as e:
+        PhonebookHandler().buffer_rating(entry_id=9999, rate=5, user=user)
+    assert e.value.reason == "Failed to add entry rating!"
+
+
+@pytest.mark.django_db
+def test_phonebook_handler_merge(data_fixture) -> None:
+    user = data_fixture.create_user()
+    target = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    data_fixture.add_phonebook_entry_number(target, "500 500 500", "mobile")
+    data_fixture.add_phonebook_group(target, "family")
+    data_fixture.add_phonebook_entry_rating(target, 6, user)
+    source = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    data_fixture.add_phonebook_entry_number(source, "500-500-500", "mobile")
+    data_fixture.add_phonebook_entry_number(source, "600600600", "landline")
+    source.groups.add(PhonebookGroup.objects.get(name="family"))
+    data_fixture.add_phonebook_group(source, "work")
+    data_fixture.add_phonebook_entry_rating(source, 2, user)
+    data_fixture.add_phonebook_entry_rating(source, 4, user)
+    other_source = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    with freeze_time("2025-01-01 10:00"):
+        data_fixture.add_phonebook_entry_rating(target, 1, user)
+        data_fixture.add_phonebook_entry_rating(other_source, 3, user)
+    with freeze_time("2025-03-01 10:00"):
+        compact_ratings(retention_days=10)
+
+    entry = PhonebookHandler().merge(user=user, target_id=target.id, source_ids=[source.id, other_source.id])
+
+    assert entry.id == target.id
+    assert not PhonebookEntry.objects.filter(id__in=[source.id, other_source.id]).exists()
+    assert sorted(entry.phonebook_number.values_list("number", "type")) == [
+        ("500 500 500", "mobile"),
+        ("600600600", "landline"),
+    ]
+    assert sorted(entry.groups.values_list("name", flat=True)) == ["family", "work"]
+    assert entry.phonebook_rating.count() == 3
+    assert (entry.rating_sum, entry.rating_count) == (16, 5)
+    assert rating_histogram(entry.id) == {1: 1, 2: 1, 3: 1, 4: 1, 6: 1}
+    summary = PhonebookEntryRatingSummary.objects.get(phonebook_entry=entry)
+    assert (summary.rate_sum, summary.rate_count, summary.histogram) == (4, 2, {"1": 1, "3": 1})
+
+
+@pytest.mark.django_db
+def test_phonebook_handler_merge_validation(data_fixture) -> None:
+    user = data_fixture.create_user()
+    target = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    foreign = data_fixture.create_phonebook_entry(create_numbers=False, create_groups=False)
+
+    with pytest.raises(PhonebookError) as e:
+        PhonebookHandler().merge(user=user, target_id=target.id, source_ids=[target.id])
+    assert e.value.reason == "No entries to merge!"
+    with pytest.raises(PhonebookError) as e:
+        PhonebookHandler().merge(user=user, target_id=target.id, source_ids=[foreign.id])
+    assert e.value.reason == "You are not owner of this entry"
+    with pytest.raises(PhonebookError) as e:
+        PhonebookHandler().merge(user=user, target_id=target.id, source_ids=[foreign.id + 100])
+    assert e.value.reason == "Entry with given id does not exists!"
+    assert PhonebookEntry.objects.filter(id=foreign.id).exists()
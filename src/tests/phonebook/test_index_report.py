@@ -0,0 +1,21 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from phonebook.index_report import missing_indexes
+
+
+@pytest.mark.django_db
+def test_declared_indexes_exist() -> None:
+    assert [missing for missing in missing_indexes() if missing.index] == []
+
+
+@pytest.mark.django_db
+def test_report_indexes_command() -> None:
+    out = StringIO()
+
+    call_command("report_indexes", stdout=out)
+
+    assert "Unused indexes:" in out.getvalue()
+    assert "Missing indexes:" in out.getvalue()
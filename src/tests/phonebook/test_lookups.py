@@ -0,0 +1,58 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from phonebook.filters import PhonebookFilterSet
+from phonebook.lookups import cities
+from phonebook.models import PhonebookCity, PhonebookEntry
+
+
+@pytest.mark.django_db
+def test_lookup_cache_interns_normalized_names(django_capture_on_commit_callbacks) -> None:
+    with django_capture_on_commit_callbacks(execute=True):
+        city_id = cities.get_id("  New   York ")
+
+    assert cities.get_id("new york") == city_id
+    assert PhonebookCity.objects.get(id=city_id).name == "New York"
+    with CaptureQueriesContext(connection) as queries:
+        assert cities.get_id("NEW YORK") == city_id
+        assert cities.find_id("New york") == city_id
+    assert len(queries) == 0
+    assert cities.get_name(city_id) == "New York"
+    assert cities.find_id("Boston") is None
+    assert PhonebookCity.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_lookup_cache_skips_ids_of_rolled_back_rows() -> None:
+    with pytest.raises(RuntimeError), transaction.atomic():
+        cities.get_id("Boston")
+        raise RuntimeError
+
+    assert not PhonebookCity.objects.exists()
+    city_id = cities.get_id("Boston")
+    assert cities.get_name(city_id) == "Boston"
+
+
+@pytest.mark.django_db
+def test_lookup_cache_validates_names() -> None:
+    with pytest.raises(ValidationError):
+        cities.get_id(" ")
+    with pytest.raises(ValidationError):
+        cities.get_id("x" * 51)
+
+
+@pytest.mark.django_db
+def test_phonebook_filter_set_city_filter(data_fixture) -> None:
+    warsaw = data_fixture.create_phonebook_entry(city="Warsaw", country="Poland")
+    data_fixture.create_phonebook_entry(city="Cracow", country="Poland")
+
+    def filtered(filters: dict[str, str]) -> list[int]:
+        return list(
+            PhonebookFilterSet(data=filters, queryset=PhonebookEntry.objects.all()).qs.values_list("id", flat=True)
+        )
+
+    assert filtered({"city": " warsaw"}) == [warsaw.id]
+    assert filtered({"city": "Boston"}) == []
+    assert len(filtered({"country": "POLAND"})) == 2
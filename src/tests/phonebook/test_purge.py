@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from freezegun import freeze_time
+
+from phonebook.counters import get_entry_count
+from phonebook.handler import PhonebookHandler
+from phonebook.models import PhonebookEntry, PhonebookEntryRating, PhonebookNumber
+from phonebook.purge import purge_deleted_entries
+
+
+@pytest.mark.django_db
+def test_purge_deleted_entries(data_fixture) -> None:
+    user = data_fixture.create_user()
+    entries = [data_fixture.create_phonebook_entry(created_by=user) for _ in range(3)]
+    for entry in entries:
+        data_fixture.add_phonebook_entry_rating(entry, 4, user)
+    kept = data_fixture.create_phonebook_entry(created_by=user)
+    deleted_ids = [entry.id for entry in entries]
+    with freeze_time("2025-01-01 10:00"):
+        PhonebookHandler().delete_many(user=user, entry_ids=deleted_ids)
+
+    with freeze_time("2025-01-01 10:30"):
+        assert purge_deleted_entries(min_age=timedelta(hours=1)) == 0
+    with freeze_time("2025-01-01 12:00"):
+        assert purge_deleted_entries(batch_size=2, min_age=timedelta(hours=1), pause=0) == 3
+
+    assert list(PhonebookEntry.all_objects.values_list("id", flat=True)) == [kept.id]
+    assert not PhonebookNumber.objects.filter(phonebook_entry_id__in=deleted_ids).exists()
+    assert not PhonebookEntryRating.objects.filter(phonebook_entry_id__in=deleted_ids).exists()
+    assert not PhonebookEntry.groups.through.objects.filter(phonebookentry_id__in=deleted_ids).exists()
+    assert get_entry_count(user) == 1
+
+
+@pytest.mark.django_db
+def test_purge_deleted_entries_command(data_fixture) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user)
+    PhonebookHandler().delete(user=user, entry_id=entry.id)
+
+    call_command("purge_deleted_entries", "--min-age", "0", "--pause", "0")
+
+    assert not PhonebookEntry.all_objects.exists()
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from phonebook.models import PhonebookEntry
+from phonebook.rating_buffer import RatingBuffer, RatingBufferDurability, replay_orphan_journals
+
+
+@pytest.fixture
+def rating_buffer(tmp_path) -> RatingBuffer:
+    return RatingBuffer(size=3, max_delay=60, durability=RatingBufferDurability.memory, journal_dir=tmp_path)
+
+
+@pytest.mark.django_db
+def test_rating_buffer_flushes_on_size(data_fixture, rating_buffer) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+
+    rating_buffer.add(entry_id=entry.id, rate=5, user_id=user.id)
+    rating_buffer.add(entry_id=entry.id, rate=1, user_id=user.id)
+    assert entry.phonebook_rating.count() == 0
+
+    rating_buffer.add(entry_id=entry.id, rate=3, user_id=user.id)
+
+    entry.refresh_from_db()
+    assert len(rating_buffer) == 0
+    assert entry.phonebook_rating.count() == 3
+    assert entry.rating_sum == 9
+    assert entry.rating_count == 3
+
+
+@pytest.mark.django_db
+def test_rating_buffer_flush_skips_deleted_entries(data_fixture, rating_buffer) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    deleted_entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    rating_buffer.add(entry_id=entry.id, rate=2, user_id=user.id)
+    rating_buffer.add(entry_id=deleted_entry.id, rate=2, user_id=user.id)
+    deleted_entry.delete()
+
+    assert rating_buffer.flush() == 1
+
+    entry.refresh_from_db()
+    assert entry.rating_count == 1
+    assert not PhonebookEntry.objects.filter(id=deleted_entry.id).exists()
+
+
+@pytest.mark.django_db
+def test_rating_buffer_journal(data_fixture, tmp_path) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    rating_buffer = RatingBuffer(size=10, max_delay=60, durability=RatingBufferDurability.journal, journal_dir=tmp_path)
+
+    rating_buffer.add(entry_id=entry.id, rate=4, user_id=user.id)
+    assert len(rating_buffer.journal_path.read_text().splitlines()) == 1
+
+    rating_buffer.flush()
+    assert rating_buffer.journal_path.read_text() == ""
+
+
+@pytest.mark.django_db
+def test_replay_orphan_journals(data_fixture, tmp_path) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    dead_pid = os.getpid() + 10_000_000
+    journal = tmp_path / f"ratings-{dead_pid}.jsonl"
+    journal.write_text(json.dumps({"entry_id": entry.id, "rate": 6, "user_id": user.id}) + "\n")
+
+    assert replay_orphan_journals(tmp_path) == 1
+
+    entry.refresh_from_db()
+    assert entry.rating_sum == 6
+    assert entry.rating_count == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_replay_orphan_journals_of_reused_pid(data_fixture, tmp_path) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    # Left by an earlier process which had the pid of this one.
+    (tmp_path / f"ratings-{os.getpid()}-0.jsonl").write_text(
+        json.dumps({"entry_id": entry.id, "rate": 6, "user_id": user.id}) + "\n"
+    )
+
+    rating_buffer = RatingBuffer(size=10, max_delay=60, durability=RatingBufferDurability.journal, journal_dir=tmp_path)
+    rating_buffer.add(entry.id, 2, user.id)
+
+    entry.refresh_from_db()
+    assert (entry.rating_sum, entry.rating_count) == (6, 1)
+    assert list(tmp_path.iterdir()) == [rating_buffer.journal_path]
@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from freezegun import freeze_time
+
+from phonebook.models import PhonebookEntryRatingSummary
+from phonebook.rating_rollup import compact_ratings, rating_histogram
+
+
+@pytest.mark.django_db
+def test_compact_ratings(data_fixture) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    with freeze_time("2025-01-01 10:00"):
+        data_fixture.add_phonebook_entry_rating(entry, 5, user)
+        data_fixture.add_phonebook_entry_rating(entry, 5, user)
+        data_fixture.add_phonebook_entry_rating(entry, 2, user)
+    with freeze_time("2025-01-02 10:00"):
+        data_fixture.add_phonebook_entry_rating(entry, 1, user)
+    with freeze_time("2025-01-20 10:00"):
+        data_fixture.add_phonebook_entry_rating(entry, 6, user)
+
+    with freeze_time("2025-01-25 10:00"):
+        result = compact_ratings(retention_days=10, batch_size=2)
+
+    assert result.compacted_ratings == 4
+    assert entry.phonebook_rating.count() == 1
+    summaries = PhonebookEntryRatingSummary.objects.filter(phonebook_entry=entry).order_by("day")
+    assert [(summary.day, summary.rate_sum, summary.rate_count, summary.histogram) for summary in summaries] == [
+        (date(2025, 1, 1), 12, 3, {"5": 2, "2": 1}),
+        (date(2025, 1, 2), 1, 1, {"1": 1}),
+    ]
+    assert rating_histogram(entry.id) == {1: 1, 2: 1, 5: 2, 6: 1}
+
+
+@pytest.mark.django_db
+def test_compact_ratings_merges_existing_summary(data_fixture) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    with freeze_time("2025-01-01 10:00"):
+        data_fixture.add_phonebook_entry_rating(entry, 3, user)
+    with freeze_time("2025-01-25 10:00"):
+        compact_ratings(retention_days=10)
+    with freeze_time("2025-01-01 12:00"):
+        data_fixture.add_phonebook_entry_rating(entry, 3, user)
+
+    with freeze_time("2025-01-25 10:00"):
+        call_command("compact_ratings", "--retention-days", "10")
+
+    summary = PhonebookEntryRatingSummary.objects.get(phonebook_entry=entry)
+    assert summary.rate_sum == 6
+    assert summary.rate_count == 2
+    assert summary.histogram == {"3": 2}
+    assert not entry.phonebook_rating.exists()
@@ -1,6 +1,7 @@
 import pytest
 
 from phonebook.models import PhonebookEntry
+from phonebook.rating_buffer import RatingBuffer, RatingBufferDurability
 
 
 @pytest.mark.django_db
@@ -159,10 +160,10 @@ def test_phonebook_entry_update_mutation(data_fixture, user_schema_client) -> No
     assert "errors" not in result
     assert result["data"] == expected
     assert entry.name == name
-    assert entry.city == city
+    assert entry.city.name == city
     assert entry.street == street
     assert entry.postal_code == postal_code
-    assert entry.country == country
+    assert entry.country.name == country
     assert entry.type == type
 
 
@@ -245,10 +246,10 @@ def test_phonebook_entry_add_group_mutation(data_fixture, user_schema_client) ->
                 "phonebook": {
                     "id": entry.gid,
                     "name": entry.name,
-                    "city": entry.city,
+                    "city": entry.city.name,
                     "postalCode": entry.postal_code,
                     "street": entry.street,
-                    "country": entry.country,
+                    "country": entry.country.name,
                     "numbers": [
                         {"number": "500500500", "type": "mobile"},
                     ],
@@ -343,10 +344,10 @@ def test_phonebook_entry_add_number_mutation(data_fixture, user_schema_client) -
                 "phonebook": {
                     "id": entry.gid,
                     "name": entry.name,
-                    "city": entry.city,
+                    "city": entry.city.name,
                     "postalCode": entry.postal_code,
                     "street": entry.street,
-                    "country": entry.country,
+                    "country": entry.country.name,
                     "numbers": [
                         {"number": "225032231", "type": "landline"},
                     ],
@@ -437,10 +438,10 @@ def test_phonebook_entry_add_rating_mutation(data_fixture, user_schema_client) -
                 "phonebook": {
                     "id": entry.gid,
                     "name": entry.name,
-                    "city": entry.city,
+                    "city": entry.city.name,
                     "postalCode": entry.postal_code,
                     "street": entry.street,
-                    "country": entry.country,
+                    "country": entry.country.name,
                     "rating": "1.00",
                 }
             }
@@ -451,3 +452,103 @@ def test_phonebook_entry_add_rating_mutation(data_fixture, user_schema_client) -
     assert result["data"] == expected
     ratings = entry.phonebook_rating.all()
     assert ratings.count() == 1
+
+
+@pytest.mark.django_db
+def test_phonebook_entry_add_rating_mutation_buffered(
+    data_fixture, user_schema_client, settings, monkeypatch, tmp_path
+) -> None:
+    rating_buffer = RatingBuffer(size=10, max_delay=60, durability=RatingBufferDurability.memory, journal_dir=tmp_path)
+    monkeypatch.setattr("phonebook.handler.get_rating_buffer", lambda: rating_buffer)
+    settings.PHONEBOOK_RATING_BUFFER_ENABLED = True
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False)
+    user_schema_client.user = user
+    query = """
+        mutation AddPhonebookEntryRate($id: ID!, $rate: Int!) {
+          addPhonebookEntryRate(input: {entryId: $id, rate: $rate}) {
+            result {
+              ... on AddPhonebookEntryRatingSuccess {
+                queued
+                phonebook {
+                  id
+                }
+              }
+              ... on AddPhonebookEntryRatingError {
+                reason
+              }
+            }
+          }
+        }
+        """
+
+    result = user_schema_client.execute(query, {"id": entry.gid, "rate": 1})
+
+    assert "errors" not in result
+    assert result["data"] == {"addPhonebookEntryRate": {"result": {"queued": True, "phonebook": None}}}
+    assert entry.phonebook_rating.count() == 0
+    assert len(rating_buffer) == 1
+
+
+@pytest.mark.django_db
+def test_phonebook_entry_merge_mutation(data_fixture, user_schema_client) -> None:
+    user = user_schema_client.user
+    target = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    source = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    data_fixture.add_phonebook_entry_number(source, "500500500", "mobile")
+    query = """
+        mutation MergePhonebookEntries($targetId: ID!, $sourceIds: [ID!]!) {
+          mergePhonebookEntries(input: {targetId: $targetId, sourceIds: $sourceIds}) {
+            result {
+              ... on MergePhonebookEntriesSuccess {
+                phonebook {
+                  id
+                  numbers {
+                    number
+                  }
+                }
+              }
+              ... on MergePhonebookEntriesError {
+                reason
+              }
+            }
+          }
+        }
+        """
+
+    result = user_schema_client.execute(query, {"targetId": target.gid, "sourceIds": [source.gid]})
+
+    assert "errors" not in result
+    assert result["data"] == {
+        "mergePhonebookEntries": {"result": {"phonebook": {"id": target.gid, "numbers": [{"number": "500500500"}]}}}
+    }
+    assert not PhonebookEntry.objects.filter(id=source.id).exists()
+
+    result = user_schema_client.execute(query, {"targetId": target.gid, "sourceIds": [user.gid]})
+
+    assert result["data"] == {"mergePhonebookEntries": {"result": {"reason": "Invalid phonebook entry id!"}}}
+
+
+@pytest.mark.django_db
+def test_phonebook_entries_delete_mutation(data_fixture, user_schema_client) -> None:
+    entries = [data_fixture.create_phonebook_entry(created_by=user_schema_client.user) for _ in range(2)]
+    query = """
+        mutation DeletePhonebookEntries($ids: [ID!]!) {
+          deletePhonebookEntries(input: {ids: $ids}) {
+            result {
+              ... on DeletePhonebookEntriesSuccess {
+                deletedCount
+              }
+              ... on DeletePhonebookEntriesError {
+                reason
+              }
+            }
+          }
+        }
+        """
+
+    result = user_schema_client.execute(query, {"ids": [entry.gid for entry in entries]})
+
+    assert "errors" not in result
+    assert result["data"] == {"deletePhonebookEntries": {"result": {"deletedCount": 2}}}
+    assert not PhonebookEntry.objects.exists()
@@ -1,6 +1,15 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from freezegun import freeze_time
 from graphql_relay import to_global_id
 
+from phonebook import directory_snapshot
+from phonebook.digest import PhonebookDigestHandler
+from phonebook.directory_snapshot import build_directory_snapshot
+from phonebook.handler import PhonebookHandler
+from phonebook.rating_rollup import compact_ratings
+
 
 @pytest.mark.django_db
 def test_phonebook_entry_query(data_fixture, user_schema_client) -> None:
@@ -45,10 +54,10 @@ def test_phonebook_entry_query(data_fixture, user_schema_client) -> None:
                         "id": to_global_id("PhonebookEntryNode", entry.id),
                         "slug": entry.slug,
                         "name": entry.name,
-                        "city": entry.city,
+                        "city": entry.city.name,
                         "postalCode": entry.postal_code,
                         "street": entry.street,
-                        "country": entry.country,
+                        "country": entry.country.name,
                         "rating": "0.00",
                         "numbers": [
                             {"number": "500500500", "type": "mobile"},
@@ -124,10 +133,10 @@ def test_phonebook_entry_query_search(data_fixture, user_schema_client) -> None:
                         "id": to_global_id("PhonebookEntryNode", entry.id),
                         "slug": entry.slug,
                         "name": entry.name,
-                        "city": entry.city,
+                        "city": entry.city.name,
                         "postalCode": entry.postal_code,
                         "street": entry.street,
-                        "country": entry.country,
+                        "country": entry.country.name,
                         "rating": "0.00",
                         "numbers": [
                             {"number": "500500500", "type": "mobile"},
@@ -179,10 +188,10 @@ def test_phonebook_entry_query_node(data_fixture, user_schema_client) -> None:
             "id": to_global_id("PhonebookEntryNode", entry.id),
             "name": entry.name,
             "slug": entry.slug,
-            "city": entry.city,
+            "city": entry.city.name,
             "postalCode": entry.postal_code,
             "street": entry.street,
-            "country": entry.country,
+            "country": entry.country.name,
             "rating": "0.00",
             "numbers": [
                 {"number": "500500500", "type": "mobile"},
@@ -195,6 +204,32 @@ def test_phonebook_entry_query_node(data_fixture, user_schema_client) -> None:
     assert result["data"] == expected
 
 
+@pytest.mark.django_db
+def test_phonebook_number_query_node(data_fixture, user_schema_client) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False)
+    number = data_fixture.add_phonebook_entry_number(entry, "500500500", "mobile")
+    query = """
+        query PhonebookNumberNode($id: ID!) {
+          node(id: $id) {
+            ... on PhonebookNumberNode {
+              number
+            }
+          }
+        }
+        """
+
+    user_schema_client.user = user
+    assert user_schema_client.execute(query, {"id": number.gid})["data"] == {"node": {"number": "500500500"}}
+
+    user_schema_client.user = data_fixture.create_user()
+    assert user_schema_client.execute(query, {"id": number.gid})["data"] == {"node": None}
+
+    PhonebookHandler().delete(entry_id=entry.id, user=user)
+    user_schema_client.user = user
+    assert user_schema_client.execute(query, {"id": number.gid})["data"] == {"node": None}
+
+
 @pytest.mark.django_db
 def test_phonebook_entry_user_query(data_fixture, user_schema_client) -> None:
     user = data_fixture.create_user()
@@ -238,10 +273,10 @@ def test_phonebook_entry_user_query(data_fixture, user_schema_client) -> None:
                         "node": {
                             "slug": entry_1.slug,
                             "name": entry_1.name,
-                            "city": entry_1.city,
+                            "city": entry_1.city.name,
                             "postalCode": entry_1.postal_code,
                             "street": entry_1.street,
-                            "country": entry_1.country,
+                            "country": entry_1.country.name,
                             "rating": "0.00",
                             "numbers": [
                                 {"number": "500500500", "type": "mobile"},
@@ -253,10 +288,10 @@ def test_phonebook_entry_user_query(data_fixture, user_schema_client) -> None:
                         "node": {
                             "slug": entry_2.slug,
                             "name": entry_2.name,
-                            "city": entry_2.city,
+                            "city": entry_2.city.name,
                             "postalCode": entry_2.postal_code,
                             "street": entry_2.street,
-                            "country": entry_2.country,
+                            "country": entry_2.country.name,
                             "rating": "0.00",
                             "numbers": [
                                 {"number": "226465020", "type": "landline"},
@@ -314,10 +349,10 @@ def test_phonebook_entry_rating_query(data_fixture, user_schema_client) -> None:
                         "id": to_global_id("PhonebookEntryNode", entry.id),
                         "slug": entry.slug,
                         "name": entry.name,
-                        "city": entry.city,
+                        "city": entry.city.name,
                         "postalCode": entry.postal_code,
                         "street": entry.street,
-                        "country": entry.country,
+                        "country": entry.country.name,
                         "rating": "2.67",
                     }
                 }
@@ -370,10 +405,10 @@ def test_phonebook_entry_rating_count_query(data_fixture, user_schema_client) ->
                         "id": to_global_id("PhonebookEntryNode", entry.id),
                         "slug": entry.slug,
                         "name": entry.name,
-                        "city": entry.city,
+                        "city": entry.city.name,
                         "postalCode": entry.postal_code,
                         "street": entry.street,
-                        "country": entry.country,
+                        "country": entry.country.name,
                         "rating": "2.67",
                         "ratingCount": 3,
                     }
@@ -385,3 +420,374 @@ def test_phonebook_entry_rating_count_query(data_fixture, user_schema_client) ->
     assert "errors" not in result
     assert result["data"] == expected
     assert entry.phonebook_rating.all().count() == 3
+
+
+@pytest.mark.django_db
+def test_phonebook_digest_query(data_fixture, user_schema_client) -> None:
+    user = user_schema_client.user
+    entry = data_fixture.create_phonebook_entry(created_by=user)
+    root = PhonebookDigestHandler().get_root(user)
+    query = """
+            query PhonebookDigest($level: Int) {
+              phonebookDigest(level: $level) {
+                level
+                startId
+                endId
+                digest
+                entryCount
+              }
+            }
+           """
+
+    result = user_schema_client.execute(query)
+    assert "errors" not in result
+    assert result["data"]["phonebookDigest"] == [
+        {"level": root.level, "startId": 0, "endId": root.end_id, "digest": root.digest, "entryCount": 0}
+    ]
+
+    PhonebookDigestHandler().refresh_entry(entry)
+    result = user_schema_client.execute(query, {"level": 0})
+    assert "errors" not in result
+    assert result["data"]["phonebookDigest"] == [
+        {
+            "level": 0,
+            "startId": entry.id - entry.id % 128,
+            "endId": entry.id - entry.id % 128 + 128,
+            "digest": entry.digest,
+            "entryCount": 1,
+        }
+    ]
+
+
+@pytest.mark.django_db
+def test_phonebook_digest_query_anonymous(user_schema_anonymous_client) -> None:
+    query = """
+            query PhonebookDigest {
+              phonebookDigest {
+                digest
+              }
+            }
+           """
+
+    result = user_schema_anonymous_client.execute(query)
+
+    assert result["errors"][0]["message"] == "AuthenticationError"
+
+
+@pytest.mark.django_db
+def test_phonebook_entry_rating_histogram_query(data_fixture, user_schema_client) -> None:
+    user = user_schema_client.user
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    with freeze_time("2025-01-01 10:00"):
+        data_fixture.add_phonebook_entry_rating(entry, 5, user)
+        data_fixture.add_phonebook_entry_rating(entry, 2, user)
+    compact_ratings(retention_days=1)
+    data_fixture.add_phonebook_entry_rating(entry, 5, user)
+    query = """
+            query PhonebookEntryNode($id: ID!) {
+              node(id: $id) {
+                ... on PhonebookEntryNode {
+                  rating
+                  ratingCount
+                  ratingHistogram {
+                    rate
+                    count
+                  }
+                }
+              }
+            }
+           """
+
+    result = user_schema_client.execute(query, {"id": entry.gid})
+
+    assert "errors" not in result
+    assert result["data"] == {
+        "node": {
+            "rating": "4.00",
+            "ratingCount": 3,
+            "ratingHistogram": [{"rate": 2, "count": 1}, {"rate": 5, "count": 2}],
+        }
+    }
+
+
+@pytest.mark.django_db
+def test_top_phonebook_entries_query(data_fixture, user_schema_client) -> None:
+    user = user_schema_client.user
+    few_votes = data_fixture.create_phonebook_entry(created_by=user, city="Warsaw", create_numbers=False)
+    many_votes = data_fixture.create_phonebook_entry(created_by=user, city="Warsaw", create_numbers=False)
+    other_city = data_fixture.create_phonebook_entry(created_by=user, city="Cracow", create_numbers=False)
+    # Unrated entry, ranked by the prior of rating_score.
+    data_fixture.create_phonebook_entry(created_by=user, city="Warsaw", create_numbers=False)
+    data_fixture.add_phonebook_entry_rating(few_votes, 6, user)
+    for _ in range(20):
+        data_fixture.add_phonebook_entry_rating(many_votes, 5, user)
+    data_fixture.add_phonebook_entry_rating(other_city, 6, user)
+    query = """
+            query TopPhonebookEntries($city: String, $limit: Int) {
+              topPhonebookEntries(city: $city, limit: $limit) {
+                id
+                ratingScore
+              }
+            }
+           """
+
+    result = user_schema_client.execute(query, {"city": "Warsaw", "limit": 2})
+
+    assert "errors" not in result
+    assert result["data"] == {
+        "topPhonebookEntries": [
+            {"id": many_votes.gid, "ratingScore": pytest.approx(130 / 30)},
+            {"id": few_votes.gid, "ratingScore": pytest.approx(36 / 11)},
+        ]
+    }
+
+
+@pytest.mark.django_db
+def test_phonebook_entry_query_order_by_rating(data_fixture, user_schema_client) -> None:
+    user = user_schema_client.user
+    low = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    high = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    data_fixture.add_phonebook_entry_rating(low, 1, user)
+    data_fixture.add_phonebook_entry_rating(high, 6, user)
+    query = """
+            query Phonebook {
+              phonebookEntry(orderBy: "-rating") {
+                edges {
+                  node {
+                    id
+                  }
+                }
+              }
+            }
+           """
+
+    result = user_schema_client.execute(query)
+
+    assert "errors" not in result
+    assert [edge["node"]["id"] for edge in result["data"]["phonebookEntry"]["edges"]] == [high.gid, low.gid]
+
+
+@pytest.mark.django_db
+def test_phonebook_entry_query_order_by_rating_ties_by_id(data_fixture, user_schema_client) -> None:
+    user = user_schema_client.user
+    entries = [
+        data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+        for _ in range(3)
+    ]
+    query = """
+            query Phonebook {
+              phonebookEntry(orderBy: "-rating") {
+                edges {
+                  node {
+                    id
+                  }
+                }
+              }
+            }
+           """
+
+    result = user_schema_client.execute(query)
+
+    assert "errors" not in result
+    assert [edge["node"]["id"] for edge in result["data"]["phonebookEntry"]["edges"]] == [
+        entry.gid for entry in entries
+    ]
+
+
+@pytest.mark.django_db
+def test_phonebook_facets_query(data_fixture, user_schema_client) -> None:
+    user = user_schema_client.user
+    entry = data_fixture.create_phonebook_entry(
+        created_by=user, city="Warsaw", country="Poland", type="personal", create_groups=False
+    )
+    data_fixture.add_phonebook_group(entry, "family")
+    data_fixture.create_phonebook_entry(created_by=user, city="Cracow", type="enterprise", create_groups=False)
+    query = """
+            query PhonebookFacets($filter: PhonebookFacetsFilter) {
+              phonebookFacets(filter: $filter) {
+                total
+                types { value count }
+                cities { value count }
+                countries { value count }
+                groups { value count }
+              }
+            }
+           """
+
+    result = user_schema_client.execute(query, {"filter": {"type": "personal"}})
+
+    assert "errors" not in result
+    assert result["data"] == {
+        "phonebookFacets": {
+            "total": 1,
+            "types": [{"value": "personal", "count": 1}],
+            "cities": [{"value": "Warsaw", "count": 1}],
+            "countries": [{"value": "Poland", "count": 1}],
+            "groups": [{"value": "family", "count": 1}],
+        }
+    }
+
+
+@pytest.mark.django_db
+def test_phonebook_entry_count_modes(data_fixture, user_schema_client) -> None:
+    data_fixture.create_phonebook_entry(create_numbers=False, create_groups=False)
+    data_fixture.create_phonebook_entry(create_numbers=False, create_groups=False)
+    query = """
+            query PhonebookEntryCount {
+              exact: phonebookEntryCount(mode: exact)
+              approximate: phonebookEntryCount(mode: approximate)
+            }
+           """
+
+    result = user_schema_client.execute(query)
+
+    assert "errors" not in result
+    assert result["data"] == {"exact": 2, "approximate": 2}
+
+
+@pytest.mark.django_db
+def test_phonebook_entry_connection_uses_counters_without_filters(data_fixture, user_schema_client) -> None:
+    user = user_schema_client.user
+    entries = [
+        data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+        for _ in range(3)
+    ]
+    data_fixture.create_phonebook_entry(create_numbers=False, create_groups=False)
+    query = """
+            query MyPhonebookEntries($first: Int, $city: String) {
+              me {
+                myPhonebookEntries(first: $first, city: $city) {
+                  pageInfo { hasNextPage }
+                  edges { node { name } }
+                }
+              }
+            }
+           """
+
+    with CaptureQueriesContext(connection) as queries:
+        result = user_schema_client.execute(query, {"first": 2})
+
+    assert "errors" not in result
+    assert result["data"]["me"]["myPhonebookEntries"]["pageInfo"] == {"hasNextPage": True}
+    assert [edge["node"]["name"] for edge in result["data"]["me"]["myPhonebookEntries"]["edges"]] == [
+        entry.name for entry in entries[:2]
+    ]
+    assert not any("COUNT(" in query["sql"] for query in queries.captured_queries)
+
+    result = user_schema_client.execute(query, {"first": 2, "city": entries[0].city.name})
+
+    assert "errors" not in result
+    assert result["data"]["me"]["myPhonebookEntries"]["edges"] == [{"node": {"name": entries[0].name}}]
+
+
+@pytest.mark.django_db
+def test_autocomplete_query(data_fixture, user_schema_client, user_schema_anonymous_client) -> None:
+    data_fixture.create_phonebook_entry(created_by=user_schema_client.user, name="Marta Nowak", create_groups=False)
+    data_fixture.create_phonebook_entry(name="Marek Other", create_groups=False)
+    query = """
+            query Autocomplete($prefix: String!) {
+              autocomplete(prefix: $prefix, limit: 5) {
+                value
+                kind
+              }
+            }
+           """
+
+    result = user_schema_client.execute(query, {"prefix": "mar"})
+
+    assert "errors" not in result
+    assert result["data"] == {"autocomplete": [{"value": "Marta Nowak", "kind": "entry"}]}
+
+    result = user_schema_anonymous_client.execute(query, {"prefix": "mar"})
+
+    assert result["errors"]
+
+
+@pytest.mark.django_db
+def test_phonebook_entries_by_number_query(data_fixture, user_schema_client, tmp_path, settings) -> None:
+    settings.PHONEBOOK_SNAPSHOT_PATH = str(tmp_path / "directory.snapshot")
+    settings.PHONEBOOK_SNAPSHOT_CHECK_INTERVAL = 0
+    entry = data_fixture.create_phonebook_entry(created_by=user_schema_client.user, create_numbers=False)
+    data_fixture.add_phonebook_entry_number(entry, "500 500 500", "mobile")
+    other = data_fixture.create_phonebook_entry(create_numbers=False)
+    data_fixture.add_phonebook_entry_number(other, "500 500 500", "mobile")
+    query = """
+            query PhonebookEntriesByNumber($number: String!) {
+              phonebookEntriesByNumber(number: $number) {
+                name
+              }
+            }
+           """
+
+    result = user_schema_client.execute(query, {"number": "500-500-500"})
+
+    assert "errors" not in result
+    assert result["data"] == {"phonebookEntriesByNumber": []}
+
+    build_directory_snapshot(tmp_path / "directory.snapshot")
+    result = user_schema_client.execute(query, {"number": "500-500-500"})
+
+    assert "errors" not in result
+    assert result["data"] == {"phonebookEntriesByNumber": [{"name": entry.name}]}
+    directory_snapshot._directory = None
+
+
+@pytest.mark.django_db
+def test_find_duplicate_entries_query(data_fixture, user_schema_client) -> None:
+    user = user_schema_client.user
+    entries = [
+        data_fixture.create_phonebook_entry(
+            created_by=user,
+            name="Jan Kowalski",
+            street="Marszalkowska 1",
+            city="Warsaw",
+            postal_code="00-001",
+            country="Poland",
+            create_numbers=False,
+            create_groups=False,
+        )
+        for _ in range(2)
+    ]
+    query = """
+            query FindDuplicateEntries {
+              findDuplicateEntries {
+                score
+                entries { id }
+              }
+            }
+           """
+
+    result = user_schema_client.execute(query)
+
+    assert "errors" not in result
+    assert result["data"] == {
+        "findDuplicateEntries": [
+            {
+                "score": 1.0,
+                "entries": [{"id": to_global_id("PhonebookEntryNode", entry.id)} for entry in entries],
+            }
+        ]
+    }
+
+
+@pytest.mark.django_db
+def test_phonebook_entry_query_skips_deleted_entries(data_fixture, user_schema_client) -> None:
+    user = user_schema_client.user
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    deleted = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    PhonebookHandler().delete(user=user, entry_id=deleted.id)
+
+    query = """
+        query {
+          phonebookEntryCount
+          phonebookEntry { edges { node { id } } }
+          me { myPhonebookEntries { edges { node { id } } } }
+        }
+        """
+    result = user_schema_client.execute(query)
+
+    assert "errors" not in result
+    expected_edges = [{"node": {"id": to_global_id("PhonebookEntryNode", entry.id)}}]
+    assert result["data"]["phonebookEntryCount"] == 1
+    assert result["data"]["phonebookEntry"]["edges"] == expected_edges
+    assert result["data"]["me"]["myPhonebookEntries"]["edges"] == expected_edges
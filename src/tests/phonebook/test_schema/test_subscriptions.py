@@ -0,0 +1,110 @@
+import asyncio
+from typing import Callable
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from graphql_relay import to_global_id
+
+from api.broker import InProcessBroker
+from api.graphql.schema import schema
+from api.websocket import WebSocketContext
+from phonebook.events import PHONEBOOK_EVENTS_CHANNEL
+from phonebook.handler import PhonebookHandler
+
+SUBSCRIPTION = """
+    subscription PhonebookEntryEvents($entryId: ID) {
+      phonebookEntryEvents(entryId: $entryId) {
+        kind
+        entryId
+        rate
+      }
+    }
+    """
+
+
+@pytest.fixture
+def broker(monkeypatch) -> InProcessBroker:
+    broker = InProcessBroker()
+    monkeypatch.setattr("phonebook.events.get_broker", lambda: broker)
+    monkeypatch.setattr("phonebook.user_schema.subscriptions.get_broker", lambda: broker)
+    return broker
+
+
+async def _next_event(user, broker: InProcessBroker, publish: Callable[[], object], entry_id: str | None = None):
+    result = await schema.subscribe(
+        SUBSCRIPTION, variable_values={"entryId": entry_id}, context_value=WebSocketContext(user=user)
+    )
+    next_event = asyncio.ensure_future(result.__anext__())
+    while not broker.has_subscribers(PHONEBOOK_EVENTS_CHANNEL):
+        await asyncio.sleep(0)
+    publish()
+    event = await asyncio.wait_for(next_event, timeout=1)
+    await result.aclose()
+    return event
+
+
+@pytest.mark.django_db
+def test_phonebook_entry_events_subscription(data_fixture, broker, django_capture_on_commit_callbacks) -> None:
+    user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+    with django_capture_on_commit_callbacks() as callbacks:
+        PhonebookHandler().add_rating(entry_id=entry.id, rate=5, user=user)
+
+    event = asyncio.run(_next_event(user, broker, publish=lambda: [callback() for callback in callbacks]))
+
+    assert event.errors is None
+    assert event.data == {
+        "phonebookEntryEvents": {"kind": "rated", "entryId": to_global_id("PhonebookEntryNode", entry.id), "rate": 5}
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_phonebook_entry_events_subscription_filtered(data_fixture, broker) -> None:
+    user = data_fixture.create_user()
+    other_user = data_fixture.create_user()
+    entry = data_fixture.create_phonebook_entry(created_by=user, create_numbers=False, create_groups=False)
+
+    def publish() -> None:
+        broker.publish(PHONEBOOK_EVENTS_CHANNEL, {"kind": "updated", "entry_id": 0, "created_by_id": user.id})
+        broker.publish(PHONEBOOK_EVENTS_CHANNEL, {"kind": "rated", "entry_id": entry.id, "created_by_id": 0})
+        broker.publish(PHONEBOOK_EVENTS_CHANNEL, {"kind": "deleted", "entry_id": entry.id, "created_by_id": user.id})
+
+    event = asyncio.run(_next_event(user, broker, publish, entry_id=to_global_id("PhonebookEntryNode", entry.id)))
+
+    assert event.data == {
+        "phonebookEntryEvents": {
+            "kind": "deleted",
+            "entryId": to_global_id("PhonebookEntryNode", entry.id),
+            "rate": None,
+        }
+    }
+
+    result = asyncio.run(
+        schema.subscribe(
+            SUBSCRIPTION,
+            variable_values={"entryId": to_global_id("PhonebookEntryNode", entry.id)},
+            context_value=WebSocketContext(user=other_user),
+        )
+    )
+    assert result.errors[0].message == "Entry with given id does not exists!"
+
+
+@pytest.mark.django_db
+def test_phonebook_entry_events_subscription_skips_other_users(data_fixture, broker) -> None:
+    user = data_fixture.create_user()
+
+    def publish() -> None:
+        broker.publish(PHONEBOOK_EVENTS_CHANNEL, {"kind": "rated", "entry_id": 1, "created_by_id": 0, "rate": 5})
+        broker.publish(PHONEBOOK_EVENTS_CHANNEL, {"kind": "updated", "entry_id": 2, "created_by_id": user.id})
+
+    event = asyncio.run(_next_event(user, broker, publish))
+
+    assert event.data == {
+        "phonebookEntryEvents": {"kind": "updated", "entryId": to_global_id("PhonebookEntryNode", 2), "rate": None}
+    }
+
+
+def test_phonebook_entry_events_subscription_anonymous(broker) -> None:
+    result = asyncio.run(schema.subscribe(SUBSCRIPTION, context_value=WebSocketContext(user=AnonymousUser())))
+
+    assert result.errors[0].message == "AuthenticationError"
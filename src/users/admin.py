@@ -4,7 +4,7 @@ from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import Group, Permission
 from django.utils.translation import gettext_lazy as _
 
-from model_utils import BaseModelAdmin
+from admin_utils import BaseModelAdmin
 from users.models import User
 
 
@@ -1,11 +1,10 @@
 import graphene
 from django.db.models import QuerySet
-from django.db.models.aggregates import Count
-from graphene_django.filter import DjangoFilterConnectionField
 from graphql_relay import to_global_id
 
 from api.graphql_utils import login_required
 from phonebook.models import PhonebookEntry
+from phonebook.user_schema.connections import PhonebookEntryConnectionField
 from phonebook.user_schema.queries import PhonebookEntryNode
 from users.models import User
 
@@ -15,7 +14,7 @@ class Me(graphene.ObjectType):
     email = graphene.String()
     first_name = graphene.String()
     last_name = graphene.String()
-    my_phonebook_entries = DjangoFilterConnectionField(PhonebookEntryNode)
+    my_phonebook_entries = PhonebookEntryConnectionField(PhonebookEntryNode, owned=True)
 
     def __init__(self, user: User) -> None:
         self.user = user
@@ -33,11 +32,7 @@ class Me(graphene.ObjectType):
         return self.user.lastname
 
     def resolve_my_phonebook_entries(self, info: graphene.ResolveInfo, **kwargs) -> QuerySet[PhonebookEntry]:
-        return (
-            PhonebookEntry.objects.annotate(rating__count=Count("phonebook_rating"))
-            .prefetch_related("groups", "phonebook_number")
-            .filter(created_by=info.context.user)
-        )
+        return PhonebookEntry.objects.prefetch_related("phonebook_number").filter(created_by=info.context.user)
 
 
 class MeQuery(graphene.ObjectType):
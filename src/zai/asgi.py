@@ -2,6 +2,8 @@
 ASGI config for zai project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests are served by Django, websocket connections to the GraphQL endpoint
+serve GraphQL subscriptions.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +15,22 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "zai.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.urls import reverse  # noqa: E402
+
+from api.graphql.schema import schema  # noqa: E402
+from api.websocket import GraphQLWebSocketApp  # noqa: E402
+
+graphql_path = reverse("graphql")
+websocket_application = GraphQLWebSocketApp(schema)
+
+
+async def application(scope, receive, send) -> None:
+    if scope["type"] == "websocket":
+        if scope["path"] == graphql_path:
+            await websocket_application(scope, receive, send)
+        else:
+            await send({"type": "websocket.close", "code": 4404})
+        return
+    await django_application(scope, receive, send)
@@ -0,0 +1,52 @@
+"""
+Gunicorn configuration, used with ``gunicorn -c python:zai.gunicorn_config zai.wsgi:application``.
+
+See https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import gc
+import os
+
+from api.memory import current_rss, install_allocation_diff_signal
+from api.warmup import build_schema, warm_worker
+
+bind = "0.0.0.0:8000"
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+timeout = 60
+limit_request_field_size = 65536
+loglevel = "info"
+# Django, the GraphQL schema and URL patterns are loaded once in the master and shared by workers.
+preload_app = True
+
+# Workers whose RSS passes this many bytes exit after the current request and are replaced, 0 disables it.
+worker_max_rss = int(os.environ.get("GUNICORN_WORKER_MAX_RSS", str(1024 * 1024 * 1024)))
+
+
+def on_starting(server) -> None:
+    # Collections in the master before fork would leave holes in pages shared by workers. Garbage
+    # collection is disabled until objects are frozen, see when_ready. on_starting runs after the
+    # preloaded app was imported, so collections during the import itself still happen.
+    gc.disable()
+
+
+def when_ready(server) -> None:
+    build_schema()
+    # Objects of the master are moved to the permanent generation, so collections in workers
+    # do not write to their pages and they stay shared copy-on-write.
+    gc.freeze()
+    gc.enable()
+
+
+def post_worker_init(worker) -> None:
+    # Installed after the worker reset signal handlers inherited from the master.
+    install_allocation_diff_signal()
+    warm_worker()
+
+
+def post_request(worker, req, environ, resp) -> None:
+    if not worker_max_rss or not worker.alive:
+        return
+    rss = current_rss()
+    if rss > worker_max_rss:
+        worker.log.info(f"Recycling worker {worker.pid}, RSS {rss} exceeds {worker_max_rss}")
+        worker.alive = False
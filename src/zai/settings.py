@@ -41,30 +41,37 @@ CSRF_TRUSTED_ORIGINS = [
     f"https://{SERVER_NAME}",
 ]
 
+# Development and admin only apps are not loaded in production, e.g. with DEBUG=False and
+# ADMIN_ENABLED=False, which saves their imports on boot and the toolbar middleware on each request.
+DEBUG_TOOLBAR = os.environ.get("DEBUG_TOOLBAR", str(DEBUG)) == "True"
+ADMIN_ENABLED = os.environ.get("ADMIN_ENABLED", "True") == "True"
+
 # Application definition
 
 INSTALLED_APPS = [
-    "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "graphene_django",
-    "debug_toolbar",
     "corsheaders",
     "django_filters",
     "graphql_jwt.refresh_token.apps.RefreshTokenConfig",
     "users.apps.UsersConfig",
     "app_auth.apps.AuthConfig",
     "phonebook.apps.PhonebookConfig",
+    "api",
 ]
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "api.middleware.QueryInstrumentationMiddleware",
+    "api.middleware.ProfilingMiddleware",
+    "api.middleware.MemoryTrackingMiddleware",
     "api.middleware.CustomSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -73,10 +80,24 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if ADMIN_ENABLED:
+    INSTALLED_APPS.insert(0, "django.contrib.admin")
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.insert(INSTALLED_APPS.index("graphene_django") + 1, "debug_toolbar")
+    MIDDLEWARE.insert(1, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
+# Identical concurrent read-only GraphQL operations of a worker are executed once and share the result,
+# requests waiting for it longer than SINGLE_FLIGHT_TIMEOUT seconds execute the operation themselves.
+GRAPHQL_SINGLE_FLIGHT = os.environ.get("GRAPHQL_SINGLE_FLIGHT", "False") == "True"
+GRAPHQL_SINGLE_FLIGHT_TIMEOUT = float(os.environ.get("GRAPHQL_SINGLE_FLIGHT_TIMEOUT", "30"))
+# URL names of views authenticated by JWT cookies, served without loading or saving sessions.
+SESSIONLESS_URL_NAMES = ["graphql"]
+
 GRAPHENE = {
     "SCHEMA": "api.graphql.schema",
     "MIDDLEWARE": [
         "graphql_jwt.middleware.JSONWebTokenMiddleware",
+        "api.query_context.QueryContextMiddleware",
     ],
 }
 
@@ -117,6 +138,9 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD", "postgres"),
         "HOST": os.environ.get("DB_HOST", "localhost"),
         "PORT": os.environ.get("DB_PORT", "1303"),
+        # Persistent connections, opened by workers before they accept requests, see api.warmup.
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
     },
 }
 
@@ -190,6 +214,99 @@ DEBUG_TOOLBAR_CONFIG = {"SHOW_TOOLBAR_CALLBACK": lambda request: DEBUG}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Phonebook sync digest: entries are hashed into leaves of BUCKET_SIZE ids,
+# inner Merkle tree nodes have FANOUT children.
+PHONEBOOK_DIGEST_BUCKET_SIZE = int(os.environ.get("PHONEBOOK_DIGEST_BUCKET_SIZE", "128"))
+PHONEBOOK_DIGEST_FANOUT = int(os.environ.get("PHONEBOOK_DIGEST_FANOUT", "16"))
+
+# Fan-out of GraphQL subscription events. Use "api.broker.PostgresBroker" when running
+# more than one process, so events published by one worker reach subscribers of all.
+EVENTS_BROKER = os.environ.get("EVENTS_BROKER", "api.broker.InProcessBroker")
+EVENTS_BROKER_QUEUE_SIZE = 1000
+# Websocket connections which do not send connection_init within this many seconds are closed.
+GRAPHQL_WS_CONNECTION_INIT_TIMEOUT = float(os.environ.get("GRAPHQL_WS_CONNECTION_INIT_TIMEOUT", "10"))
+
+PHONEBOOK_RATING_MIN = 0
+PHONEBOOK_RATING_MAX = 6
+# Entries are ranked by Bayesian average: PRIOR_WEIGHT virtual votes of PRIOR_MEAN are added
+# to real votes. Changing these requires recomputing PhonebookEntry.rating_score.
+PHONEBOOK_RATING_PRIOR_MEAN = 3.0
+PHONEBOOK_RATING_PRIOR_WEIGHT = 10
+# Buffered rating ingestion: votes are queued per worker and written in bulk once
+# BUFFER_SIZE votes are queued or the oldest vote waits BUFFER_MAX_DELAY seconds.
+# Durability "memory" may lose queued votes on a crash, "journal" fsyncs every vote
+# to a per-worker file in BUFFER_JOURNAL_DIR which is replayed after restart.
+PHONEBOOK_RATING_BUFFER_ENABLED = os.environ.get("PHONEBOOK_RATING_BUFFER_ENABLED", "False") == "True"
+PHONEBOOK_RATING_BUFFER_SIZE = int(os.environ.get("PHONEBOOK_RATING_BUFFER_SIZE", "500"))
+PHONEBOOK_RATING_BUFFER_MAX_DELAY = float(os.environ.get("PHONEBOOK_RATING_BUFFER_MAX_DELAY", "2.0"))
+PHONEBOOK_RATING_BUFFER_DURABILITY = os.environ.get("PHONEBOOK_RATING_BUFFER_DURABILITY", "journal")
+PHONEBOOK_RATING_BUFFER_JOURNAL_DIR = os.environ.get(
+    "PHONEBOOK_RATING_BUFFER_JOURNAL_DIR", str(BASE_DIR / "var" / "rating-journal")
+)
+# Ratings older than RETENTION_DAYS are folded into daily summaries by
+# phonebook.rating_rollup.compact_ratings (``manage.py compact_ratings``).
+PHONEBOOK_RATING_RETENTION_DAYS = int(os.environ.get("PHONEBOOK_RATING_RETENTION_DAYS", "30"))
+PHONEBOOK_RATING_COMPACTION_BATCH_SIZE = 5000
+# Facet counts are cached per filter until phonebook data changes, at most for TIMEOUT seconds.
+PHONEBOOK_FACETS_CACHE_TIMEOUT = 60 * 60
+# Autocomplete prefix indexes are kept in worker memory for at most MAX_USERS users. Other
+# workers' changes become visible once an index is older than MAX_AGE seconds and is reloaded.
+PHONEBOOK_AUTOCOMPLETE_MAX_USERS = int(os.environ.get("PHONEBOOK_AUTOCOMPLETE_MAX_USERS", "1000"))
+PHONEBOOK_AUTOCOMPLETE_MAX_AGE = int(os.environ.get("PHONEBOOK_AUTOCOMPLETE_MAX_AGE", "60"))
+# Group name to id cache of a worker, holding up to SIZE names. Renames and deletes made by other
+# workers are picked up at most CHECK_INTERVAL seconds later.
+PHONEBOOK_GROUP_CACHE_SIZE = int(os.environ.get("PHONEBOOK_GROUP_CACHE_SIZE", "10000"))
+PHONEBOOK_GROUP_CACHE_CHECK_INTERVAL = float(os.environ.get("PHONEBOOK_GROUP_CACHE_CHECK_INTERVAL", "5"))
+# Ids and names of cities and countries cached per worker, see phonebook.lookups.
+PHONEBOOK_LOOKUP_CACHE_SIZE = int(os.environ.get("PHONEBOOK_LOOKUP_CACHE_SIZE", "50000"))
+# Directory snapshot built by ``manage.py build_directory_snapshot`` and memory mapped by workers,
+# which check for a new snapshot file at most every CHECK_INTERVAL seconds.
+PHONEBOOK_SNAPSHOT_PATH = os.environ.get("PHONEBOOK_SNAPSHOT_PATH", str(BASE_DIR / "var" / "directory.snapshot"))
+PHONEBOOK_SNAPSHOT_CHECK_INTERVAL = float(os.environ.get("PHONEBOOK_SNAPSHOT_CHECK_INTERVAL", "5"))
+# Entry pairs scoring at least THRESHOLD (0-1) are reported as duplicates, candidate pairs
+# are scored in batches of BATCH_SIZE. Numbers shared by more than MAX_NUMBER_BUCKET entries
+# do not make candidate pairs. Results are cached until the owner's entries change.
+PHONEBOOK_DUPLICATES_THRESHOLD = float(os.environ.get("PHONEBOOK_DUPLICATES_THRESHOLD", "0.6"))
+PHONEBOOK_DUPLICATES_BATCH_SIZE = 10000
+PHONEBOOK_DUPLICATES_MAX_NUMBER_BUCKET = 50
+PHONEBOOK_DUPLICATES_CACHE_TIMEOUT = 60 * 60
+# Delete entries with set-based statements (PhonebookHandler.delete_many) instead of Django's delete collector.
+PHONEBOOK_FAST_DELETE = os.environ.get("PHONEBOOK_FAST_DELETE", "True") == "True"
+# Deleted entries are only marked with deleted_at and hard deleted by ``manage.py purge_deleted_entries``
+# in batches of PURGE_BATCH_SIZE, once they were deleted at least PURGE_MIN_AGE seconds ago.
+PHONEBOOK_SOFT_DELETE = os.environ.get("PHONEBOOK_SOFT_DELETE", "True") == "True"
+PHONEBOOK_PURGE_BATCH_SIZE = int(os.environ.get("PHONEBOOK_PURGE_BATCH_SIZE", "200"))
+PHONEBOOK_PURGE_MIN_AGE = int(os.environ.get("PHONEBOOK_PURGE_MIN_AGE", str(60 * 60)))
+PHONEBOOK_PURGE_PAUSE = float(os.environ.get("PHONEBOOK_PURGE_PAUSE", "0.1"))
+
+# SELECT statements running at least THRESHOLD_MS are explained with EXPLAIN (ANALYZE, BUFFERS) at
+# SAMPLE_RATE (0-1), plans are written to a rotating log summarized by ``manage.py report_slow_queries``.
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "False") == "True"
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get("SLOW_QUERY_SAMPLE_RATE", "0.1"))
+SLOW_QUERY_LOG_PATH = os.environ.get("SLOW_QUERY_LOG_PATH", str(BASE_DIR / "var" / "slow_queries.log"))
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 5
+# Tag SQL statements of requests with sqlcommenter style comments naming the GraphQL operation,
+# mutation, resolver and request id, see api.sql_comments.
+SQL_COMMENTER = os.environ.get("SQL_COMMENTER", "True") == "True"
+# Profile SAMPLE_RATE (0-1) of GraphQL requests and requests with a signed X-Profile header with cProfile.
+# Profiles are written to PROFILING_DIR, keeping the newest MAX_FILES of each GraphQL operation.
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "False") == "True"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIR = os.environ.get("PROFILING_DIR", str(BASE_DIR / "var" / "profiles"))
+PROFILING_MAX_FILES = int(os.environ.get("PROFILING_MAX_FILES", "20"))
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+# Trace allocations with tracemalloc from worker boot, keeping FRAMES frames of each allocation. Without it,
+# tracing starts on the first SIGUSR2 sent to a worker, which dumps top MEMORY_DUMP_TOP allocation diffs.
+MEMORY_TRACEMALLOC = os.environ.get("MEMORY_TRACEMALLOC", "False") == "True"
+MEMORY_TRACEMALLOC_FRAMES = int(os.environ.get("MEMORY_TRACEMALLOC_FRAMES", "10"))
+MEMORY_DUMP_DIR = os.environ.get("MEMORY_DUMP_DIR", str(BASE_DIR / "var" / "memory"))
+MEMORY_DUMP_TOP = 25
+# Log GraphQL operations whose peak traced memory or RSS growth reaches REQUEST_LOG_THRESHOLD bytes.
+MEMORY_TRACKING = os.environ.get("MEMORY_TRACKING", "False") == "True"
+MEMORY_REQUEST_LOG_THRESHOLD = int(os.environ.get("MEMORY_REQUEST_LOG_THRESHOLD", str(20 * 1024 * 1024)))
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 